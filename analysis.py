@@ -0,0 +1,254 @@
+"""
+Resultado de análisis compartido para un diseño.
+
+AnalysisResult se construye una vez por juego de componentes y calcula bajo
+demanda, una sola vez, todo lo que usan los reportes y las gráficas: sistemas
+de cada etapa y total, polos y ceros, márgenes, step_info, datos de Bode,
+métricas de frecuencia y respuestas temporales. Los polos y ceros salen de
+las etapas factorizadas de cascade. Los reportes de
+transfer_function y responses leen de este objeto, de modo que en una sesión
+interactiva nada se recalcula al cambiar de gráfica.
+
+AnalysisSession encadena AnalysisResult durante un ajuste: al cambiar un
+componente o una configuración solo se recalculan la etapa de la que depende
+(STAGE_DEPENDENCIES) y H_total; los resultados de la otra etapa se copian.
+"""
+from functools import cached_property
+import numpy as np
+from utils import init_components, config_from_name
+from numeric_tf import (COMPONENT_NAMES, calc_individual_coeffs, coeffs_to_tf,
+                        transfer_function_strings, values_by_name)
+from cascade import cascade_sos, stages_from_configs, cascade_roots
+from batch_response import DEFAULT_W, SYSTEM_NAMES, coeffs_frequency_response
+from frequency_metrics import frequency_metrics
+from time_response import plan_time_grid, step_response, impulse_response
+from step_metrics import step_metrics
+from stability_margins import stability_margins
+from batch_analysis import CONFIG_KEYS
+from design_record import as_components
+
+# Componentes y configuraciones de los que depende cada etapa; H_total
+# depende de todos
+STAGE_DEPENDENCIES = {
+    'H1': ('R1', 'R2', 'C1', 'Ci1', 'config1', 'input1'),
+    'H2': ('R3', 'R4', 'C2', 'Ci2', 'config2', 'input2'),
+}
+
+# Propiedades por sistema que se pueden copiar de un análisis anterior. Las
+# respuestas temporales comparten time_grid, que depende de todos los polos,
+# y se recalculan siempre
+REUSABLE_FIELDS = ('systems', 'zeros', 'poles', 'margins', 'step_info', 'bode',
+                   'frequency_metrics')
+
+
+def affected_systems(changed):
+    """Sistemas (en el orden de SYSTEM_NAMES) que dependen de los nombres dados.
+
+    changed: nombres de componentes ('R4') o de configuraciones ('config2').
+    """
+    changed = set(changed)
+    unknown = changed.difference(COMPONENT_NAMES, CONFIG_KEYS)
+    if unknown:
+        raise ValueError(f"Componente o configuración desconocida: {sorted(unknown)[0]!r}")
+    stale = {name for name, deps in STAGE_DEPENDENCIES.items() if changed.intersection(deps)}
+    if stale:
+        stale.add('H_total')
+    return tuple(name for name in SYSTEM_NAMES if name in stale)
+
+
+def _time_response(func, sys, t):
+    """Respuesta temporal, o NaN si el sistema es impropio."""
+    try:
+        return func(sys, t)
+    except ValueError:
+        return np.full(t.shape, np.nan)
+
+
+class AnalysisResult:
+    """Análisis perezoso y memoizado de un diseño.
+
+    components: tupla de init_components o registro de design_record (se
+        solicita si es None).
+
+    Las propiedades por sistema son diccionarios indexados por 'H1', 'H2' y
+    'H_total' (batch_response.SYSTEM_NAMES).
+
+    reuse: {sistema: {propiedad: valor}} con resultados de un análisis anterior
+        que siguen siendo válidos (ver AnalysisSession.update); esas entradas
+        se copian en lugar de recalcularse.
+    """
+
+    def __init__(self, components=None, w=None, reuse=None):
+        if components is None:
+            components = init_components()
+        components = as_components(components, symbols=False)
+        self.components = components
+        self.valores = components[2]
+        self.configs = components[3]
+        self.w = DEFAULT_W if w is None else np.asarray(w, dtype=float)
+        self._reuse = reuse or {}
+
+    def _per_system(self, field, func):
+        """{sistema: func(sys)}, salvo los sistemas que traen field en reuse."""
+        out = {}
+        for i, name in enumerate(SYSTEM_NAMES):
+            reused = self._reuse.get(name, {})
+            out[name] = reused[field] if field in reused else func(self.systems[i])
+        return out
+
+    def system_results(self, name):
+        """Propiedades ya calculadas (REUSABLE_FIELDS) de un sistema.
+
+        Incluye las que este análisis recibió en reuse y aún no se usaron, de
+        modo que un análisis posterior no depende de este objeto.
+        """
+        index = SYSTEM_NAMES.index(name)
+        fields = dict(self._reuse.get(name, {}))
+        for field in REUSABLE_FIELDS:
+            if field in self.__dict__:
+                value = self.__dict__[field]
+                fields[field] = value[index] if isinstance(value, tuple) else value[name]
+        return fields
+
+    @cached_property
+    def coeffs(self):
+        """Coeficientes (num, den) sin normalizar de H1, H2 y H_total."""
+        return calc_individual_coeffs(self.valores, self.configs)
+
+    @cached_property
+    def expressions(self):
+        """Expresiones simbólicas (texto) de H1, H2 y H_total."""
+        return transfer_function_strings(self.configs)
+
+    @cached_property
+    def systems(self):
+        """(sys1, sys2, sys_total) como los devuelve get_numeric_tfs."""
+        systems = []
+        for i, name in enumerate(SYSTEM_NAMES):
+            reused = self._reuse.get(name, {})
+            systems.append(reused['systems'] if 'systems' in reused
+                           else coeffs_to_tf(*self.coeffs[i]))
+        return tuple(systems)
+
+    @cached_property
+    def sos(self):
+        """Secciones de segundo orden (2, 6) de H1 y H2 (ver cascade)."""
+        return cascade_sos(stages_from_configs(values_by_name(self.valores), self.configs))
+
+    def _per_cascade(self, field, index):
+        """{sistema: raíces index de cascade_roots}, salvo las que trae reuse.
+
+        H1 y H2 son cada una de las secciones y H_total su cascada, así que
+        los polos y ceros salen de cada etapa factorizada en lugar de las
+        raíces del polinomio expandido y normalizado (ver get_numeric_tf).
+        """
+        sections = {'H1': self.sos[:1], 'H2': self.sos[1:], 'H_total': self.sos}
+        out = {}
+        for name in SYSTEM_NAMES:
+            reused = self._reuse.get(name, {})
+            out[name] = reused[field] if field in reused \
+                else cascade_roots(sections[name])[index]
+        return out
+
+    @cached_property
+    def zeros(self):
+        return self._per_cascade('zeros', 0)
+
+    @cached_property
+    def poles(self):
+        return self._per_cascade('poles', 1)
+
+    @cached_property
+    def margins(self):
+        """Márgenes de ganancia y de fase con todos los cruces (ver stability_margins)."""
+        return self._per_system('margins', stability_margins)
+
+    @cached_property
+    def step_info(self):
+        """Características de la respuesta al escalón (ver step_metrics)."""
+        return self._per_system('step_info', step_metrics)
+
+    @cached_property
+    def bode(self):
+        """Datos de Bode sobre self.w: 'mag', 'mag_db', 'phase_deg' y 'freq' (Hz)."""
+        freq = self.w / (2 * np.pi)
+
+        def bode(sys):
+            H, _, phase = coeffs_frequency_response(sys.num[0][0], sys.den[0][0], self.w)
+            mag = np.abs(H[0])
+            return {'mag': mag, 'mag_db': 20 * np.log10(mag + 1e-10),
+                    'phase_deg': phase[0], 'freq': freq}
+        return self._per_system('bode', bode)
+
+    @cached_property
+    def frequency_metrics(self):
+        """Pico, cortes y ancho de banda exactos (ver frequency_metrics)."""
+        return self._per_system('frequency_metrics', frequency_metrics)
+
+    @cached_property
+    def time_grid(self):
+        """Malla de tiempo común planificada a partir de los polos."""
+        return plan_time_grid(*self.systems)
+
+    @cached_property
+    def step_responses(self):
+        """Respuestas al escalón en time_grid (NaN si el sistema es impropio)."""
+        return self._per_system('step_responses',
+                                lambda sys: _time_response(step_response, sys, self.time_grid))
+
+    @cached_property
+    def impulse_responses(self):
+        """Respuestas al impulso en time_grid (NaN si el sistema es impropio)."""
+        return self._per_system('impulse_responses',
+                                lambda sys: _time_response(impulse_response, sys, self.time_grid))
+
+
+class AnalysisSession:
+    """Sesión de ajuste que re-analiza solo lo que depende de cada cambio.
+
+    result: AnalysisResult inicial; si es None se crea con components y w.
+
+    update() devuelve un AnalysisResult nuevo (también en self.result) que
+    copia del anterior todo lo ya calculado de la etapa no afectada. H_total
+    depende de ambas etapas y se recalcula en cada cambio.
+    """
+
+    def __init__(self, components=None, w=None, result=None):
+        self.result = AnalysisResult(components, w) if result is None else result
+        # Sistemas recalculados en el último update
+        self.stale = ()
+
+    @property
+    def components(self):
+        return self.result.components
+
+    def update(self, **changes):
+        """Cambia componentes (R4=22e3) o configuraciones (config2='paralelo').
+
+        Las configuraciones aceptan el dict de init_components o su nombre
+        ('R', 'serie', 'paralelo'). Si nada cambia se devuelve el mismo
+        resultado.
+        """
+        old = self.result
+        valores = dict(old.valores)
+        configs = dict(old.configs)
+        keys = {getattr(key, 'name', key): key for key in valores}
+        affected_systems(changes)  # valida los nombres
+        changed = []
+        for name, value in changes.items():
+            if name in CONFIG_KEYS:
+                value = config_from_name(value) if isinstance(value, str) else dict(value)
+                if configs.get(name) != value:
+                    configs[name] = value
+                    changed.append(name)
+            elif valores[keys[name]] != value:
+                valores[keys[name]] = float(value)
+                changed.append(name)
+        self.stale = affected_systems(changed)
+        if not self.stale:
+            return old
+        reuse = {name: old.system_results(name) for name in SYSTEM_NAMES
+                 if name not in self.stale}
+        R, C = old.components[:2]
+        self.result = AnalysisResult((R, C, valores, configs), old.w, reuse=reuse)
+        return self.result
@@ -0,0 +1,206 @@
+"""
+Modo por lotes no interactivo: analiza juegos de componentes leídos de CSV o JSONL.
+
+Cada registro contiene los valores R1..R4, C1, C2, Ci1, Ci2 (los ausentes valen
+0) y las configuraciones config1, input1, config2, input2 ('R', 'serie' o
+'paralelo', o el dict {'type', 'config'}; por defecto 'R'). Los registros se
+leen de forma incremental, se analizan por bloques agrupando los de la misma
+topología en una sola evaluación vectorizada y se escribe una línea JSONL de
+resultado por diseño, de modo que la memoria usada no depende del tamaño de la
+entrada.
+"""
+import csv
+import itertools
+import json
+import sys
+import numpy as np
+from numeric_tf import COMPONENT_NAMES, calc_individual_coeffs, cancel_common_s, dc_gain
+from cascade import cascade_sos, stages_from_configs, cascade_roots
+from batch_response import (DEFAULT_W, SYSTEM_NAMES, jw_powers, coeffs_magnitude_db,
+                            determine_filter_type_batch)
+from frequency_metrics import frequency_metrics
+from utils import CONFIG_NAMES, config_from_name
+from instrumentation import span
+
+CONFIG_KEYS = ('config1', 'input1', 'config2', 'input2')
+
+# Capacitor de cada configuración; con capacitor nulo una red RC equivale a 'R'
+CONFIG_CAPACITORS = {'config1': 'C1', 'input1': 'Ci1', 'config2': 'C2', 'input2': 'Ci2'}
+
+
+def read_records(stream, fmt):
+    """Genera los registros (dicts) de un flujo CSV o JSONL."""
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+    elif fmt == 'jsonl':
+        for line in stream:
+            if line.strip():
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield {'_error': f"JSON inválido: {e}"}
+                    continue
+                if not isinstance(record, dict):
+                    record = {'_error': "El registro debe ser un objeto JSON"}
+                yield record
+    else:
+        raise ValueError(f"Formato no soportado: {fmt!r} (use csv o jsonl)")
+
+
+def config_name(value):
+    """Nombre de configuración a partir de un nombre o de un dict de configs."""
+    if value is None or value == '':
+        return 'R'
+    if isinstance(value, dict):
+        for name, cfg in CONFIG_NAMES.items():
+            if cfg['type'] == value.get('type') and cfg['config'] == value.get('config'):
+                return name
+        raise ValueError(f"Configuración desconocida: {value!r}")
+    config_from_name(value)  # Valida el nombre
+    return value
+
+
+def parse_record(record):
+    """Convierte un registro en (valores por nombre, tupla de nombres de configs)."""
+    if '_error' in record:
+        raise ValueError(record['_error'])
+    values = {}
+    for name in COMPONENT_NAMES:
+        raw = record.get(name)
+        value = 0.0 if raw is None or raw == '' else float(raw)
+        if value < 0 or not np.isfinite(value):
+            raise ValueError(f"Valor inválido para {name}: {raw!r}")
+        values[name] = value
+    for name in ('R1', 'R2', 'R3', 'R4'):
+        if values[name] <= 0:
+            raise ValueError(f"{name} debe ser positivo")
+    topology = tuple(config_name(record.get(key)) for key in CONFIG_KEYS)
+    return values, topology
+
+
+def effective_topology(values, topology):
+    """Topología que se analiza: las configuraciones RC sin capacitor son 'R'.
+
+    Como en calc_individual_transfer_functions, un capacitor nulo deja solo la
+    resistencia. Se decide por registro, así que un bloque puede mezclar
+    diseños con y sin capacitor en la misma configuración declarada.
+    """
+    return tuple('R' if values[CONFIG_CAPACITORS[key]] == 0 else name
+                 for key, name in zip(CONFIG_KEYS, topology))
+
+
+def _finite_or_none(x):
+    """Convierte a float de Python; los no finitos se escriben como null."""
+    x = float(x)
+    return x if np.isfinite(x) else None
+
+
+def _complex_list(roots):
+    return [[float(r.real), float(r.imag)] for r in roots]
+
+
+def analyze_group(values, topology, w=DEFAULT_W):
+    """Analiza N diseños con la misma topología y devuelve N dicts de resultado."""
+    with span('analyze_group', topology='-'.join(topology), designs=len(values['R1'])):
+        return _analyze_group(values, topology, w)
+
+
+def _analyze_group(values, topology, w):
+    configs = {key: config_from_name(name) for key, name in zip(CONFIG_KEYS, topology)}
+    coeffs = calc_individual_coeffs(values, configs)
+    n = len(values['R1'])
+    cutoffs = {name: np.broadcast_to(frequency_metrics(c)['cutoff_hz'], (n,))
+               for name, c in zip(SYSTEM_NAMES, coeffs)}
+
+    # La malla en frecuencia solo se usa para clasificar el tipo de filtro
+    num, den = (np.broadcast_to(np.atleast_2d(c), (n, c.shape[-1])) for c in coeffs[2])
+    powers = jw_powers(w, max(num.shape[-1], den.shape[-1]) - 1)
+    filter_types = determine_filter_type_batch(coeffs_magnitude_db(num, den, w, powers),
+                                               w / (2 * np.pi))
+    gains = dc_gain(*cancel_common_s(num, den))
+    # Polos y ceros de cada etapa factorizada, sin expandir H_total
+    sos = np.broadcast_to(cascade_sos(stages_from_configs(values, configs)), (n, 2, 6))
+    roots = cascade_roots(sos)
+
+    results = []
+    for i in range(n):
+        zeros, poles = roots[i]
+        results.append({
+            'cutoff_hz': {name: _finite_or_none(cutoffs[name][i]) for name in SYSTEM_NAMES},
+            'filter_type': str(filter_types[i]),
+            'dc_gain': _finite_or_none(gains[i]),
+            'poles': _complex_list(poles),
+            'zeros': _complex_list(zeros),
+            'stable': bool(np.all(poles.real < 0)),
+        })
+    return results
+
+
+def analyze_records(records, w=DEFAULT_W):
+    """Analiza un bloque de registros; devuelve un dict de resultado por registro."""
+    results = [None] * len(records)
+    groups = {}
+    for i, record in enumerate(records):
+        try:
+            values, topology = parse_record(record)
+        except (ValueError, TypeError) as e:
+            results[i] = {'error': str(e)}
+            continue
+        groups.setdefault((topology, effective_topology(values, topology)), []).append((i, values))
+
+    for (topology, effective), items in groups.items():
+        for i, result in _analyze_items(items, effective, w):
+            if 'error' not in result:
+                result['configs'] = dict(zip(CONFIG_KEYS, topology))
+            results[i] = result
+    return results
+
+
+def _analyze_items(items, topology, w):
+    """Resultados (i, dict) de un grupo; si el lote falla se analiza diseño a diseño.
+
+    Así un diseño que no se puede analizar produce su línea de error sin
+    abortar el resto del bloque.
+    """
+    values = {name: np.array([v[name] for _, v in items]) for name in COMPONENT_NAMES}
+    try:
+        return list(zip((i for i, _ in items), analyze_group(values, topology, w)))
+    except (ValueError, ArithmeticError, np.linalg.LinAlgError) as e:
+        if len(items) == 1:
+            return [(items[0][0], {'error': str(e)})]
+    return [pair for item in items for pair in _analyze_items([item], topology, w)]
+
+
+def run_batch(input_stream, output_stream, fmt='jsonl', chunk_size=1000):
+    """Lee registros de input_stream y escribe un resultado JSONL por diseño.
+
+    Los registros se procesan en bloques de chunk_size, así que la memoria es
+    acotada sin importar la longitud de la entrada. Los registros inválidos
+    producen una línea con la clave 'error'. Devuelve el número de registros.
+    """
+    records = read_records(input_stream, fmt)
+    index = 0
+    while True:
+        chunk = list(itertools.islice(records, chunk_size))
+        if not chunk:
+            break
+        for record, result in zip(chunk, analyze_records(chunk)):
+            line = {'index': index}
+            if 'id' in record:
+                line['id'] = record['id']
+            line.update(result)
+            output_stream.write(json.dumps(line, ensure_ascii=False, allow_nan=False) + '\n')
+            index += 1
+    return index
+
+
+def open_stream(path, mode):
+    """Abre un archivo o devuelve stdin/stdout si path es '-'."""
+    if path == '-':
+        return sys.stdin if 'r' in mode else sys.stdout
+    return open(path, mode, encoding='utf-8', newline='' if 'r' in mode else None)
+
+
+def guess_format(path):
+    """Deduce el formato por la extensión del archivo (por defecto JSONL)."""
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
@@ -0,0 +1,201 @@
+"""
+Respuesta en frecuencia vectorizada para lotes de diseños con la misma topología.
+
+En lugar de llamar a control.bode sistema por sistema, se evalúan los
+polinomios de numerador y denominador de los N diseños a la vez contra una
+matriz precalculada de potencias de jω, obteniendo H(jω) de forma (N, M).
+"""
+import numpy as np
+from numeric_tf import (COMPONENT_NAMES, calc_individual_coeffs, normalize_coeffs,
+                        values_by_name)
+from instrumentation import traced
+from utils import FILTER_TYPES
+
+# Malla de frecuencias usada por analyze_responses_no_plots y run_complete_analysis
+DEFAULT_W = np.logspace(-1, 5, 1000)
+
+SYSTEM_NAMES = ('H1', 'H2', 'H_total')
+
+
+def stack_values(valores_list):
+    """Convierte una lista de diccionarios `valores` en {nombre: arreglo (N,)}."""
+    rows = [values_by_name(v) for v in valores_list]
+    return {name: np.array([row[name] for row in rows], dtype=float)
+            for name in COMPONENT_NAMES}
+
+
+def jw_powers(w, order):
+    """Matriz (order+1, M) con (jω)**k en potencias descendentes, k = order..0."""
+    jw = 1j * np.asarray(w, dtype=float)
+    return jw[None, :] ** np.arange(order, -1, -1)[:, None]
+
+
+def polyval_jw(coeffs, powers):
+    """Evalúa polinomios (..., n) sobre una matriz de potencias de jω.
+
+    `powers` debe tener al menos n filas; se usan las n últimas (grados n-1..0).
+    """
+    coeffs = np.asarray(coeffs, dtype=float)
+    return coeffs @ powers[powers.shape[0] - coeffs.shape[-1]:]
+
+
+def _fill_response(num, den, P, Q, H, mag_db, phase, chunk_size):
+    """Llena H, mag_db y phase (N, M) por bloques de filas.
+
+    Se trabaja con aritmética real (las potencias pares de jω son reales y las
+    impares imaginarias) y con búferes reutilizados, lo que evita los
+    temporales complejos de tamaño (N, M).
+    """
+    Pn, Qn = P[P.shape[0] - num.shape[-1]:], Q[Q.shape[0] - num.shape[-1]:]
+    Pd, Qd = P[P.shape[0] - den.shape[-1]:], Q[Q.shape[0] - den.shape[-1]:]
+    buf = np.empty((5, min(chunk_size, num.shape[0]), P.shape[1]))
+    for i in range(0, num.shape[0], chunk_size):
+        j = min(i + chunk_size, num.shape[0])
+        Nr, Ni, Dr, Di, D2 = buf[:, :j - i]
+        np.matmul(num[i:j], Pn, out=Nr)
+        np.matmul(num[i:j], Qn, out=Ni)
+        np.matmul(den[i:j], Pd, out=Dr)
+        np.matmul(den[i:j], Qd, out=Di)
+        np.multiply(Dr, Dr, out=D2)
+        D2 += Di * Di
+
+        # H = N * conj(D) / |D|^2
+        Hr, Hi = H[i:j].real, H[i:j].imag
+        np.multiply(Nr, Dr, out=Hr)
+        Hr += Ni * Di
+        Hr /= D2
+        np.multiply(Ni, Dr, out=Hi)
+        Hi -= Nr * Di
+        Hi /= D2
+
+        m = mag_db[i:j]
+        np.multiply(Hr, Hr, out=m)
+        m += Hi * Hi
+        np.maximum(m, 1e-20, out=m)  # Evitar log(0)
+        np.log10(m, out=m)
+        m *= 10
+
+        # Fase desenvuelta: se acumulan los saltos llevados a (-180°, 180°]
+        p = phase[i:j]
+        np.arctan2(Hi, Hr, out=p)
+        step = np.diff(p, axis=-1)
+        step -= 2 * np.pi * np.round(step / (2 * np.pi))
+        np.cumsum(step, axis=-1, out=p[:, 1:])
+        p[:, 1:] += p[:, :1]
+        np.degrees(p, out=p)
+
+
+@traced('coeffs_frequency_response')
+def coeffs_frequency_response(num, den, w=None, powers=None, chunk_size=64):
+    """Calcula (H, mag_db, phase_deg), de forma (N, M), para coeficientes (N, n)."""
+    w = DEFAULT_W if w is None else np.asarray(w, dtype=float)
+    num = np.atleast_2d(num)
+    den = np.atleast_2d(den)
+    if powers is None:
+        powers = jw_powers(w, max(num.shape[-1], den.shape[-1]) - 1)
+    n = max(num.shape[0], den.shape[0])
+    num = np.broadcast_to(num, (n, num.shape[-1]))
+    den = np.broadcast_to(den, (n, den.shape[-1]))
+    H = np.empty((n, w.size), dtype=complex)
+    mag_db = np.empty((n, w.size))
+    phase = np.empty((n, w.size))
+    _fill_response(num, den, np.ascontiguousarray(powers.real),
+                   np.ascontiguousarray(powers.imag), H, mag_db, phase, chunk_size)
+    return H, mag_db, phase
+
+
+def coeffs_magnitude_db(num, den, w=None, powers=None, chunk_size=256):
+    """Calcula solo la magnitud en dB, de forma (N, M), para coeficientes (N, n).
+
+    Más barato que coeffs_frequency_response cuando no se necesitan H ni la
+    fase: |H|^2 = |N|^2 / |D|^2 con aritmética real.
+    """
+    w = DEFAULT_W if w is None else np.asarray(w, dtype=float)
+    num = np.atleast_2d(num)
+    den = np.atleast_2d(den)
+    if powers is None:
+        powers = jw_powers(w, max(num.shape[-1], den.shape[-1]) - 1)
+    P = np.ascontiguousarray(powers.real)
+    Q = np.ascontiguousarray(powers.imag)
+    n = max(num.shape[0], den.shape[0])
+    num = np.broadcast_to(num, (n, num.shape[-1]))
+    den = np.broadcast_to(den, (n, den.shape[-1]))
+    Pn, Qn = P[P.shape[0] - num.shape[-1]:], Q[Q.shape[0] - num.shape[-1]:]
+    Pd, Qd = P[P.shape[0] - den.shape[-1]:], Q[Q.shape[0] - den.shape[-1]:]
+    mag_db = np.empty((n, w.size))
+    buf = np.empty((2, min(chunk_size, n), w.size))
+    for i in range(0, n, chunk_size):
+        j = min(i + chunk_size, n)
+        re, im = buf[:, :j - i]
+        m = mag_db[i:j]
+        np.matmul(num[i:j], Pn, out=re)
+        np.matmul(num[i:j], Qn, out=im)
+        np.multiply(re, re, out=m)
+        m += im * im
+        np.matmul(den[i:j], Pd, out=re)
+        np.matmul(den[i:j], Qd, out=im)
+        re *= re
+        re += im * im
+        m /= re
+        np.maximum(m, 1e-20, out=m)  # Evitar log(0)
+        np.log10(m, out=m)
+        m *= 10
+    return mag_db
+
+
+def cutoff_frequency(mag_db, w):
+    """Frecuencia de corte (Hz) con el criterio de analyze_responses_no_plots.
+
+    Para cada fila de mag_db (..., M) devuelve la frecuencia de la malla cuya
+    magnitud está más cerca de max(mag_db) - 3 dB.
+    """
+    target = mag_db.max(axis=-1, keepdims=True) - 3
+    return w[np.abs(mag_db - target).argmin(axis=-1)] / (2 * np.pi)
+
+
+def determine_filter_type_batch(mag_db, freq):
+    """Versión vectorizada de responses.determine_filter_type para magnitudes (..., M)."""
+    mag_db = np.asarray(mag_db)
+    log_freq = np.log10(freq)
+    # La media de las diferencias de los últimos 100 puntos se reduce a sus extremos
+    high_freq_slope = (mag_db[..., -1] - mag_db[..., -100]) / (log_freq[-1] - log_freq[-100])
+    low_freq_gain = mag_db[..., 0]
+    high_freq_gain = mag_db[..., -1]
+    return np.select(
+        [np.abs(high_freq_slope) < 10,
+         high_freq_gain > low_freq_gain,
+         (high_freq_gain < low_freq_gain) & (np.abs(high_freq_slope) < 30),
+         high_freq_gain < low_freq_gain],
+        list(FILTER_TYPES[:-1]), default=FILTER_TYPES[-1])
+
+
+def batch_frequency_response(values, configs, w=None, powers=None, normalize=False,
+                             chunk_size=64):
+    """Calcula H(jω) para N diseños de la misma topología.
+
+    values: diccionario {nombre: arreglo (N,)} (ver stack_values) o un único
+        diccionario `valores`.
+    configs: configuraciones de impedancia comunes a todos los diseños.
+    powers: matriz de jw_powers ya calculada para `w`, para reutilizarla entre
+        lotes. Debe tener al menos tantas filas como el grado del sistema total + 1.
+    normalize: si True se usan los coeficientes normalizados de get_numeric_tf
+        (misma respuesta que control.bode sobre esos sistemas); si False se usa
+        la ganancia real de cada etapa.
+    chunk_size: filas procesadas por bloque; acota el tamaño de los temporales.
+
+    Devuelve ({'H1'|'H2'|'H_total': {'H', 'mag_db', 'phase_deg'}}, w), cada
+    arreglo de forma (N, M).
+    """
+    w = DEFAULT_W if w is None else np.asarray(w, dtype=float)
+    coeffs = calc_individual_coeffs(values, configs)
+    if normalize:
+        coeffs = [normalize_coeffs(num, den) for num, den in coeffs]
+    if powers is None:
+        order = max(max(num.shape[-1], den.shape[-1]) for num, den in coeffs) - 1
+        powers = jw_powers(w, order)
+
+    results = {}
+    for name, (num, den) in zip(SYSTEM_NAMES, coeffs):
+        H, mag_db, phase = coeffs_frequency_response(num, den, w, powers, chunk_size)
+        results[name] = {'H': H, 'mag_db': mag_db, 'phase_deg': phase}
+    return results, w
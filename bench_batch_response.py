@@ -0,0 +1,72 @@
+"""
+Benchmark: respuesta en frecuencia por lotes frente al bucle con control.bode.
+"""
+import argparse
+import time
+import warnings
+import numpy as np
+import control
+from numeric_tf import get_numeric_tfs
+from batch_response import DEFAULT_W, batch_frequency_response, jw_powers
+
+CONFIGS = {
+    'config1': {'type': 'RC', 'config': 2},
+    'input1': {'type': 'RC', 'config': 1},
+    'config2': {'type': 'RC', 'config': 2},
+    'input2': {'type': 'R', 'config': None},
+}
+
+
+def random_designs(n, seed=0):
+    """Genera n juegos de componentes aleatorios (1 kΩ-100 kΩ, 1 nF-100 nF)."""
+    rng = np.random.default_rng(seed)
+    values = {name: 10 ** rng.uniform(3, 5, n) for name in ('R1', 'R2', 'R3', 'R4')}
+    values.update({name: 10 ** rng.uniform(-9, -7, n) for name in ('C1', 'C2', 'Ci1')})
+    values['Ci2'] = np.zeros(n)
+    return values
+
+
+def run(n_loop, n_batch):
+    w = DEFAULT_W
+    values = random_designs(max(n_loop, n_batch))
+
+    # Bucle actual: un control.bode por sistema
+    loop_values = [{name: float(v[i]) for name, v in values.items()} for i in range(n_loop)]
+    t0 = time.perf_counter()
+    systems = [get_numeric_tfs(v, CONFIGS) for v in loop_values]
+    t_build = (time.perf_counter() - t0) / n_loop
+    t0 = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        loop_mag = [[control.bode(sys, w, plot=False)[0] for sys in design]
+                    for design in systems]
+    t_loop = (time.perf_counter() - t0) / n_loop
+
+    # Comprobación de equivalencia con los coeficientes normalizados
+    check = {name: v[:n_loop] for name, v in values.items()}
+    res, _ = batch_frequency_response(check, CONFIGS, w, normalize=True)
+    err = max(np.max(np.abs(np.abs(res[name]['H']) - np.array([m[k] for m in loop_mag]))
+                     / np.array([m[k] for m in loop_mag]))
+              for k, name in enumerate(('H1', 'H2', 'H_total')))
+
+    # Lote completo reutilizando la matriz de potencias
+    powers = jw_powers(w, 8)
+    batch = {name: v[:n_batch] for name, v in values.items()}
+    t0 = time.perf_counter()
+    batch_frequency_response(batch, CONFIGS, w, powers=powers)
+    t_batch = (time.perf_counter() - t0) / n_batch
+
+    print(f"control.bode (bucle, {n_loop} diseños): {t_loop * 1e3:.3f} ms/diseño")
+    print(f"  + get_numeric_tfs por diseño:       {(t_loop + t_build) * 1e3:.3f} ms/diseño")
+    print(f"Lote vectorizado ({n_batch} diseños):   {t_batch * 1e3:.4f} ms/diseño")
+    print(f"Aceleración: {t_loop / t_batch:.1f}x (solo bode), "
+          f"{(t_loop + t_build) / t_batch:.1f}x (incluyendo la construcción)")
+    print(f"Error relativo máximo en |H|: {err:.2e}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--loop', type=int, default=200, help='diseños en el bucle con control.bode')
+    parser.add_argument('--batch', type=int, default=2000, help='diseños en el lote vectorizado')
+    args = parser.parse_args()
+    run(args.loop, args.batch)
@@ -0,0 +1,76 @@
+"""
+Benchmark: tiempo de importación de los módulos sin interfaz gráfica.
+
+Cada módulo se importa en un proceso nuevo (sin caché de módulos) y se mide el
+tiempo del import y el del proceso completo, además de qué dependencias
+pesadas (matplotlib, control, scipy, sympy) quedaron cargadas. Con --check
+termina con error si algún módulo de HEADLESS carga alguna de ellas.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+import numpy as np
+
+HEADLESS = ('numeric_tf', 'batch_response', 'frequency_metrics', 'time_response',
+            'stability_margins', 'cascade', 'analysis', 'sweep', 'batch_analysis',
+            'monte_carlo', 'sensitivity', 'main')
+HEAVY = ('matplotlib', 'control', 'scipy', 'sympy')
+
+_PROBE = """
+import sys, time, json
+t0 = time.perf_counter()
+import {module}
+dt = time.perf_counter() - t0
+print(json.dumps({{'import_s': dt, 'heavy': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module, repeat):
+    """Mide `repeat` importaciones de module en procesos nuevos."""
+    code = _PROBE.format(module=module, heavy=HEAVY)
+    imports, totals, heavy = [], [], set()
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                             check=True)
+        totals.append(time.perf_counter() - t0)
+        data = json.loads(out.stdout.strip().splitlines()[-1])
+        imports.append(data['import_s'])
+        heavy.update(data['heavy'])
+    return {
+        'module': module,
+        'import_median_ms': float(np.median(imports)) * 1e3,
+        'import_min_ms': float(np.min(imports)) * 1e3,
+        'process_median_ms': float(np.median(totals)) * 1e3,
+        'heavy': sorted(heavy),
+    }
+
+
+def run(modules, repeat):
+    results = [measure(module, repeat) for module in modules]
+    print(f"{'módulo':<18} {'import (ms)':>12} {'mín (ms)':>10} {'proceso (ms)':>13}  pesados")
+    for r in results:
+        print(f"{r['module']:<18} {r['import_median_ms']:12.1f} {r['import_min_ms']:10.1f} "
+              f"{r['process_median_ms']:13.1f}  {', '.join(r['heavy']) or '-'}")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('modules', nargs='*', default=list(HEADLESS),
+                        help='módulos a medir (por defecto HEADLESS)')
+    parser.add_argument('--repeat', type=int, default=5, help='procesos por módulo')
+    parser.add_argument('--json', help='escribe los resultados en este archivo JSON')
+    parser.add_argument('--check', action='store_true',
+                        help='falla si un módulo de HEADLESS carga una dependencia pesada')
+    args = parser.parse_args()
+    results = run(args.modules, args.repeat)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.check:
+        offenders = [r['module'] for r in results if r['module'] in HEADLESS and r['heavy']]
+        if offenders:
+            sys.exit(f"Módulos sin interfaz que cargan dependencias pesadas: {offenders}")
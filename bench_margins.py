@@ -0,0 +1,109 @@
+"""
+Benchmark: stability_margins polinómico frente a control.margin.
+
+Para cada topología se calculan H1, H2 y H_total normalizados (como
+get_numeric_tfs) de --designs diseños aleatorios y se mide:
+  - control.margin en un bucle, un sistema por llamada
+  - stability_margins sobre el lote completo de cada sistema
+  - stability_margins con un sistema por llamada (el camino interactivo de
+    AnalysisResult), que debe coincidir con la fila del lote
+y se comparan todos los cruces con los de control.stability_margins
+(returnall=True): frecuencias y márgenes de los cruces por -180° y por 0 dB.
+Los ceros de H sobre el eje jω, que control cuenta como cruces por -180° con
+margen infinito, no se comparan.
+Los sistemas con H(jω) real o |H(jω)| = 1 en todas las frecuencias (etapas
+resistivas) se cuentan aparte: control no informa cruces en ellos.
+
+control no cancela los factores s comunes de numerador y denominador, así que
+se le pasan ya cancelados.
+
+Uso: python bench_margins.py --designs 50 --topologies 81
+"""
+import argparse
+import itertools
+import time
+import warnings
+import numpy as np
+import control
+from utils import CONFIG_NAMES, config_from_name
+from numeric_tf import calc_individual_coeffs, normalize_coeffs, cancel_common_s
+from batch_analysis import CONFIG_KEYS
+from bench_suite import designs
+from stability_margins import stability_margins
+
+# Diferencia relativa máxima para considerar iguales dos cruces
+RTOL = 1e-6
+
+
+def _mismatch(w, values, w_ref, values_ref):
+    """True si los cruces (w, values) no coinciden con los de control."""
+    keep = np.isfinite(w)
+    w, values = w[keep], values[keep]
+    order = np.argsort(w_ref)
+    w_ref, values_ref = w_ref[order], values_ref[order]
+    if w.size != w_ref.size:
+        return True
+    return not (np.allclose(w, w_ref, rtol=RTOL, atol=1e-9)
+                and np.allclose(values, values_ref, rtol=RTOL, atol=1e-6))
+
+
+def run(n_designs, n_topologies):
+    values = designs(n_designs, seed=4)
+    t_loop = t_batch = t_single = 0.0
+    n_systems = degenerate = single_mismatches = 0
+    mismatches = {'cruces por -180°': 0, 'cruces por 0 dB': 0}
+    for topology in list(itertools.product(CONFIG_NAMES, repeat=4))[:n_topologies]:
+        configs = {key: config_from_name(name) for key, name in zip(CONFIG_KEYS, topology)}
+        for num, den in calc_individual_coeffs(values, configs):
+            num, den = normalize_coeffs(num, den)
+            num = np.broadcast_to(num, (n_designs, num.shape[-1]))
+            den = np.broadcast_to(den, (n_designs, den.shape[-1]))
+            t0 = time.perf_counter()
+            batch = stability_margins((num, den))
+            t_batch += time.perf_counter() - t0
+
+            for i in range(n_designs):
+                sys = control.TransferFunction(*cancel_common_s(num[i], den[i]))
+                t0 = time.perf_counter()
+                control.margin(sys)
+                t_loop += time.perf_counter() - t0
+                t0 = time.perf_counter()
+                single = stability_margins(sys)
+                t_single += time.perf_counter() - t0
+                n_systems += 1
+                single_mismatches += not all(
+                    np.array_equal(single[key], batch[key][i], equal_nan=True)
+                    for key in ('gm', 'pm', 'wg', 'wp'))
+                if batch['real_response'][i] or batch['unity_gain'][i]:
+                    degenerate += 1
+                    continue
+                gm, pm, _, wg, wp, _ = control.stability_margins(sys, returnall=True)
+                # control cuenta los ceros de H sobre el eje jω (gm = inf)
+                finite = np.isfinite(gm)
+                mismatches['cruces por -180°'] += _mismatch(
+                    batch['wg_all'][i], batch['gm_all'][i], wg[finite], gm[finite])
+                mismatches['cruces por 0 dB'] += _mismatch(
+                    batch['wp_all'][i], batch['pm_all'][i], wp, pm)
+    return n_systems, t_loop, t_batch, t_single, degenerate, mismatches, single_mismatches
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--designs', type=int, default=50, help="diseños por topología")
+    parser.add_argument('--topologies', type=int, default=81, help="topologías a recorrer (1-81)")
+    args = parser.parse_args()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        n, t_loop, t_batch, t_single, degenerate, mismatches, single_mismatches = \
+            run(args.designs, args.topologies)
+    print(f"Sistemas comparados: {n}")
+    print(f"control.margin (bucle):     {t_loop / n * 1e3:.3f} ms/sistema")
+    print(f"stability_margins (lotes):  {t_batch / n * 1e3:.4f} ms/sistema")
+    print(f"stability_margins (bucle):  {t_single / n * 1e3:.3f} ms/sistema")
+    print(f"Aceleración: {t_loop / t_batch:.1f}x")
+    print(f"\nSistemas con H(jω) real o |H(jω)| = 1 (sin cruces en control): {degenerate}")
+    for key, count in mismatches.items():
+        print(f"Sistemas cuyos {key} difieren de control: {count}")
+    print(f"Sistemas cuyos márgenes por llamada difieren de los del lote: {single_mismatches}")
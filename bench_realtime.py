@@ -0,0 +1,170 @@
+"""
+Benchmark del motor de tiempo real (realtime_engine.RealtimeFilter).
+
+Para cada tamaño de bloque se procesan --blocks bloques de ruido y se mide la
+duración de cada uno: muestras/s, latencia mediana, p99 y máxima por bloque
+frente al presupuesto (duración del bloque a --fs) y número de bloques que lo
+exceden. También se informa:
+  - la diferencia máxima con scipy.signal.sosfilt sobre la misma señal
+  - bytes reservados por bloque (tracemalloc) en régimen permanente
+  - el costo de update() y la latencia máxima y los bloques que exceden el
+    presupuesto mientras otro hilo intercambia los coeficientes cada
+    --swap-interval segundos (update() retiene el GIL, así que un bloque
+    puede retrasarse hasta su duración)
+  - muestras/s de sosfilt bloque a bloque como referencia
+
+Uso: python bench_realtime.py --block-size 64 --block-size 256 --fs 48000
+"""
+import argparse
+import json
+import threading
+import time
+import tracemalloc
+import warnings
+import numpy as np
+from scipy import signal
+from utils import CONFIG_NAMES, config_from_name
+from batch_analysis import CONFIG_KEYS
+from realtime_engine import RealtimeFilter, design_system
+
+# Diseño nominal y el alternativo que se intercambia durante la prueba
+NOMINAL = {'R1': 1e3, 'R2': 1e4, 'R3': 1e3, 'R4': 2e3, 'C1': 1.6e-8, 'C2': 1e-8,
+           'Ci1': 1e-7, 'Ci2': 0.0}
+ALTERNATE = dict(NOMINAL, R2=1.2e4, C1=2.2e-8)
+
+
+def _latencies(engine, x, blocks):
+    """Duración (ns) de cada bloque; x tiene blocks * block_size muestras."""
+    B = engine.block_size
+    times = np.empty(blocks, dtype=np.int64)
+    out = np.empty((B, engine.channels))
+    for k in range(blocks):
+        t0 = time.perf_counter_ns()
+        engine.process(x[k * B:(k + 1) * B], out)
+        times[k] = time.perf_counter_ns() - t0
+    return times
+
+
+def _allocated_per_block(engine, x, blocks=200):
+    B = engine.block_size
+    out = np.empty((B, engine.channels))
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    for k in range(blocks):
+        engine.process(x[k * B:(k + 1) * B], out)
+    allocated = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    return allocated / blocks
+
+
+def bench_block_size(systems, fs, block_size, blocks, channels, swap_interval):
+    nominal, alternate = systems
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal((blocks * block_size, channels))
+    engine = RealtimeFilter(nominal, fs, block_size, channels)
+    _latencies(engine, x, min(blocks, 50))  # Calentamiento
+    engine.reset()
+
+    times = _latencies(engine, x, blocks)
+    total_s = times.sum() * 1e-9
+    budget_ns = engine.latency_budget_s * 1e9
+
+    # Equivalencia con sosfilt sobre la señal completa
+    engine.reset()
+    y = np.concatenate([engine.process(x[k * block_size:(k + 1) * block_size]).copy()
+                        for k in range(blocks)])
+    ref = signal.sosfilt(engine.sos, x, axis=0)
+    error = float(np.max(np.abs(y - ref)) / max(np.max(np.abs(ref)), 1e-300))
+
+    allocated = _allocated_per_block(engine, x, min(blocks, 200))
+
+    t0 = time.perf_counter()
+    for k in range(20):
+        engine.update(alternate if k % 2 == 0 else nominal)
+    update_s = (time.perf_counter() - t0) / 20
+
+    # Latencia mientras otro hilo intercambia coeficientes
+    stop = threading.Event()
+
+    def swapper():
+        k = 0
+        while not stop.wait(swap_interval):
+            engine.update(alternate if k % 2 == 0 else nominal)
+            k += 1
+
+    thread = threading.Thread(target=swapper)
+    thread.start()
+    try:
+        swap_times = _latencies(engine, x, blocks)
+    finally:
+        stop.set()
+        thread.join()
+
+    # Referencia: sosfilt bloque a bloque con estado (reserva la salida en cada bloque)
+    zi = np.zeros((engine.sos.shape[0], 2, channels))
+    t0 = time.perf_counter()
+    for k in range(blocks):
+        _, zi = signal.sosfilt(engine.sos, x[k * block_size:(k + 1) * block_size], axis=0, zi=zi)
+    sosfilt_s = time.perf_counter() - t0
+
+    return {
+        'block_size': block_size,
+        'order': engine.order,
+        'samples_per_s': blocks * block_size / total_s,
+        'median_us': float(np.median(times)) / 1e3,
+        'p99_us': float(np.percentile(times, 99)) / 1e3,
+        'max_us': float(times.max()) / 1e3,
+        'budget_us': budget_ns / 1e3,
+        'overruns': int(np.count_nonzero(times > budget_ns)),
+        'max_error': error,
+        'bytes_per_block': allocated,
+        'update_us': update_s * 1e6,
+        'max_with_swaps_us': float(swap_times.max()) / 1e3,
+        'overruns_with_swaps': int(np.count_nonzero(swap_times > budget_ns)),
+        'sosfilt_samples_per_s': blocks * block_size / sosfilt_s,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fs', type=float, default=48000.0, help="frecuencia de muestreo (Hz)")
+    parser.add_argument('--block-size', type=int, action='append',
+                        help="muestras por bloque (puede repetirse; por defecto 32, 64, 256 y 1024)")
+    parser.add_argument('--blocks', type=int, default=2000, help="bloques medidos por tamaño")
+    parser.add_argument('--channels', type=int, default=1, help="canales por bloque")
+    parser.add_argument('--system', choices=('H1', 'H2', 'H_total'), default='H_total',
+                        help="sistema del diseño a aplicar")
+    for key, default in zip(CONFIG_KEYS, ('paralelo', 'serie', 'paralelo', 'R')):
+        parser.add_argument(f'--{key}', choices=list(CONFIG_NAMES), default=default,
+                            help=f"configuración de {key} (por defecto {default})")
+    parser.add_argument('--swap-interval', type=float, default=0.001,
+                        help="segundos entre intercambios de coeficientes en la prueba con hilo")
+    parser.add_argument('--json', help="escribe los resultados en este archivo JSON")
+    args = parser.parse_args()
+
+    configs = {key: config_from_name(getattr(args, key)) for key in CONFIG_KEYS}
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        systems = (design_system(NOMINAL, configs, args.system),
+                   design_system(ALTERNATE, configs, args.system))
+    results = [bench_block_size(systems, args.fs, block_size, args.blocks, args.channels,
+                                args.swap_interval)
+               for block_size in args.block_size or (32, 64, 256, 1024)]
+
+    print(f"{'bloque':>7} {'orden':>6} {'Mmuestras/s':>12} {'mediana µs':>11} {'p99 µs':>9} "
+          f"{'máx µs':>9} {'presup. µs':>11} {'excesos':>8} {'máx c/swap':>11} "
+          f"{'exc. c/swap':>12} "
+          f"{'update µs':>10} {'B/bloque':>9} {'error':>9} {'sosfilt Mm/s':>13}")
+    for r in results:
+        print(f"{r['block_size']:7d} {r['order']:6d} {r['samples_per_s'] / 1e6:12.2f} "
+              f"{r['median_us']:11.1f} {r['p99_us']:9.1f} {r['max_us']:9.1f} "
+              f"{r['budget_us']:11.1f} {r['overruns']:8d} {r['max_with_swaps_us']:11.1f} "
+              f"{r['overruns_with_swaps']:12d} "
+              f"{r['update_us']:10.1f} {r['bytes_per_block']:9.1f} {r['max_error']:9.1e} "
+              f"{r['sosfilt_samples_per_s'] / 1e6:13.2f}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'fs': args.fs, 'system': args.system,
+                       'topology': [getattr(args, key) for key in CONFIG_KEYS],
+                       'results': results}, f, indent=2)
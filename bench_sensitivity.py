@@ -0,0 +1,161 @@
+"""
+Benchmark: sensibilidades analíticas frente a diferencias finitas con get_numeric_tf.
+
+Para cada topología se toman --designs diseños aleatorios y se mide:
+  - diferencias finitas centradas de H_total: 1 + 2*8 evaluaciones de
+    get_numeric_tf (SymPy) por diseño, con polos, ceros y frecuencia de corte
+    de cada sistema perturbado
+  - sensitivities sobre el lote completo, en una llamada
+La exactitud se compara con diferencias finitas de los coeficientes exactos
+(calc_individual_coeffs): get_numeric_tf anula los coeficientes normalizados
+menores que COEFF_TOL, lo que puede eliminar polos o ceros, y normaliza
+numerador y denominador por separado, lo que cambia la ganancia DC. Se
+informan la mayor diferencia para los polos y ceros simples, la ganancia DC y
+la frecuencia de corte, y cuántos diseños da distintos get_numeric_tf.
+
+Uso: python bench_sensitivity.py --designs 20 --topologies 81
+"""
+import argparse
+import itertools
+import time
+import warnings
+import numpy as np
+from sympy import symbols
+from utils import CONFIG_NAMES, config_from_name
+from numeric_tf import (COMPONENT_NAMES, calc_individual_coeffs, system_coeffs, cancel_common_s,
+                        batch_roots, dc_gain)
+from transfer_function import calc_individual_transfer_functions, get_numeric_tf
+from frequency_metrics import frequency_metrics
+from batch_analysis import CONFIG_KEYS
+from bench_suite import designs
+from sensitivity import sensitivities
+
+# Paso relativo de las diferencias finitas
+STEP = 1e-6
+# Separación relativa mínima para comparar una raíz (las repetidas no son derivables)
+SIMPLE_ROOT_SEPARATION = 1e-2
+
+
+def _symbolic(H, s):
+    """Coeficientes de H_total evaluando la expresión de SymPy con get_numeric_tf."""
+    def coeffs(valores):
+        return system_coeffs(get_numeric_tf(H, valores, s))
+    return coeffs
+
+
+def _exact(configs):
+    """Coeficientes exactos de H_total (calc_individual_coeffs)."""
+    def coeffs(valores):
+        return system_coeffs(calc_individual_coeffs(valores, configs)[2])
+    return coeffs
+
+
+def _metrics(coeffs, valores):
+    """Polos, ceros, ganancia DC y frecuencia de corte de un sistema."""
+    num, den = cancel_common_s(*coeffs(valores))
+    return (batch_roots(den)[0], batch_roots(num)[0], dc_gain(num, den)[0],
+            frequency_metrics((num, den))['cutoff_hz'][0])
+
+
+def _matched(reference, roots):
+    """Reordena roots para emparejar cada una con la más cercana de reference."""
+    remaining = list(roots)
+    out = []
+    for r in reference:
+        out.append(remaining.pop(int(np.argmin(np.abs(np.array(remaining) - r)))))
+    return np.array(out)
+
+
+def _simple(roots):
+    if roots.size < 2:
+        return np.ones(roots.shape, dtype=bool)
+    gap = np.abs(roots[:, None] - roots[None, :])
+    np.fill_diagonal(gap, np.inf)
+    return gap.min(axis=-1) > SIMPLE_ROOT_SEPARATION * np.abs(roots)
+
+
+def _finite_differences(coeffs, valores, syms):
+    poles, zeros, _, _ = _metrics(coeffs, valores)
+    out = {'poles': np.zeros((poles.size, len(syms)), dtype=complex),
+           'zeros': np.zeros((zeros.size, len(syms)), dtype=complex),
+           'dc_gain': np.zeros(len(syms)), 'cutoff_hz': np.zeros(len(syms))}
+    for k, sym in enumerate(syms):
+        hi, lo = dict(valores), dict(valores)
+        hi[sym] = valores[sym] * (1 + STEP)
+        lo[sym] = valores[sym] * (1 - STEP)
+        (p_hi, z_hi, g_hi, c_hi), (p_lo, z_lo, g_lo, c_lo) = \
+            _metrics(coeffs, hi), _metrics(coeffs, lo)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out['poles'][:, k] = (_matched(poles, p_hi) - _matched(poles, p_lo)) / (2 * STEP * poles)
+            out['zeros'][:, k] = (_matched(zeros, z_hi) - _matched(zeros, z_lo)) / (2 * STEP * zeros)
+            out['dc_gain'][k] = np.log(g_hi / g_lo) / (2 * STEP)
+            out['cutoff_hz'][k] = np.log(c_hi / c_lo) / (2 * STEP)
+    out['poles'][poles == 0] = 0
+    out['zeros'][zeros == 0] = 0
+    return poles, zeros, out
+
+
+def _errors(result, i, poles, zeros, fd):
+    """Mayor diferencia por métrica entre sensitivities (diseño i) y fd."""
+    sens = result['sensitivity']
+    errors = {}
+    for key, roots in (('poles', poles), ('zeros', zeros)):
+        order = [int(np.argmin(np.abs(result[key][i] - r))) for r in roots]
+        ok = _simple(roots)
+        errors[key] = float(np.abs(sens[key][i][order] - fd[key])[ok].max(initial=0.0))
+    for key in ('dc_gain', 'cutoff_hz'):
+        error = np.abs(sens[key][i] - fd[key])
+        errors[key] = float(error.max()) if np.all(np.isfinite(fd[key])) else 0.0
+    return errors
+
+
+def run(n_designs, n_topologies):
+    values = designs(n_designs, seed=3)
+    syms = symbols(' '.join(COMPONENT_NAMES))
+    s = symbols('s')
+    R1, R2, R3, R4, C1, C2, Ci1, Ci2 = syms
+    t_fd = t_batch = 0.0
+    worst = dict.fromkeys(('poles', 'zeros', 'dc_gain', 'cutoff_hz'), 0.0)
+    truncated = 0
+    for topology in list(itertools.product(CONFIG_NAMES, repeat=4))[:n_topologies]:
+        configs = {key: config_from_name(name) for key, name in zip(CONFIG_KEYS, topology)}
+        H = calc_individual_transfer_functions(R1, R2, R3, R4, Ci1, Ci2, C1, C2, s, configs)[2]
+
+        t0 = time.perf_counter()
+        result = sensitivities(values, configs)
+        t_batch += time.perf_counter() - t0
+
+        for i in range(n_designs):
+            valores = {sym: values[sym.name][i] for sym in syms}
+            t0 = time.perf_counter()
+            symbolic = _finite_differences(_symbolic(H, s), valores, syms)
+            t_fd += time.perf_counter() - t0
+            exact = _finite_differences(_exact(configs), valores, syms)
+            for key, error in _errors(result, i, *exact).items():
+                worst[key] = max(worst[key], error)
+            try:
+                errors = _errors(result, i, *symbolic)
+                truncated += max(errors['poles'], errors['zeros'], errors['cutoff_hz']) > 1e-3
+            except (ValueError, IndexError):  # get_numeric_tf perdió polos o ceros
+                truncated += 1
+    return n_designs * n_topologies, t_fd, t_batch, worst, truncated
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--designs', type=int, default=20, help="diseños por topología")
+    parser.add_argument('--topologies', type=int, default=81, help="topologías a recorrer (1-81)")
+    args = parser.parse_args()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        n, t_fd, t_batch, worst, truncated = run(args.designs, args.topologies)
+    print(f"Diseños: {n}")
+    print(f"Diferencias finitas (get_numeric_tf): {t_fd / n * 1e3:.2f} ms/diseño")
+    print(f"sensitivities (lotes):                {t_batch / n * 1e3:.4f} ms/diseño")
+    print(f"Aceleración: {t_fd / t_batch:.0f}x")
+    print("\nMayor diferencia |S analítica - S diferencias finitas exactas|:")
+    for key, error in worst.items():
+        print(f"  {key:<10} {error:.2e}")
+    print(f"\nDiseños en que get_numeric_tf difiere (coeficientes truncados): {truncated}")
@@ -0,0 +1,109 @@
+"""
+Benchmark: step_metrics por polos y residuos frente a control.step_info.
+
+Para cada topología se calculan H1, H2 y H_total normalizados (como
+get_numeric_tfs) de --designs diseños aleatorios y se mide:
+  - control.step_info en un bucle, un sistema por llamada
+  - step_metrics sobre el lote completo de cada sistema
+y se comprueba la tolerancia declarada en step_metrics: tiempos dentro de
+STEP_INFO_TIME_STEPS pasos de la malla de control y valores dentro de
+STEP_INFO_RTOL relativo más el mayor cambio de la respuesta de control en un
+paso.
+
+control no cancela los factores s comunes de numerador y denominador (su
+ganancia DC queda 0/0 y devuelve NaN), así que se le pasan ya cancelados.
+Los sistemas impropios se omiten.
+
+Uso: python bench_step_metrics.py --designs 200 --topologies 81
+"""
+import argparse
+import itertools
+import time
+import warnings
+import numpy as np
+import control
+from utils import CONFIG_NAMES, config_from_name
+from numeric_tf import calc_individual_coeffs, normalize_coeffs, cancel_common_s
+from batch_analysis import CONFIG_KEYS
+from bench_suite import designs
+from step_metrics import step_metrics, STEP_INFO_KEYS, STEP_INFO_TIME_STEPS, STEP_INFO_RTOL
+
+TIME_KEYS = ('RiseTime', 'SettlingTime', 'PeakTime')
+
+
+def _errors(info, ref, T, y):
+    """Error de cada clave en unidades de su tolerancia (<= 1 si cumple)."""
+    dt = T[1] - T[0]
+    final = ref['SteadyStateValue']
+    # Lo que puede escaparse entre dos muestras de control
+    jump = np.max(np.abs(np.diff(y)))
+    errors = {}
+    for key in STEP_INFO_KEYS:
+        a, b = info[key], ref[key]
+        if a == b or (np.isnan(a) and np.isnan(b)):
+            errors[key] = 0.0
+        elif key in TIME_KEYS:
+            errors[key] = abs(a - b) / (STEP_INFO_TIME_STEPS * dt)
+        else:
+            allowed = STEP_INFO_RTOL * max(abs(b), abs(final)) + jump
+            if key in ('Overshoot', 'Undershoot'):
+                allowed = STEP_INFO_RTOL * max(abs(b), 100.0) + 100 * jump / abs(final)
+            errors[key] = abs(a - b) / allowed
+        if not np.isfinite(errors[key]):
+            errors[key] = np.inf
+    return errors
+
+
+def run(n_designs, n_topologies):
+    values = designs(n_designs, seed=2)
+    t_loop = t_batch = 0.0
+    n_systems = 0
+    worst = dict.fromkeys(STEP_INFO_KEYS, 0.0)
+    failures = dict.fromkeys(STEP_INFO_KEYS, 0)
+    for topology in list(itertools.product(CONFIG_NAMES, repeat=4))[:n_topologies]:
+        configs = {key: config_from_name(name) for key, name in zip(CONFIG_KEYS, topology)}
+        for num, den in calc_individual_coeffs(values, configs):
+            num, den = normalize_coeffs(num, den)
+            num = np.broadcast_to(num, (n_designs, num.shape[-1]))
+            den = np.broadcast_to(den, (n_designs, den.shape[-1]))
+            t0 = time.perf_counter()
+            try:
+                batch = step_metrics((num, den))
+            except ValueError:
+                continue
+            t_batch += time.perf_counter() - t0
+
+            for i in range(n_designs):
+                sys = control.TransferFunction(*cancel_common_s(num[i], den[i]))
+                t0 = time.perf_counter()
+                try:
+                    ref = control.step_info(sys)
+                except (ValueError, IndexError):
+                    continue
+                t_loop += time.perf_counter() - t0
+                n_systems += 1
+                T, y = control.step_response(sys)
+                errors = _errors({key: batch[key][i] for key in STEP_INFO_KEYS}, ref, T, y)
+                for key, error in errors.items():
+                    worst[key] = max(worst[key], error)
+                    failures[key] += error > 1
+    return n_systems, t_loop, t_batch, worst, failures
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--designs', type=int, default=200, help="diseños por topología")
+    parser.add_argument('--topologies', type=int, default=81, help="topologías a recorrer (1-81)")
+    args = parser.parse_args()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        n, t_loop, t_batch, worst, failures = run(args.designs, args.topologies)
+    print(f"Sistemas comparados: {n}")
+    print(f"control.step_info (bucle): {t_loop / n * 1e3:.3f} ms/sistema")
+    print(f"step_metrics (lotes):      {t_batch / n * 1e3:.4f} ms/sistema")
+    print(f"Aceleración: {t_loop / t_batch:.1f}x")
+    print(f"\n{'clave':<18} {'error máx. / tolerancia':>24} {'fuera de tolerancia':>20}")
+    for key in STEP_INFO_KEYS:
+        print(f"{key:<18} {worst[key]:24.3g} {failures[key]:20d}")
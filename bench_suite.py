@@ -0,0 +1,298 @@
+"""
+Suite de benchmarks de todas las etapas del análisis sobre todas las topologías.
+
+Para cada una de las 81 combinaciones de impedancias ('R', 'serie',
+'paralelo') en la entrada y la retroalimentación de las dos etapas se mide:
+  - un diseño: calc_individual_transfer_functions, get_numeric_tf (SymPy),
+    get_numeric_tfs (catálogo), analyze_stability, control.margin,
+    stability_margins, control.step_info, step_metrics, control.bode,
+    coeffs_frequency_response, frequency_metrics, analyze_responses_no_plots
+    completo y tras cambiar R4 en una AnalysisSession (solo se recalculan H2
+    y H_total)
+  - un lote de N diseños: calc_individual_coeffs, batch_frequency_response,
+    frequency_metrics, step_response, step_metrics, stability_margins,
+    sensitivities y batch_analysis.analyze_group
+
+control.bode y frequency_metrics no hacen lo mismo: bode evalúa |H| en los
+puntos de DEFAULT_W, mientras que frequency_metrics obtiene el pico y los
+cortes exactos resolviendo dos polinomios por sistema. Con un solo diseño el
+costo fijo de esas llamadas a numpy domina y frequency_metrics cuesta unas
+2-3 veces lo que control.bode (unos 0.6 ms por sistema); solo es más barato
+por diseño en lotes (batch/frequency_metrics).
+
+Los tiempos (mediana y mínimo de --repeat ejecuciones) se escriben en JSON y
+se comparan con una línea base guardada: por cada etapa se informa la media
+geométrica del cociente actual / base sobre todas las topologías, y con
+--check el programa falla si alguna etapa empeora más que --tolerance.
+
+Uso:
+  python bench_suite.py --update-baseline        # guarda la línea base
+  python bench_suite.py --check                  # compara con ella
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+import warnings
+import numpy as np
+import control
+from sympy import symbols
+from utils import CONFIG_NAMES, config_from_name
+from numeric_tf import COMPONENT_NAMES, calc_individual_coeffs, get_numeric_tfs
+from transfer_function import calc_individual_transfer_functions, get_numeric_tf, analyze_stability
+from batch_response import DEFAULT_W, batch_frequency_response, coeffs_frequency_response
+from frequency_metrics import frequency_metrics
+from time_response import plan_time_grid, step_response
+from step_metrics import step_metrics
+from stability_margins import stability_margins
+from sensitivity import sensitivities
+from responses import analyze_responses_no_plots
+from analysis import AnalysisSession
+from batch_analysis import CONFIG_KEYS, analyze_group
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_baseline.json')
+
+SINGLE_STAGES = ('calc_individual_transfer_functions', 'get_numeric_tf', 'get_numeric_tfs',
+                 'analyze_stability', 'control.margin', 'stability_margins', 'step_info',
+                 'step_metrics', 'control.bode', 'coeffs_frequency_response',
+                 'frequency_metrics', 'analyze_responses_no_plots', 'session.update')
+BATCH_STAGES = ('batch/calc_individual_coeffs', 'batch/batch_frequency_response',
+                'batch/frequency_metrics', 'batch/step_response', 'batch/step_metrics',
+                'batch/stability_margins', 'batch/sensitivities', 'batch/analyze_group')
+
+
+def topologies():
+    """Las 81 topologías como tuplas de nombres en el orden de CONFIG_KEYS."""
+    return list(itertools.product(CONFIG_NAMES, repeat=len(CONFIG_KEYS)))
+
+
+def designs(n, seed=0):
+    """n juegos de componentes (1 kΩ-100 kΩ, 1 nF-100 nF, todos los C presentes)."""
+    rng = np.random.default_rng(seed)
+    values = {name: 10 ** rng.uniform(3, 5, n) for name in ('R1', 'R2', 'R3', 'R4')}
+    values.update({name: 10 ** rng.uniform(-9, -7, n) for name in ('C1', 'C2', 'Ci1', 'Ci2')})
+    return values
+
+
+def _timed(func, repeat):
+    """Mediana y mínimo (s) de repeat llamadas a func.
+
+    Si func falla (p. ej. control.step_info con un sistema impropio) se
+    devuelve {'error': mensaje} y la etapa no entra en las comparaciones.
+    """
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        try:
+            func()
+        except Exception as e:
+            return {'error': f"{type(e).__name__}: {e}"}
+        times.append(time.perf_counter() - t0)
+    return {'median_s': float(np.median(times)), 'min_s': float(np.min(times))}
+
+
+def _quiet(func):
+    """Envuelve func para descartar lo que imprime."""
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func()
+    return run
+
+
+def _proper(sys):
+    return len(sys.num[0][0]) <= len(sys.den[0][0])
+
+
+def bench_single(topology, values, repeat):
+    """Tiempos por diseño de las etapas interactivas para una topología."""
+    configs = {key: config_from_name(name) for key, name in zip(CONFIG_KEYS, topology)}
+    syms = symbols('R1 R2 R3 R4 C1 C2 Ci1 Ci2')
+    R1, R2, R3, R4, C1, C2, Ci1, Ci2 = syms
+    s = symbols('s')
+    valores = dict(zip(syms, (values[name] for name in COMPONENT_NAMES)))
+
+    def symbolic():
+        return calc_individual_transfer_functions(R1, R2, R3, R4, Ci1, Ci2, C1, C2, s, configs)
+
+    H = symbolic()
+    systems = get_numeric_tfs(values, configs)
+    proper = [sys for sys in systems if _proper(sys)]
+    coeffs = calc_individual_coeffs(values, configs)
+    components = (None, None, values, configs)
+    session = AnalysisSession(components)
+    # Análisis completo previo del que update reutiliza H1
+    _timed(_quiet(lambda: analyze_responses_no_plots(result=session.result)), 1)
+
+    def update():
+        # Alterna R4 para que cada repetición cambie la segunda etapa
+        R4 = values['R4'] * (2 if session.result.valores['R4'] == values['R4'] else 1)
+        analyze_responses_no_plots(result=session.update(R4=R4))
+
+    stages = {
+        'calc_individual_transfer_functions': symbolic,
+        'get_numeric_tf': lambda: [get_numeric_tf(h, valores, s) for h in H],
+        'get_numeric_tfs': lambda: get_numeric_tfs(values, configs),
+        'analyze_stability': _quiet(lambda: analyze_stability(systems[2])),
+        'control.margin': lambda: [control.margin(sys) for sys in systems],
+        'stability_margins': lambda: [stability_margins(sys) for sys in systems],
+        'step_info': lambda: [control.step_info(sys) for sys in proper],
+        'step_metrics': lambda: [step_metrics(sys) for sys in proper],
+        'control.bode': lambda: [control.bode(sys, DEFAULT_W, plot=False) for sys in systems],
+        'coeffs_frequency_response': lambda: [coeffs_frequency_response(num, den, DEFAULT_W)
+                                              for num, den in coeffs],
+        'frequency_metrics': lambda: [frequency_metrics(c) for c in coeffs],
+        'analyze_responses_no_plots': _quiet(lambda: analyze_responses_no_plots(components)),
+        'session.update': _quiet(update),
+    }
+    return {name: _timed(func, repeat) for name, func in stages.items()}
+
+
+def bench_batch(topology, values, repeat):
+    """Tiempos por diseño (s / N) de las etapas por lotes para una topología."""
+    configs = {key: config_from_name(name) for key, name in zip(CONFIG_KEYS, topology)}
+    n = len(values['R1'])
+    coeffs = calc_individual_coeffs(values, configs)
+
+    def step():
+        # H1 siempre es propio; H_total puede no serlo
+        t = plan_time_grid(coeffs[0])
+        return step_response(coeffs[0], t)
+
+    stages = {
+        'batch/calc_individual_coeffs': lambda: calc_individual_coeffs(values, configs),
+        'batch/batch_frequency_response': lambda: batch_frequency_response(values, configs),
+        'batch/frequency_metrics': lambda: [frequency_metrics(c) for c in coeffs],
+        'batch/step_response': step,
+        'batch/step_metrics': lambda: step_metrics(coeffs[0]),
+        'batch/stability_margins': lambda: [stability_margins(c) for c in coeffs],
+        'batch/sensitivities': lambda: sensitivities(values, configs),
+        'batch/analyze_group': lambda: analyze_group(values, topology),
+    }
+    out = {}
+    for name, func in stages.items():
+        timing = _timed(func, repeat)
+        if 'error' not in timing:
+            timing = {key: value / n for key, value in timing.items()}
+        out[name] = timing
+    return out
+
+
+def run(n_topologies, n_batch, repeat):
+    """Ejecuta la suite y devuelve el documento JSON de resultados."""
+    single = {name: float(v[0]) for name, v in designs(1).items()}
+    batch = designs(n_batch, seed=1)
+    results = {}
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for topology in topologies()[:n_topologies]:
+            key = '-'.join(topology)
+            timings = bench_single(topology, single, repeat)
+            timings.update(bench_batch(topology, batch, repeat))
+            results[key] = timings
+            failed = [stage for stage, t in timings.items() if 'error' in t]
+            print(f"{key:<28} {len(timings) - len(failed):2d} etapas medidas"
+                  + (f", fallan: {', '.join(failed)}" if failed else ''), flush=True)
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'control': control.__version__,
+            'machine': platform.machine(),
+            'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'repeat': repeat,
+            'batch_size': n_batch,
+        },
+        'results': results,
+    }
+
+
+def stage_summary(doc):
+    """Mediana sobre las topologías del tiempo mediano de cada etapa."""
+    stages = {}
+    for timings in doc['results'].values():
+        for stage, t in timings.items():
+            if 'error' not in t:
+                stages.setdefault(stage, []).append(t['median_s'])
+    return {stage: float(np.median(t)) for stage, t in stages.items()}
+
+
+def compare(current, baseline, tolerance):
+    """Compara con la línea base; devuelve (etapas que empeoraron, etapas sin base).
+
+    Para cada etapa se usa la media geométrica, sobre las topologías comunes,
+    del cociente de tiempos medianos actual / base. Las etapas medidas que no
+    están en la línea base se informan en lugar de omitirse.
+    """
+    ratios = {}
+    for key, timings in current['results'].items():
+        base = baseline['results'].get(key, {})
+        for stage, t in timings.items():
+            if 'error' not in t and base.get(stage, {}).get('median_s', 0) > 0:
+                ratios.setdefault(stage, []).append(t['median_s'] / base[stage]['median_s'])
+
+    print(f"\n{'etapa':<36} {'actual/base':>12}")
+    regressions, missing = [], []
+    for stage in SINGLE_STAGES + BATCH_STAGES:
+        if stage not in ratios:
+            measured = any('error' not in timings.get(stage, {'error': None})
+                           for timings in current['results'].values())
+            if measured:
+                missing.append(stage)
+                print(f"{stage:<36} {'sin base':>12}")
+            continue
+        ratio = float(np.exp(np.mean(np.log(ratios[stage]))))
+        flag = ''
+        if ratio > 1 + tolerance:
+            regressions.append(stage)
+            flag = '  <-- regresión'
+        print(f"{stage:<36} {ratio:12.2f}{flag}")
+    return regressions, missing
+
+
+def print_summary(doc):
+    print(f"\n{'etapa':<36} {'mediana por diseño':>20}")
+    for stage, t in stage_summary(doc).items():
+        print(f"{stage:<36} {t * 1e3:17.4f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--topologies', type=int, default=len(topologies()),
+                        help='número de topologías a medir (por defecto las 81)')
+    parser.add_argument('--batch', type=int, default=1000, help='diseños en cada lote')
+    parser.add_argument('--repeat', type=int, default=3, help='repeticiones de cada medida')
+    parser.add_argument('--json', help='escribe los resultados en este archivo JSON')
+    parser.add_argument('--baseline', default=BASELINE, help='línea base con la que comparar')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='guarda los resultados como nueva línea base')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='empeoramiento relativo admitido por etapa')
+    parser.add_argument('--check', action='store_true',
+                        help='falla si alguna etapa empeora más que la tolerancia')
+    args = parser.parse_args()
+
+    doc = run(args.topologies, args.batch, args.repeat)
+    print_summary(doc)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(doc, f, indent=2)
+    regressions, missing = [], []
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(doc, f, indent=2)
+        print(f"\nLínea base guardada en {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions, missing = compare(doc, json.load(f), args.tolerance)
+    else:
+        print(f"\nNo hay línea base en {args.baseline} (use --update-baseline)")
+    if args.check and regressions:
+        sys.exit(f"Etapas con regresión: {', '.join(regressions)}")
+    if args.check and missing:
+        sys.exit(f"Etapas sin línea base (use --update-baseline): {', '.join(missing)}")
@@ -0,0 +1,94 @@
+"""
+Benchmark: respuestas al escalón e impulso por residuos frente a control, y
+malla de tiempo planificada frente a la malla fija np.linspace(0, 0.01, 1000).
+"""
+import argparse
+import time
+import warnings
+import numpy as np
+import control
+from numeric_tf import calc_individual_coeffs, coeffs_to_tf
+from time_response import step_response, impulse_response, plan_time_grid
+from bench_batch_response import CONFIGS, random_designs
+
+
+def run(n_loop, n_batch):
+    t = np.linspace(0, 0.01, 1000)
+    values = random_designs(max(n_loop, n_batch))
+    # Se usa H1 (propio en CONFIGS); H_total es impropio y control lo rechaza
+    num, den = calc_individual_coeffs(values, CONFIGS)[0]
+    num = np.broadcast_to(np.atleast_2d(num), (len(values['R1']), num.shape[-1]))
+    den = np.broadcast_to(np.atleast_2d(den), (len(values['R1']), den.shape[-1]))
+
+    # Bucle actual: una simulación de control por sistema
+    systems = [coeffs_to_tf(num[i], den[i]) for i in range(n_loop)]
+    t0 = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        loop_step = np.array([control.step_response(sys, t)[1] for sys in systems])
+        loop_impulse = np.array([control.impulse_response(sys, t)[1] for sys in systems])
+    t_loop = (time.perf_counter() - t0) / n_loop
+
+    # Comprobación de equivalencia sobre los mismos sistemas
+    step = np.array([step_response(sys, t) for sys in systems])
+    impulse = np.array([impulse_response(sys, t) for sys in systems])
+    err = max(np.max(np.abs(step - loop_step)) / np.max(np.abs(loop_step)),
+              np.max(np.abs(impulse - loop_impulse)) / np.max(np.abs(loop_impulse)))
+
+    # Lote completo: una descomposición modal para todos los sistemas
+    t0 = time.perf_counter()
+    step_response((num[:n_batch], den[:n_batch]), t)
+    impulse_response((num[:n_batch], den[:n_batch]), t)
+    t_batch = (time.perf_counter() - t0) / n_batch
+
+    print(f"control step+impulse (bucle, {n_loop} sistemas): {t_loop * 1e3:.3f} ms/sistema")
+    print(f"Residuos vectorizados ({n_batch} sistemas):     {t_batch * 1e3:.4f} ms/sistema")
+    print(f"Aceleración: {t_loop / t_batch:.1f}x")
+    print(f"Error relativo máximo: {err:.2e}")
+
+
+def grid_error(t, y, t_ref, y_ref):
+    """Error de interpolar lineal y(t) frente a la referencia, relativo a su máximo."""
+    return np.max(np.abs(np.interp(t_ref, t, y) - y_ref)) / np.max(np.abs(y_ref))
+
+
+def run_grid(n_systems, n_points):
+    """Compara la fidelidad de la malla fija y de la planificada."""
+    # Constantes de tiempo entre ~10 ns y ~10 s
+    rng = np.random.default_rng(1)
+    values = {name: 10 ** rng.uniform(2, 6, n_systems) for name in ('R1', 'R2', 'R3', 'R4')}
+    values.update({name: 10 ** rng.uniform(-10, -5, n_systems) for name in ('C1', 'C2', 'Ci1')})
+    values['Ci2'] = np.zeros(n_systems)
+    num, den = calc_individual_coeffs(values, CONFIGS)[0]
+
+    t_fixed = np.linspace(0, 0.01, 1000)
+    t_plan = plan_time_grid((num, den), n_points=n_points)
+    errors = {'fija': [], 'planificada': []}
+    for i in range(n_systems):
+        system = (num[i], den[i])
+        end = max(t_plan[i, -1], t_fixed[-1])
+        t_ref = np.union1d(np.linspace(0, end, 20_000),
+                           np.geomspace(t_plan[i, 1], end, 20_000))
+        y_ref = step_response(system, t_ref)
+        errors['fija'].append(grid_error(t_fixed, step_response(system, t_fixed), t_ref, y_ref))
+        errors['planificada'].append(
+            grid_error(t_plan[i], step_response(system, t_plan[i]), t_ref, y_ref))
+
+    print(f"\nError de la respuesta al escalón interpolada ({n_systems} sistemas):")
+    for name, n in (('fija', t_fixed.size), ('planificada', n_points)):
+        e = np.array(errors[name])
+        print(f"  malla {name:<12} ({n:4d} puntos): mediana {np.median(e):.2e}, "
+              f"máximo {e.max():.2e}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--loop', type=int, default=200, help='sistemas en el bucle con control')
+    parser.add_argument('--batch', type=int, default=2000, help='sistemas en el lote vectorizado')
+    parser.add_argument('--grid-systems', type=int, default=200,
+                        help='sistemas en la comparación de mallas de tiempo')
+    parser.add_argument('--grid-points', type=int, default=200,
+                        help='presupuesto de puntos de la malla planificada')
+    args = parser.parse_args()
+    run(args.loop, args.batch)
+    run_grid(args.grid_systems, args.grid_points)
@@ -0,0 +1,130 @@
+"""
+Genera topology_catalog.py: el catálogo precompilado de topologías.
+
+Para cada combinación de impedancias ('R', RC serie, RC paralelo) en la entrada
+y la retroalimentación de cada etapa se derivan con SymPy las fórmulas cerradas
+de los coeficientes de H1, H2 y H_total, y las expresiones simbólicas que
+imprime analyze_transfer_function_no_plots. El módulo generado es Python puro,
+de modo que el análisis en tiempo de ejecución no necesita importar SymPy.
+
+Uso: python build_topology_catalog.py
+"""
+import itertools
+import os
+import numpy as np
+from sympy import symbols, Poly
+from transfer_function import calc_individual_transfer_functions
+from numeric_tf import COMPONENT_NAMES
+from utils import CONFIG_NAMES
+
+OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'topology_catalog.py')
+
+HEADER = '''"""
+Catálogo precompilado de topologías del circuito.
+
+Generado automáticamente por build_topology_catalog.py; no editar a mano.
+
+Cada función recibe los valores de los componentes (escalares o arreglos de
+NumPy) y devuelve las listas de coeficientes (num, den) en potencias
+descendentes de s, con la misma estructura que get_numeric_tf obtiene con
+SymPy. Las claves usan los nombres de utils.CONFIG_NAMES:
+  - STAGE1/STAGE2: (retroalimentación, entrada)
+  - TOTAL: (retroalimentación 1, entrada 1, retroalimentación 2, entrada 2)
+"""
+'''
+
+
+def _coeff_exprs(H, s):
+    """Listas de coeficientes simbólicos (num, den) de H."""
+    num, den = H.as_numer_denom()
+    return Poly(num, s).all_coeffs(), Poly(den, s).all_coeffs()
+
+
+def _function_source(name, args, H, s):
+    """Código fuente de la función que evalúa los coeficientes de H."""
+    num, den = _coeff_exprs(H, s)
+    lines = [f"def {name}({', '.join(args)}):",
+             f"    return ([{', '.join(str(c) for c in num)}],",
+             f"            [{', '.join(str(c) for c in den)}])"]
+    return "\n".join(lines)
+
+
+def _func_name(prefix, key):
+    return f"_{prefix}_" + "_".join(key)
+
+
+def build_catalog():
+    """Deriva todas las topologías y devuelve el código del módulo."""
+    R1, R2, R3, R4 = symbols('R1 R2 R3 R4')
+    C1, C2, Ci1, Ci2 = symbols('C1 C2 Ci1 Ci2')
+    s = symbols('s')
+    names = list(CONFIG_NAMES)
+
+    functions = []
+    stage1, stage2, total = {}, {}, {}
+    stage1_str, stage2_str, total_str = {}, {}, {}
+    for fb1, in1, fb2, in2 in itertools.product(names, repeat=4):
+        configs = {'config1': CONFIG_NAMES[fb1], 'input1': CONFIG_NAMES[in1],
+                   'config2': CONFIG_NAMES[fb2], 'input2': CONFIG_NAMES[in2]}
+        H1, H2, H_total = calc_individual_transfer_functions(
+            R1, R2, R3, R4, Ci1, Ci2, C1, C2, s, configs)
+        key1, key2, key = (fb1, in1), (fb2, in2), (fb1, in1, fb2, in2)
+        if key1 not in stage1:
+            stage1[key1] = _func_name('stage1', key1)
+            stage1_str[key1] = str(H1)
+            functions.append(_function_source(stage1[key1], ('R1', 'R2', 'C1', 'Ci1'), H1, s))
+        if key2 not in stage2:
+            stage2[key2] = _func_name('stage2', key2)
+            stage2_str[key2] = str(H2)
+            functions.append(_function_source(stage2[key2], ('R3', 'R4', 'C2', 'Ci2'), H2, s))
+        total[key] = _func_name('total', key)
+        total_str[key] = str(H_total)
+        functions.append(_function_source(total[key], COMPONENT_NAMES, H_total, s))
+
+    def table(name, mapping, quote):
+        rows = [f"    {k!r}: {repr(v) if quote else v}," for k, v in mapping.items()]
+        return "\n".join([f"{name} = {{"] + rows + ["}"])
+
+    tables = [table('STAGE1', stage1, False), table('STAGE2', stage2, False),
+              table('TOTAL', total, False), table('STAGE1_STR', stage1_str, True),
+              table('STAGE2_STR', stage2_str, True), table('TOTAL_STR', total_str, True)]
+    return (HEADER.strip() + "\n\n\n" + "\n\n\n".join(functions)
+            + "\n\n\n" + "\n\n".join(tables) + "\n")
+
+
+def verify_catalog(catalog, n=5, seed=0):
+    """Compara las fórmulas generadas con numeric_tf para valores aleatorios."""
+    from numeric_tf import _stage_factors, _cascade_factors, _factors_to_coeffs, _stack_coeffs
+    rng = np.random.default_rng(seed)
+    v = {name: 10 ** rng.uniform(3, 5, n) for name in ('R1', 'R2', 'R3', 'R4')}
+    v.update({name: 10 ** rng.uniform(-9, -7, n) for name in ('C1', 'C2', 'Ci1', 'Ci2')})
+    for key, func in catalog.TOTAL.items():
+        fb1, in1, fb2, in2 = (CONFIG_NAMES[k] for k in key)
+        H1 = _stage_factors(v['R1'], v['Ci1'], in1, v['R2'], v['C1'], fb1)
+        H2 = _stage_factors(v['R3'], v['Ci2'], in2, v['R4'], v['C2'], fb2)
+        expected = [_factors_to_coeffs(*H) for H in (H1, H2, _cascade_factors(H1, H2))]
+        got = [_stack_coeffs(*catalog.STAGE1[key[:2]](v['R1'], v['R2'], v['C1'], v['Ci1'])),
+               _stack_coeffs(*catalog.STAGE2[key[2:]](v['R3'], v['R4'], v['C2'], v['Ci2'])),
+               _stack_coeffs(*func(*(v[name] for name in COMPONENT_NAMES)))]
+        for (en, ed), (gn, gd) in zip(expected, got):
+            # Misma H(s): se comparan con el denominador escalado a máximo 1
+            e_scale = np.abs(ed).max(axis=-1, keepdims=True)
+            g_scale = np.abs(gd).max(axis=-1, keepdims=True)
+            if en.shape != gn.shape or ed.shape != gd.shape \
+                    or not np.allclose(en / e_scale, gn / g_scale, rtol=1e-12, atol=0) \
+                    or not np.allclose(ed / e_scale, gd / g_scale, rtol=1e-12, atol=0):
+                raise AssertionError(f"El catálogo no coincide con numeric_tf en {key}")
+
+
+def main():
+    source = build_catalog()
+    with open(OUTPUT, 'w', encoding='utf-8') as f:
+        f.write(source)
+    import importlib
+    import topology_catalog
+    verify_catalog(importlib.reload(topology_catalog))
+    print(f"Catálogo generado y verificado: {OUTPUT}")
+
+
+if __name__ == '__main__':
+    main()
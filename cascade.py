@@ -0,0 +1,196 @@
+"""
+Cascada de N etapas inversoras en forma factorizada.
+
+Cada etapa H_k = -Z_fb / Z_in es a lo sumo de segundo orden, así que la
+cascada se guarda como secciones de segundo orden (SOS): un arreglo
+(..., n_etapas, 6) con [b0, b1, b2, a0, a1, a2] por etapa, en potencias
+descendentes de s. La respuesta en frecuencia es el producto de las respuestas
+de cada etapa y los polos y ceros son la unión de los de cada etapa, de modo
+que el costo crece linealmente con el número de etapas y nunca se expande el
+polinomio de orden alto (que pierde precisión con 6-20 etapas).
+
+Cada etapa se describe con un diccionario con las claves de STAGE_KEYS; las
+configuraciones pueden ser dicts {'type', 'config'} o nombres de
+utils.CONFIG_NAMES ('R', 'serie', 'paralelo').
+"""
+import numpy as np
+from numeric_tf import stage_coeffs, cancel_common_s, trim_leading
+from utils import config_from_name
+
+STAGE_KEYS = ('R_in', 'C_in', 'input', 'R_fb', 'C_fb', 'feedback')
+
+
+def _config(value):
+    if value is None:
+        return config_from_name('R')
+    return config_from_name(value) if isinstance(value, str) else value
+
+
+def stage_sos(R_in, C_in, input_cfg, R_fb, C_fb, fb_cfg):
+    """Sección de segundo orden (..., 6) de una etapa inversora.
+
+    Se cancelan los factores s comunes a numerador y denominador y se
+    conserva la ganancia real (sin la normalización de get_numeric_tf).
+    """
+    num, den = stage_coeffs(R_in, C_in, _config(input_cfg), R_fb, C_fb, _config(fb_cfg))
+    num, den = cancel_common_s(num, den)
+    if num.shape[-1] > 3 or den.shape[-1] > 3:
+        raise ValueError("La etapa no es de segundo orden")
+    pad = [(0, 0)] * (num.ndim - 1)
+    num = np.pad(num, pad + [(3 - num.shape[-1], 0)])
+    den = np.pad(den, pad + [(3 - den.shape[-1], 0)])
+    shape = np.broadcast_shapes(num.shape, den.shape)
+    return np.concatenate([np.broadcast_to(num, shape), np.broadcast_to(den, shape)], axis=-1)
+
+
+def cascade_sos(stages):
+    """Secciones (..., n_etapas, 6) de una cascada de etapas inversoras.
+
+    stages: lista de diccionarios con las claves de STAGE_KEYS; los valores
+    pueden ser escalares o arreglos (lote de diseños con la misma topología).
+    Los capacitores ausentes valen 0 y las configuraciones ausentes 'R'.
+    """
+    if not stages:
+        raise ValueError("La cascada necesita al menos una etapa")
+    sections = []
+    for stage in stages:
+        unknown = set(stage) - set(STAGE_KEYS)
+        if unknown:
+            raise ValueError(f"Claves desconocidas en la etapa: {sorted(unknown)}")
+        sections.append(stage_sos(stage['R_in'], stage.get('C_in', 0.0), stage.get('input'),
+                                  stage['R_fb'], stage.get('C_fb', 0.0), stage.get('feedback')))
+    shape = np.broadcast_shapes(*(s.shape for s in sections))
+    return np.stack([np.broadcast_to(s, shape) for s in sections], axis=-2)
+
+
+def stages_from_configs(valores, configs):
+    """Las dos etapas del circuito original (H1 y H2) como lista de etapas.
+
+    valores: diccionario indexado por nombre (ver numeric_tf.values_by_name).
+    """
+    return [
+        {'R_in': valores['R1'], 'C_in': valores.get('Ci1', 0.0), 'input': configs.get('input1'),
+         'R_fb': valores['R2'], 'C_fb': valores.get('C1', 0.0), 'feedback': configs['config1']},
+        {'R_in': valores['R3'], 'C_in': valores.get('Ci2', 0.0), 'input': configs.get('input2'),
+         'R_fb': valores['R4'], 'C_fb': valores.get('C2', 0.0), 'feedback': configs['config2']},
+    ]
+
+
+def sos_frequency_response(sos, w):
+    """Respuesta en frecuencia de la cascada como producto de etapas.
+
+    sos: (..., n_etapas, 6); w: (M,) en rad/s.
+    Devuelve (H, mag_db, phase_deg) de forma (..., M). La magnitud en dB y la
+    fase se acumulan como sumas por etapa, así que no desbordan con muchas
+    etapas y la fase no necesita desenvolverse (la de cada etapa es continua
+    para ω > 0, porque la parte imaginaria b1*ω no cambia de signo).
+    """
+    sos = np.asarray(sos, dtype=float)
+    w = np.asarray(w, dtype=float)
+    w2 = w * w
+    shape = sos.shape[:-2] + (w.size,)
+    H = np.ones(shape, dtype=complex)
+    mag_db = np.zeros(shape)
+    phase = np.zeros(shape)
+    for k in range(sos.shape[-2]):
+        b0, b1, b2, a0, a1, a2 = (sos[..., k, i, None] for i in range(6))
+        num = (b2 - b0 * w2) + 1j * (b1 * w)
+        den = (a2 - a0 * w2) + 1j * (a1 * w)
+        H *= num / den
+        with np.errstate(divide='ignore'):
+            mag_db += 10 * np.log10(np.abs(num) ** 2) - 10 * np.log10(np.abs(den) ** 2)
+        phase += np.angle(num) - np.angle(den)
+    return H, mag_db, np.degrees(phase)
+
+
+def _quadratic_roots(c):
+    """Raíces (..., 2) de c0 s² + c1 s + c2 sin cancelación catastrófica.
+
+    Las secciones de primer orden dan una raíz y NaN; las constantes, dos NaN.
+    """
+    a, b, c = (c[..., i].astype(complex) for i in range(3))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sq = np.sqrt(b * b - 4 * a * c)
+        sign = np.where((b.conj() * sq).real >= 0, 1.0, -1.0)
+        q = -0.5 * (b + sign * sq)
+        r1 = np.where(q != 0, q / a, 0.0)
+        r2 = np.where(q != 0, c / q, 0.0)
+        linear = -c / b
+    quadratic = a != 0
+    first = b != 0
+    r1 = np.where(quadratic, r1, np.where(first, linear, np.nan))
+    r2 = np.where(quadratic, r2, np.nan)
+    return np.stack([r1, r2], axis=-1)
+
+
+def _leading(c):
+    """Primer coeficiente no nulo de cada sección (..., 3)."""
+    idx = np.argmax(c != 0, axis=-1)
+    return np.take_along_axis(c, idx[..., None], axis=-1)[..., 0]
+
+
+def sos_zpk(sos):
+    """Ceros, polos y ganancia de la cascada como unión de las etapas.
+
+    Devuelve (zeros, poles, gain) con zeros y poles de forma
+    (..., 2*n_etapas), complejos y con NaN donde una sección es de orden
+    menor que 2; gain (...,) es tal que H(s) = gain * prod(s - z) / prod(s - p).
+    Los polos y ceros de etapas distintas no se cancelan entre sí.
+    """
+    sos = np.asarray(sos, dtype=float)
+    zeros = _quadratic_roots(sos[..., :3])
+    poles = _quadratic_roots(sos[..., 3:])
+    shape = sos.shape[:-2] + (-1,)
+    gain = np.prod(_leading(sos[..., :3]) / _leading(sos[..., 3:]), axis=-1)
+    return zeros.reshape(shape), poles.reshape(shape), gain
+
+
+def _union_roots(zeros, poles):
+    # + 0.0 quita los -0.0 que dejan las fórmulas de las raíces
+    zeros, poles = zeros[~np.isnan(zeros)] + 0.0, poles[~np.isnan(poles)] + 0.0
+    common = min(np.count_nonzero(zeros == 0), np.count_nonzero(poles == 0))
+    if common:
+        zeros = np.delete(zeros, np.flatnonzero(zeros == 0)[:common])
+        poles = np.delete(poles, np.flatnonzero(poles == 0)[:common])
+    return zeros, poles
+
+
+def cascade_roots(sos):
+    """(ceros, polos) de la cascada como unión de las raíces de cada etapa.
+
+    A diferencia de sos_zpk, se descartan las raíces ausentes de las
+    secciones de menor orden y los pares polo/cero en s = 0 que aportan etapas
+    distintas. sos (n_etapas, 6) da dos arreglos 1-D; un lote (N, n_etapas, 6)
+    da una lista de N pares, porque cada diseño puede tener otro número de
+    raíces.
+    """
+    sos = np.asarray(sos, dtype=float)
+    zeros, poles, _ = sos_zpk(sos)
+    if sos.ndim == 2:
+        return _union_roots(zeros, poles)
+    k = zeros.shape[-1]
+    return [_union_roots(z, p) for z, p in zip(zeros.reshape(-1, k), poles.reshape(-1, k))]
+
+
+def sos_to_coeffs(sos):
+    """Expande la cascada en un único (num, den) (solo para pocas etapas).
+
+    Útil para comparar con get_numeric_tf; con muchas etapas los
+    coeficientes abarcan demasiados órdenes de magnitud y se pierde precisión,
+    que es justamente lo que evita trabajar con las secciones.
+    """
+    sos = np.asarray(sos, dtype=float)
+    num, den = sos[..., 0, :3], sos[..., 0, 3:]
+    for k in range(1, sos.shape[-2]):
+        num = _polymul_last(num, sos[..., k, :3])
+        den = _polymul_last(den, sos[..., k, 3:])
+    num, den = (trim_leading(c) for c in (num, den))
+    return cancel_common_s(num, den)
+
+
+def _polymul_last(a, b):
+    out = np.zeros(np.broadcast_shapes(a.shape[:-1], b.shape[:-1])
+                   + (a.shape[-1] + b.shape[-1] - 1,))
+    for i in range(a.shape[-1]):
+        out[..., i:i + b.shape[-1]] += a[..., i, None] * b
+    return out
@@ -0,0 +1,359 @@
+"""
+Búsqueda de componentes de valores normalizados (E12/E24/E96) para una especificación.
+
+Dada una topología y una especificación (frecuencia de corte, ganancia de la
+banda de paso y, opcionalmente, el tipo de filtro de determine_filter_type)
+se buscan los juegos de componentes normalizados de H_total que mejor la
+cumplen. En lugar de enumerar las 8 posiciones con todos los valores de la
+serie, el espacio se poda con dos índices precalculados:
+  - RatioIndex: cocientes R_fb / R_in de todos los pares de resistencias,
+    ordenados; la ganancia de cada etapa en la banda de paso es ese cociente.
+  - TimeConstantIndex: constantes de tiempo R*C de todos los pares, ordenadas;
+    cada red RC fija una esquina en 1 / (2π R C).
+Para cada reparto de la ganancia entre las etapas se toman los pares de
+resistencias con el cociente más cercano y, para cada red RC, los pares (R, C)
+cuya constante de tiempo cae cerca de la de la frecuencia objetivo. Un filtro
+barato (|H_total| en la frecuencia objetivo) deja como mucho max_exact
+candidatos, que se evalúan de forma exacta y vectorizada (frequency_metrics);
+los mejores se refinan moviendo cada componente a los valores vecinos de su
+serie.
+"""
+from functools import lru_cache
+import numpy as np
+from numeric_tf import COMPONENT_NAMES, calc_individual_coeffs
+from batch_response import DEFAULT_W, coeffs_magnitude_db, determine_filter_type_batch
+from frequency_metrics import frequency_metrics
+from batch_analysis import CONFIG_KEYS
+from utils import FILTER_TYPES, config_from_name
+
+E12 = (1.0, 1.2, 1.5, 1.8, 2.2, 2.7, 3.3, 3.9, 4.7, 5.6, 6.8, 8.2)
+E24 = (1.0, 1.1, 1.2, 1.3, 1.5, 1.6, 1.8, 2.0, 2.2, 2.4, 2.7, 3.0,
+       3.3, 3.6, 3.9, 4.3, 4.7, 5.1, 5.6, 6.2, 6.8, 7.5, 8.2, 9.1)
+# La serie E96 sigue exactamente la regla de redondeo a 3 cifras
+E96 = tuple(round(10 ** (i / 96), 2) for i in range(96))
+SERIES = {'E12': E12, 'E24': E24, 'E96': E96}
+
+# Décadas por defecto: 100 Ω - 1 MΩ y 10 pF - 10 µF
+R_DECADES = (2, 3, 4, 5)
+C_DECADES = (-11, -10, -9, -8, -7, -6)
+
+# Cociente máximo entre resistencias de una misma etapa
+MAX_RATIO = 1e3
+
+# Resistencia preferida: entre pares equivalentes se eligen los más cercanos
+PREFERRED_R = 1e4
+
+# Posiciones de cada red RC: (configuración, resistencia, capacitor)
+RC_SLOTS = (('config1', 'R2', 'C1'), ('input1', 'R1', 'Ci1'),
+            ('config2', 'R4', 'C2'), ('input2', 'R3', 'Ci2'))
+
+# Índices de DEFAULT_W que usa determine_filter_type_batch
+_FILTER_TYPE_W = DEFAULT_W[[0, -100, -1]]
+
+
+@lru_cache(maxsize=None)
+def series_values(series, decades):
+    """Valores normalizados (ordenados) de la serie en las décadas dadas."""
+    base = np.array(SERIES[series])
+    # Redondeo a 3 cifras para que 4.7 * 1e-9 sea exactamente 4.7e-9
+    return np.sort([float(f'{x:.3g}') for x in np.concatenate([base * 10.0 ** d for d in decades])])
+
+
+class RatioIndex:
+    """Cocientes b / a de todos los pares de resistencias, ordenados."""
+
+    def __init__(self, values, max_ratio=MAX_RATIO):
+        a, b = np.meshgrid(np.arange(values.size), np.arange(values.size), indexing='ij')
+        log_ratio = np.log(values[b] / values[a]).ravel()
+        keep = np.abs(log_ratio) <= np.log(max_ratio)
+        order = np.argsort(log_ratio[keep])
+        self.values = values
+        self.log_ratio = log_ratio[keep][order]
+        self.first = a.ravel()[keep][order]
+        self.second = b.ravel()[keep][order]
+
+    def nearest(self, ratio, n):
+        """Los n pares (a, b) con b / a más cercano a ratio.
+
+        Entre los pares con el mismo cociente se prefieren los de valores
+        cercanos a PREFERRED_R. Devuelve dos arreglos (n,) de valores.
+        """
+        target = np.log(ratio)
+        # Ventana alrededor del cociente: cada cociente se repite en cada década
+        i = np.searchsorted(self.log_ratio, target)
+        width = n * self.values.size
+        lo, hi = max(i - width, 0), min(i + width, self.log_ratio.size)
+        a, b = self.values[self.first[lo:hi]], self.values[self.second[lo:hi]]
+        error = np.abs(self.log_ratio[lo:hi] - target)
+        level = np.abs(np.log(np.sqrt(a * b) / PREFERRED_R))
+        best = np.lexsort((level, np.round(error, 9)))[:n]
+        return a[best], b[best]
+
+
+class TimeConstantIndex:
+    """Constantes de tiempo R*C de todos los pares resistencia-capacitor, ordenadas."""
+
+    def __init__(self, r_values, c_values):
+        tau = np.log(np.multiply.outer(r_values, c_values)).ravel()
+        order = np.argsort(tau)
+        self.r_values, self.c_values = r_values, c_values
+        self.log_tau = tau[order]
+        self.r_index, self.c_index = np.unravel_index(order, (r_values.size, c_values.size))
+
+    def capacitor_for(self, r, tau):
+        """Capacitores normalizados con R*C más cercano a tau, para cada r (N,).
+
+        Equivale a buscar en el índice restringido a la resistencia r; como
+        los capacitores están ordenados basta con una búsqueda binaria.
+        """
+        target = np.asarray(tau) / np.asarray(r)
+        c = self.c_values
+        i = np.clip(np.searchsorted(c, target), 1, c.size - 1)
+        lower, upper = c[i - 1], c[i]
+        return np.where(np.abs(np.log(lower / target)) <= np.abs(np.log(upper / target)),
+                        lower, upper)
+
+    def pairs_near(self, tau, n):
+        """Los n pares (R, C) con R*C más cercano a tau.
+
+        Entre los pares cuyo error difiere en menos de un 1 % se prefieren las
+        resistencias cercanas a PREFERRED_R.
+        """
+        target = np.log(tau)
+        i = np.searchsorted(self.log_tau, target)
+        lo, hi = max(i - 8 * n, 0), min(i + 8 * n, self.log_tau.size)
+        r = self.r_values[self.r_index[lo:hi]]
+        error = np.abs(self.log_tau[lo:hi] - target)
+        best = lo + np.lexsort((np.abs(np.log(r / PREFERRED_R)), np.round(error, 2)))[:n]
+        return self.r_values[self.r_index[best]], self.c_values[self.c_index[best]]
+
+
+@lru_cache(maxsize=None)
+def build_indexes(series='E24', cap_series='E12', r_decades=R_DECADES, c_decades=C_DECADES):
+    """Índices de cocientes y constantes de tiempo (se construyen una vez por serie)."""
+    r_values = series_values(series, r_decades)
+    c_values = series_values(cap_series, c_decades)
+    return RatioIndex(r_values), TimeConstantIndex(r_values, c_values)
+
+
+def _topology_configs(topology):
+    if isinstance(topology, dict):
+        topology = tuple(topology.get(key, 'R') for key in CONFIG_KEYS)
+    return tuple(topology), {key: config_from_name(name) for key, name in zip(CONFIG_KEYS, topology)}
+
+
+def evaluate_designs(values, topology):
+    """Corte, ganancia de la banda de paso y tipo de filtro de H_total para N diseños.
+
+    values: {nombre: arreglo (N,)}; topology: tupla de nombres en el orden de
+    batch_analysis.CONFIG_KEYS o dict {'config1': 'R', ...}.
+    """
+    _, configs = _topology_configs(topology)
+    num, den = calc_individual_coeffs(values, configs)[2]
+    n = len(values['R1'])
+    num, den = (np.broadcast_to(np.atleast_2d(c), (n, c.shape[-1])) for c in (num, den))
+    metrics = frequency_metrics((num, den))
+    mag_db = coeffs_magnitude_db(num, den, _FILTER_TYPE_W)
+    # determine_filter_type_batch solo usa los extremos y el punto -100 de DEFAULT_W
+    freq = np.full(101, np.nan)
+    freq[[0, -100, -1]] = _FILTER_TYPE_W / (2 * np.pi)
+    mags = np.full((n, 101), np.nan)
+    mags[:, [0, -100, -1]] = mag_db
+    return {
+        'cutoff_hz': metrics['cutoff_hz'],
+        'gain_db': metrics['peak_db'],
+        'filter_type': determine_filter_type_batch(mags, freq),
+    }
+
+
+def _cost(evaluation, cutoff_hz, gain_db, filter_type, gain_weight):
+    """Error en décadas del corte más gain_weight veces el error de ganancia en dB/20."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cost = np.abs(np.log10(evaluation['cutoff_hz'] / cutoff_hz))
+        if gain_db is not None:
+            cost = cost + gain_weight * np.abs(evaluation['gain_db'] - gain_db) / 20
+    cost = np.where(np.isfinite(cost), cost, np.inf)
+    if filter_type is not None:
+        cost = np.where(evaluation['filter_type'] == filter_type, cost, np.inf)
+    return cost
+
+
+def _nearest_value(table, x):
+    """Valor de la tabla ordenada más cercano (en escala logarítmica) a cada x."""
+    x = np.asarray(x, dtype=float)
+    i = np.clip(np.searchsorted(table, x), 1, table.size - 1)
+    lower, upper = table[i - 1], table[i]
+    return np.where(np.abs(np.log(lower / x)) <= np.abs(np.log(upper / x)), lower, upper)
+
+
+def _stage_candidates(stage, configs, gain, tau, ratio_index, tau_index, n_pairs, multipliers):
+    """Opciones {R_in, R_fb, C_in, C_fb} (arreglos (K,)) de una etapa con ganancia gain.
+
+    Sin redes RC los pares salen del índice de cocientes. Con redes RC, la
+    primera fija el nivel de impedancia con los pares (R, C) del índice de
+    constantes de tiempo cercanos a tau * m (una esquina por multiplicador),
+    la otra resistencia sale del cociente y el capacitor restante se elige
+    para sus propias esquinas.
+    """
+    fb_key, in_key = ('config1', 'input1') if stage == 1 else ('config2', 'input2')
+    rc = [(role, key) for role, key in (('fb', fb_key), ('in', in_key))
+          if configs[key]['type'] == 'RC']
+    if not rc:
+        r_in, r_fb = ratio_index.nearest(gain, n_pairs)
+        return {'R_in': r_in, 'R_fb': r_fb, 'C_in': 0 * r_in, 'C_fb': 0 * r_in}
+
+    role = rc[0][0]
+    other = 'in' if role == 'fb' else 'fb'
+    pairs = [tau_index.pairs_near(tau * m, n_pairs) for m in multipliers]
+    r = np.concatenate([p[0] for p in pairs])
+    c = np.concatenate([p[1] for p in pairs])
+    out = {f'R_{role}': r, f'C_{role}': c,
+           f'R_{other}': _nearest_value(ratio_index.values, r / gain if role == 'fb' else r * gain),
+           f'C_{other}': np.zeros_like(r)}
+    if len(rc) == 2:
+        caps = tau_index.capacitor_for(out[f'R_{other}'][:, None], tau * multipliers[None, :])
+        out = {name: np.repeat(v, len(multipliers)) for name, v in out.items()}
+        out[f'C_{other}'] = caps.ravel()
+    return out
+
+
+def _candidates(configs, cutoff_hz, gain_db, ratio_index, tau_index, n_pairs, n_corners):
+    """Candidatos iniciales {nombre: arreglo} generados con los índices."""
+    gain = 10 ** ((gain_db or 0.0) / 20)
+    tau = 1 / (2 * np.pi * cutoff_hz)
+    # Esquinas de cada red RC alrededor de la frecuencia objetivo
+    multipliers = 10.0 ** np.linspace(-1, 1, n_corners)
+
+    blocks = []
+    # Reparto de la ganancia: a partes iguales o toda en una de las etapas
+    for g1 in sorted({np.sqrt(gain), gain, 1.0}):
+        s1 = _stage_candidates(1, configs, g1, tau, ratio_index, tau_index, n_pairs, multipliers)
+        s2 = _stage_candidates(2, configs, gain / g1, tau, ratio_index, tau_index, n_pairs,
+                               multipliers)
+        i, j = (a.ravel() for a in np.meshgrid(np.arange(s1['R_in'].size),
+                                               np.arange(s2['R_in'].size), indexing='ij'))
+        blocks.append({'R1': s1['R_in'][i], 'R2': s1['R_fb'][i], 'Ci1': s1['C_in'][i],
+                       'C1': s1['C_fb'][i], 'R3': s2['R_in'][j], 'R4': s2['R_fb'][j],
+                       'Ci2': s2['C_in'][j], 'C2': s2['C_fb'][j]})
+    return {name: np.concatenate([b[name] for b in blocks]) for name in COMPONENT_NAMES}
+
+
+def _prescreen(values, configs, cutoff_hz, gain_db, keep):
+    """Índices de los keep candidatos con |H_total| en cutoff_hz más cerca de gain_db - 3 dB.
+
+    Es una sola evaluación de magnitud por diseño; la evaluación exacta
+    (raíces de |H|^2) se reserva para los que pasan.
+    """
+    n = values['R1'].size
+    if gain_db is None or n <= keep:
+        return np.arange(n)
+    num, den = calc_individual_coeffs(values, configs)[2]
+    num, den = (np.broadcast_to(np.atleast_2d(c), (n, c.shape[-1])) for c in (num, den))
+    mag = coeffs_magnitude_db(num, den, [2 * np.pi * cutoff_hz])[:, 0]
+    return np.argpartition(np.abs(mag - (gain_db - 3)), keep)[:keep]
+
+
+def _neighbors(values, r_values, c_values, names):
+    """Diseños que cambian un componente al valor vecino de su serie."""
+    out = {name: [] for name in COMPONENT_NAMES}
+    for name in names:
+        table = r_values if name.startswith('R') else c_values
+        i = np.searchsorted(table, values[name] * (1 - 1e-9))
+        for step in (-1, 1):
+            moved = table[np.clip(i + step, 0, table.size - 1)]
+            for other in COMPONENT_NAMES:
+                out[other].append(moved if other == name else values[other])
+    return {name: np.concatenate(v) for name, v in out.items()}
+
+
+def search_components(cutoff_hz, topology, gain_db=None, filter_type=None, series='E24',
+                      cap_series='E12', top=10, n_pairs=8, n_corners=5, max_exact=4096, refine_steps=20,
+                      gain_weight=1.0):
+    """Mejores juegos de componentes normalizados para la especificación.
+
+    cutoff_hz: frecuencia de corte (-3 dB) objetivo de H_total.
+    topology: nombres ('R', 'serie', 'paralelo') en el orden de CONFIG_KEYS o
+        dict {'config1': ..., 'input1': ..., 'config2': ..., 'input2': ...}.
+    gain_db: ganancia objetivo de la banda de paso (pico de |H_total|).
+    filter_type: tipo exigido, como lo clasifica determine_filter_type.
+    series, cap_series: serie de resistencias y de capacitores ('E12',
+        'E24' o 'E96').
+
+    Devuelve una lista (mejor primero, como mucho top) de dicts con 'values'
+    (por nombre; 0 en los capacitores que la topología no usa),
+    'cutoff_hz', 'gain_db', 'filter_type' y 'cost' (error del corte en
+    décadas más gain_weight veces el de la ganancia en dB/20).
+    """
+    if filter_type is not None and filter_type not in FILTER_TYPES:
+        raise ValueError(f"Tipo de filtro desconocido: {filter_type}")
+    if series not in SERIES or cap_series not in SERIES:
+        raise ValueError(f"Serie desconocida (use {', '.join(SERIES)})")
+    if not cutoff_hz > 0:
+        raise ValueError("cutoff_hz debe ser positiva")
+    topology, configs = _topology_configs(topology)
+    ratio_index, tau_index = build_indexes(series, cap_series)
+    names = ['R1', 'R2', 'R3', 'R4'] + [c for key, _, c in RC_SLOTS
+                                        if configs[key]['type'] == 'RC']
+
+    values = _candidates(configs, cutoff_hz, gain_db, ratio_index, tau_index, n_pairs, n_corners)
+    keep = _prescreen(values, configs, cutoff_hz, gain_db, max_exact)
+    values = {name: v[keep] for name, v in values.items()}
+    cost = _cost(evaluate_designs(values, topology), cutoff_hz, gain_db, filter_type,
+                 gain_weight)
+
+    # Refinamiento: los mejores se mueven a los valores vecinos de cada serie
+    # hasta que el mejor deja de mejorar
+    beam = max(top, 16)
+    for _ in range(refine_steps):
+        best = np.argsort(cost)[:beam]
+        best = best[np.isfinite(cost[best])]
+        if best.size == 0:
+            break
+        moved = _neighbors({name: v[best] for name, v in values.items()},
+                           tau_index.r_values, tau_index.c_values, names)
+        moved_cost = _cost(evaluate_designs(moved, topology), cutoff_hz, gain_db, filter_type,
+                           gain_weight)
+        values = {name: np.concatenate([values[name], moved[name]]) for name in COMPONENT_NAMES}
+        improved = moved_cost.min() < cost[best[0]]
+        cost = np.concatenate([cost, moved_cost])
+        if not improved:
+            break
+
+    # Resultados únicos ordenados por costo.
+    table = np.stack([values[name] for name in COMPONENT_NAMES], axis=-1)
+    _, unique = np.unique(table, axis=0, return_index=True)
+    # A igual costo se prefieren resistencias cercanas a PREFERRED_R
+    level = sum(np.abs(np.log(values[name][unique] / PREFERRED_R))
+                for name in ('R1', 'R2', 'R3', 'R4'))
+    order = unique[np.lexsort((level, np.round(cost[unique], 9)))]
+    order = order[np.isfinite(cost[order])][:top]
+    final = {name: values[name][order] for name in COMPONENT_NAMES}
+    evaluation = evaluate_designs(final, topology) if order.size else None
+    return [{
+        'values': {name: float(final[name][i]) for name in COMPONENT_NAMES},
+        'cutoff_hz': float(evaluation['cutoff_hz'][i]),
+        'gain_db': float(evaluation['gain_db'][i]),
+        'filter_type': str(evaluation['filter_type'][i]),
+        'cost': float(cost[order[i]]),
+    } for i in range(order.size)]
+
+
+def _format_value(value, unit):
+    for scale, prefix in ((1e6, 'M'), (1e3, 'k'), (1, ''), (1e-3, 'm'), (1e-6, 'µ'),
+                          (1e-9, 'n'), (1e-12, 'p')):
+        if value >= scale:
+            return f"{value / scale:.3g} {prefix}{unit}"
+    return f"{value:.3g} {unit}"
+
+
+def print_search_results(results):
+    """Imprime la tabla de diseños de search_components."""
+    if not results:
+        print("Ningún diseño normalizado cumple la especificación con esta topología")
+        return
+    print(f"{'#':>3} {'corte (Hz)':>11} {'ganancia (dB)':>14} {'tipo':<30} {'error':>8}  componentes")
+    for i, r in enumerate(results, 1):
+        parts = [f"{name}={_format_value(value, 'Ω' if name.startswith('R') else 'F')}"
+                 for name, value in r['values'].items() if value > 0]
+        print(f"{i:3d} {r['cutoff_hz']:11.2f} {r['gain_db']:14.2f} {r['filter_type']:<30} "
+              f"{r['cost']:8.4f}  {', '.join(parts)}")
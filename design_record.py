@@ -0,0 +1,170 @@
+"""
+Representación compacta de diseños como arreglo estructurado de NumPy.
+
+Cada diseño ocupa 68 bytes contiguos: R1..R4, C1, C2, Ci1, Ci2 como float64 y
+config1, input1, config2, input2 como códigos uint8 (0 = 'R', 1 = 'serie',
+2 = 'paralelo', el mismo número que configs[...]['config']). Un lote de
+diseños es un solo bloque de memoria: cada componente es una vista sin copia
+(designs['R1']), se serializa sin pickle de diccionarios y se comparte entre
+procesos con share() / attach().
+
+Todas las entradas que reciben la tupla de init_components (AnalysisResult,
+analyze_transfer_function_no_plots, analyze_responses_no_plots,
+run_complete_analysis, plot_thevenin_analysis, run_monte_carlo,
+sensitivity_analysis, ResultCache.analysis) aceptan también un registro, y las funciones que
+reciben `valores` (calc_individual_coeffs, batch_frequency_response,
+design_key, ...) aceptan un arreglo de registros de una misma topología.
+"""
+import numpy as np
+from numeric_tf import COMPONENT_NAMES
+from batch_analysis import CONFIG_KEYS, config_name, analyze_group
+from batch_response import DEFAULT_W
+from utils import config_from_name
+
+TOPOLOGY_NAMES = ('R', 'serie', 'paralelo')
+TOPOLOGY_CODES = {name: code for code, name in enumerate(TOPOLOGY_NAMES)}
+
+DESIGN_DTYPE = np.dtype([(name, '<f8') for name in COMPONENT_NAMES]
+                        + [(key, 'u1') for key in CONFIG_KEYS])
+
+
+def is_design(obj):
+    """True si obj es un registro o un arreglo de registros de DESIGN_DTYPE."""
+    return getattr(obj, 'dtype', None) == DESIGN_DTYPE
+
+
+def empty(shape):
+    """Arreglo de diseños con todos los valores en 0 y topología R-R-R-R."""
+    return np.zeros(shape, DESIGN_DTYPE)
+
+
+def from_values(values, topology):
+    """Diseños a partir de {nombre: valor o arreglo} y una topología.
+
+    topology: nombres en el orden de CONFIG_KEYS o dict de configs (nombres o
+    dicts {'type', 'config'}). Los arreglos de valores se difunden entre sí.
+    """
+    if isinstance(topology, dict):
+        topology = tuple(topology.get(key) for key in CONFIG_KEYS)
+    shape = np.broadcast_shapes(*(np.shape(values.get(name, 0.0)) for name in COMPONENT_NAMES))
+    designs = empty(shape)
+    for name in COMPONENT_NAMES:
+        designs[name] = values.get(name, 0.0)
+    for key, name in zip(CONFIG_KEYS, topology):
+        designs[key] = TOPOLOGY_CODES[config_name(name)]
+    return designs
+
+
+def from_components(components):
+    """Registro (arreglo de forma ()) a partir de la tupla de init_components."""
+    from numeric_tf import values_by_name
+    _, _, valores, configs = components
+    return from_values({name: float(v) for name, v in values_by_name(valores).items()},
+                       configs)
+
+
+def from_records(records):
+    """Arreglo de diseños a partir de registros de batch_analysis (dicts)."""
+    from batch_analysis import parse_record
+    designs = empty(len(records))
+    for i, record in enumerate(records):
+        values, topology = parse_record(record)
+        designs[i] = (tuple(values[name] for name in COMPONENT_NAMES)
+                      + tuple(TOPOLOGY_CODES[name] for name in topology))
+    return designs
+
+
+def topology_of(designs):
+    """Tupla de nombres de configs, común a todos los diseños (ValueError si no)."""
+    names = []
+    for key in CONFIG_KEYS:
+        codes = np.unique(designs[key])
+        if codes.size != 1:
+            raise ValueError(f"Los diseños no comparten la configuración de {key}")
+        names.append(TOPOLOGY_NAMES[codes[0]])
+    return tuple(names)
+
+
+def configs_of(designs):
+    """Diccionario configs (como el de init_components) de diseños de una topología."""
+    return {key: config_from_name(name) for key, name in zip(CONFIG_KEYS, topology_of(designs))}
+
+
+def to_components(design, symbols=True):
+    """Tupla de init_components a partir de un único registro.
+
+    symbols: si False no se importa SymPy y se devuelve (None, None, valores
+    por nombre, configs), que es lo que usan AnalysisResult y el resto de las
+    funciones numéricas.
+    """
+    design = np.asarray(design)
+    if design.size != 1:
+        raise ValueError("to_components recibe un único diseño")
+    design = design.reshape(())
+    values = {name: float(design[name]) for name in COMPONENT_NAMES}
+    configs = configs_of(design)
+    if not symbols:
+        return None, None, values, configs
+    from sympy import symbols as make_symbols
+    syms = make_symbols('R1 R2 R3 R4 C1 C2 Ci1 Ci2')
+    R1, R2, R3, R4, C1, C2, Ci1, Ci2 = syms
+    valores = {sym: values[sym.name] for sym in syms}
+    return (R1, R2, R3, R4), (Ci1, Ci2, C1, C2), valores, configs
+
+
+def as_components(components, symbols=True):
+    """Devuelve components como tupla de init_components si es un registro.
+
+    Las tuplas (y None) se devuelven sin cambios.
+    """
+    if is_design(components):
+        return to_components(components, symbols)
+    return components
+
+
+def group_by_topology(designs):
+    """Genera (tupla de nombres de configs, índices) por cada topología presente."""
+    codes = sum(designs[key].astype(np.intp) * 3 ** i
+                for i, key in enumerate(reversed(CONFIG_KEYS)))
+    for code in np.unique(codes):
+        index = np.flatnonzero(codes == code)
+        yield tuple(TOPOLOGY_NAMES[designs[key][index[0]]] for key in CONFIG_KEYS), index
+
+
+def analyze_designs(designs, w=DEFAULT_W):
+    """Equivalente de batch_analysis.analyze_records para un arreglo de diseños.
+
+    Los diseños de cada topología se analizan en una sola llamada vectorizada
+    a analyze_group; devuelve un dict de resultado por diseño, en orden.
+    """
+    designs = np.atleast_1d(designs)
+    results = [None] * designs.size
+    for topology, index in group_by_topology(designs):
+        group = designs[index]
+        values = {name: group[name] for name in COMPONENT_NAMES}
+        for i, result in zip(index, analyze_group(values, topology, w)):
+            result['configs'] = dict(zip(CONFIG_KEYS, topology))
+            results[i] = result
+    return results
+
+
+def share(designs):
+    """Copia los diseños a memoria compartida.
+
+    Devuelve (SharedMemory, arreglo sobre ella); otro proceso obtiene una vista
+    sin copia con attach(shm.name, len(designs)). Quien crea el bloque debe
+    llamar a shm.close() y shm.unlink() al terminar.
+    """
+    from multiprocessing.shared_memory import SharedMemory
+    designs = np.atleast_1d(designs)
+    shm = SharedMemory(create=True, size=max(designs.nbytes, 1))
+    shared = np.ndarray(designs.shape, DESIGN_DTYPE, buffer=shm.buf)
+    shared[...] = designs
+    return shm, shared
+
+
+def attach(name, n):
+    """Vista (SharedMemory, arreglo (n,)) de diseños creados con share() en otro proceso."""
+    from multiprocessing.shared_memory import SharedMemory
+    shm = SharedMemory(name=name)
+    return shm, np.ndarray((n,), DESIGN_DTYPE, buffer=shm.buf)
@@ -0,0 +1,206 @@
+"""
+Exportación sin pantalla de las gráficas de escalón, impulso y Bode.
+
+Las figuras de cada vista se construyen una sola vez por proceso (ejes,
+títulos y líneas vacías) y para cada diseño solo se reemplazan los datos de
+las líneas y se reajustan los límites antes de guardar, en lugar de crear una
+figura nueva con 3 o 6 subgráficas por diseño. Se usa matplotlib.figure.Figure
+directamente, sin pyplot, así que no hace falta un display; con varios
+procesos cada uno mantiene sus propias figuras y los diseños se reparten en
+bloques entre ellos.
+
+Las mismas funciones construyen las figuras interactivas de
+responses.run_complete_analysis.
+"""
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from analysis import AnalysisResult
+from batch_response import SYSTEM_NAMES
+from instrumentation import design, span
+
+VIEWS = ('escalon', 'impulso', 'bode')
+FORMATS = ('png', 'svg', 'pdf')
+VIEW_FIGSIZE = {'escalon': (10, 10), 'impulso': (10, 10), 'bode': (14, 12)}
+
+# (estilo, nombre en los títulos) de H1, H2 y H_total
+_SYSTEM_STYLES = (('b-', 'Primer Op-Amp'), ('r-', 'Segundo Op-Amp'), ('g-', 'Sistema Total'))
+_TIME_TITLES = {'escalon': 'Respuesta al Escalón', 'impulso': 'Respuesta al Impulso'}
+
+# Figuras reutilizadas por el proceso actual, indexadas por vista
+_FIGURES = {}
+
+
+def create_view_figure(view, figure=None):
+    """Crea los ejes y las líneas (sin datos) de una vista.
+
+    figure: figura donde dibujar (p. ej. plt.figure() en modo interactivo);
+    si es None se crea una matplotlib.figure.Figure sin backend interactivo
+    con layout restringido, que se reajusta al guardar sin el dibujado extra
+    que requiere tight_layout.
+
+    Devuelve un dict con 'view', 'figure', 'axes' y 'lines' (una línea por
+    subgráfica), que se rellena con update_view_figure.
+    """
+    if view not in VIEWS:
+        raise ValueError(f"Vista desconocida: {view!r} (use {', '.join(VIEWS)})")
+    if figure is None:
+        from matplotlib.figure import Figure
+        figure = Figure(figsize=VIEW_FIGSIZE[view], layout='constrained')
+
+    axes, lines = [], []
+    if view == 'bode':
+        for i, (style, label) in enumerate(_SYSTEM_STYLES):
+            for j, (quantity, ylabel) in enumerate((('Magnitud', 'Magnitud (dB)'),
+                                                   ('Fase', 'Fase (grados)'))):
+                ax = figure.add_subplot(3, 2, 2 * i + j + 1)
+                ax.set_xscale('log')
+                ax.set_title(f'Diagrama de Bode - {quantity} ({label})')
+                ax.set_ylabel(ylabel)
+                if i == 2:
+                    ax.set_xlabel('Frecuencia (Hz)')
+                ax.grid(True)
+                lines.append(ax.plot([], [], style, linewidth=2)[0])
+                axes.append(ax)
+    else:
+        for i, (style, label) in enumerate(_SYSTEM_STYLES):
+            ax = figure.add_subplot(3, 1, i + 1)
+            ax.set_title(f'{_TIME_TITLES[view]} - {label}')
+            ax.set_ylabel('Amplitud')
+            if i == 2:
+                ax.set_xlabel('Tiempo (s)')
+            ax.grid(True)
+            lines.append(ax.plot([], [], style, linewidth=2)[0])
+            axes.append(ax)
+    return {'view': view, 'figure': figure, 'axes': axes, 'lines': lines}
+
+
+def update_view_figure(view_figure, result):
+    """Reemplaza los datos de las líneas con los de un AnalysisResult."""
+    view = view_figure['view']
+    if view == 'bode':
+        data = []
+        for name in SYSTEM_NAMES:
+            bode = result.bode[name]
+            data += [(bode['freq'], bode['mag_db']), (bode['freq'], bode['phase_deg'])]
+    else:
+        responses = result.step_responses if view == 'escalon' else result.impulse_responses
+        data = [(result.time_grid, responses[name]) for name in SYSTEM_NAMES]
+    for ax, line, (x, y) in zip(view_figure['axes'], view_figure['lines'], data):
+        line.set_data(x, y)
+        ax.relim()
+        ax.autoscale_view()
+    if view_figure['figure'].get_layout_engine() is None:
+        view_figure['figure'].tight_layout()
+    return view_figure
+
+
+def _view_figure(view):
+    """Figura de la vista reutilizada por este proceso."""
+    if view not in _FIGURES:
+        _FIGURES[view] = create_view_figure(view)
+    return _FIGURES[view]
+
+
+def _safe_name(name):
+    return re.sub(r'[^\w.-]', '_', str(name))
+
+
+def export_design(name, valores, configs, output_dir, views=VIEWS, formats=('png',), dpi=100):
+    """Guarda las vistas de un diseño; devuelve las rutas escritas.
+
+    Los archivos se llaman <name>_<vista>.<formato> dentro de output_dir.
+    valores puede ser un registro de design_record; con configs=None se usa
+    su topología.
+    """
+    result = AnalysisResult(valores if configs is None else (None, None, valores, configs))
+    paths = []
+    with design(name):
+        for view in views:
+            with span('matplotlib.update', view=view):
+                view_figure = update_view_figure(_view_figure(view), result)
+            for fmt in formats:
+                path = os.path.join(output_dir, f'{_safe_name(name)}_{view}.{fmt}')
+                with span('matplotlib.savefig', view=view, format=fmt):
+                    view_figure['figure'].savefig(path, format=fmt, dpi=dpi)
+                paths.append(path)
+    return paths
+
+
+def _init_worker(views=VIEWS):
+    """Prepara un proceso: backend no interactivo, estilo y figuras creadas."""
+    import matplotlib
+    matplotlib.use('Agg')
+    from utils import configure_plots
+    configure_plots()
+    for view in views:
+        _view_figure(view)
+
+
+def _export_chunk(args):
+    designs, output_dir, views, formats, dpi = args
+    written = []
+    for name, valores, configs in designs:
+        try:
+            paths = export_design(name, valores, configs, output_dir, views, formats, dpi)
+            written.append((name, paths, None))
+        except Exception as e:
+            written.append((name, [], f"{type(e).__name__}: {e}"))
+    return written
+
+
+def _chunks(designs, size):
+    chunk = []
+    for item in designs:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def export_figures(designs, output_dir, views=VIEWS, formats=('png',), dpi=100,
+                   workers=None, chunk_size=8):
+    """Exporta las vistas de muchos diseños repartiéndolos entre procesos.
+
+    designs: iterable de (nombre, valores, configs), con valores indexados por
+        nombre de componente y configs como en init_components.
+    workers: número de procesos (por defecto os.cpu_count()); con 1 se
+        renderiza en el proceso actual. designs se consume a medida que se
+        exporta, con como mucho 2 * workers bloques por delante.
+
+    Genera, en el orden de entrada, (nombre, rutas, error) por diseño; error
+    es None si el diseño se exportó correctamente.
+    """
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f"Formatos no soportados: {sorted(unknown)} (use {', '.join(FORMATS)})")
+    for view in views:
+        if view not in VIEWS:
+            raise ValueError(f"Vista desconocida: {view!r} (use {', '.join(VIEWS)})")
+    os.makedirs(output_dir, exist_ok=True)
+    views, formats = tuple(views), tuple(formats)
+    tasks = ((chunk, output_dir, views, formats, dpi) for chunk in _chunks(designs, chunk_size))
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(views)
+        for task in tasks:
+            yield from _export_chunk(task)
+        return
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(views,)) as pool:
+        # Como mucho dos bloques por proceso en vuelo: designs se lee a medida
+        # que salen los resultados (pool.map lo consumiría entero al empezar)
+        pending = deque()
+        try:
+            for task in tasks:
+                pending.append(pool.submit(_export_chunk, task))
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,221 @@
+"""
+Métricas exactas de la respuesta en frecuencia sin barrido.
+
+|H(jω)|² = P(x) / Q(x) es una función racional de x = ω², así que el pico de
+la banda de paso, las frecuencias de corte de -3 dB y el ancho de banda se
+obtienen resolviendo polinomios en x en lugar de buscar en una malla:
+  - pico: raíces positivas de P'Q - PQ' y los extremos x = 0 y x -> inf
+  - cortes: raíces positivas de P - g Q con g = |H|²pico * 10^(-3/10)
+Todo está vectorizado sobre lotes de sistemas con coeficientes (N, n).
+"""
+from functools import lru_cache
+import numpy as np
+from numeric_tf import system_coeffs, cancel_common_s, batch_roots
+from instrumentation import traced
+
+# Caída respecto al pico que define la frecuencia de corte
+CUTOFF_DB = 3.0
+
+# |Im x| / |x| máximo para aceptar como real una raíz de la matriz compañera
+ROOT_IMAG_TOL = 1e-6
+
+# Un coeficiente obtenido por diferencia se considera nulo si es menor que
+# esta fracción de la magnitud de sus términos (cancelación por redondeo)
+_CANCEL_TOL = 1e-9
+
+# Iteraciones de Newton para refinar las raíces
+_NEWTON_STEPS = 3
+
+
+@lru_cache(maxsize=None)
+def _square_terms(n):
+    """Matriz (n*n, n) que lleva cada producto a_k a_l a su término x^m con su signo."""
+    terms = np.zeros((n, n, n))
+    for k in range(n):
+        for l in range(k % 2, n, 2):
+            terms[k, l, (k + l) // 2] = -1.0 if (k - l) // 2 % 2 else 1.0
+    return terms.reshape(n * n, n)
+
+
+def squared_magnitude_coeffs(coeffs):
+    """Coeficientes en x = ω² de |a(jω)|² para polinomios a(s) (N, n).
+
+    El término x^m es sum(a_k a_l (-1)^((k-l)/2)) sobre k + l = 2m (potencias
+    ascendentes). Devuelve (N, n) en potencias descendentes de x.
+    """
+    a = np.asarray(coeffs, dtype=float)[..., ::-1]
+    n = a.shape[-1]
+    products = (a[..., :, None] * a[..., None, :]).reshape(a.shape[:-1] + (n * n,))
+    return (products @ _square_terms(n))[..., ::-1]
+
+
+def _polyval_rows(coeffs, x):
+    """Evalúa polinomios (N, n) en puntos x (N, k) con Horner."""
+    out = np.zeros(x.shape, dtype=np.result_type(coeffs, x))
+    for k in range(coeffs.shape[-1]):
+        out = out * x + coeffs[:, k:k + 1]
+    return out
+
+
+def _polyder_rows(coeffs):
+    """Derivada de polinomios (N, n) en potencias descendentes."""
+    n = coeffs.shape[-1]
+    if n == 1:
+        return np.zeros_like(coeffs)
+    return coeffs[:, :-1] * np.arange(n - 1, 0, -1)
+
+
+def _polymul_rows(a, b):
+    """Producto fila a fila de polinomios (N, na) y (N, nb)."""
+    out = np.zeros((a.shape[0], a.shape[-1] + b.shape[-1] - 1))
+    for k in range(a.shape[-1]):
+        out[:, k:k + b.shape[-1]] += a[:, k:k + 1] * b
+    return out
+
+
+def _pad_left(a, n):
+    out = np.zeros(a.shape[:-1] + (n,), dtype=a.dtype)
+    out[..., n - a.shape[-1]:] = a
+    return out
+
+
+def _degree(coeffs, envelope=None):
+    """Grado efectivo de cada fila (-1 si el polinomio es nulo).
+
+    envelope: magnitud de los términos que formaron cada coeficiente; si se
+    da, los coeficientes cancelados hasta el redondeo cuentan como nulos.
+    """
+    if envelope is None:
+        nonzero = coeffs != 0
+    else:
+        nonzero = np.abs(coeffs) > _CANCEL_TOL * envelope
+    first = np.where(nonzero.any(axis=-1), nonzero.argmax(axis=-1), coeffs.shape[-1])
+    return coeffs.shape[-1] - 1 - first
+
+
+def positive_real_roots(coeffs, envelope=None):
+    """Raíces reales positivas de polinomios (N, n), ordenadas.
+
+    Admite coeficientes principales nulos (grado distinto por fila, ver
+    _degree para envelope): las filas se agrupan por grado efectivo. Para el
+    cálculo con la matriz compañera la variable se escala con la cota de Fujiwara y luego cada raíz se refina con
+    Newton sobre el polinomio original. Devuelve (N, n-1) con NaN de relleno.
+    """
+    coeffs = np.asarray(coeffs, dtype=float)
+    n_rows, n = coeffs.shape
+    out = np.full((n_rows, max(n - 1, 0)), np.nan)
+    degree = _degree(coeffs, envelope)
+    for d in np.unique(degree):
+        if d < 1:
+            continue
+        rows = np.flatnonzero(degree == d)
+        c = coeffs[rows, n - 1 - d:]
+        c = c / c[:, :1]
+        k = np.arange(1, d + 1)
+        with np.errstate(divide='ignore'):
+            bound = np.max(np.abs(c[:, 1:]) ** (1.0 / k), axis=-1)
+        bound = np.where(bound > 0, bound, 1.0)
+        roots = batch_roots(c / bound[:, None] ** np.arange(d + 1)) * bound[:, None]
+
+        real = (np.abs(roots.imag) <= ROOT_IMAG_TOL * np.abs(roots)) & (roots.real > 0)
+        if not real.any():
+            continue
+        x = np.where(real, roots.real, np.nan)
+        dc = _polyder_rows(c)
+        f = _polyval_rows(c, x)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for _ in range(_NEWTON_STEPS):
+                step = x - f / _polyval_rows(dc, x)
+                f_step = _polyval_rows(c, step)
+                better = np.isfinite(step) & (step > 0) & (np.abs(f_step) <= np.abs(f))
+                if not better.any():
+                    break
+                x = np.where(better, step, x)
+                f = np.where(better, f_step, f)
+        out[rows, :d] = np.sort(x, axis=-1)
+    return out
+
+
+@traced('frequency_metrics')
+def frequency_metrics(system, cutoff_db=CUTOFF_DB):
+    """Pico, frecuencias de corte y ancho de banda exactos de uno o varios sistemas.
+
+    system: control.TransferFunction o (num, den) con coeficientes (n,) o (N, n).
+
+    Devuelve un diccionario con arreglos (N,) (frecuencias en Hz):
+      - peak_db, peak_hz: máximo de |H(jω)| y su frecuencia (inf si el
+        máximo se alcanza en ω -> inf)
+      - lower_cutoff_hz, upper_cutoff_hz: bordes de la banda de paso que
+        contiene al pico (0 e inf si la banda llega a DC o a alta frecuencia)
+      - bandwidth_hz: upper_cutoff_hz - lower_cutoff_hz
+      - cutoff_hz: frecuencia de corte única (la superior si existe, si no la
+        inferior; NaN si |H| no cae cutoff_db en ningún punto)
+      - crossings_hz: (N, k) todos los cruces de pico - cutoff_db, con NaN de
+        relleno
+    Si el pico es infinito (polo en el origen o sistema impropio) las métricas
+    de corte son NaN.
+    """
+    num, den = cancel_common_s(*system_coeffs(system))
+    P = squared_magnitude_coeffs(num)
+    Q = squared_magnitude_coeffs(den)
+    n_rows = P.shape[0]
+    rows = np.arange(n_rows)
+    deg_p, deg_q = _degree(P), _degree(Q)
+
+    # Candidatos al pico: x = 0, x -> inf y los puntos estacionarios
+    with np.errstate(divide='ignore', invalid='ignore'):
+        at_zero = np.where(Q[:, -1] != 0, P[:, -1] / Q[:, -1],
+                           np.where(P[:, -1] != 0, np.inf, 0.0))
+        lead_p = P[rows, P.shape[-1] - 1 - deg_p.clip(0)]
+        lead_q = Q[rows, Q.shape[-1] - 1 - deg_q.clip(0)]
+        at_inf = np.where(deg_p > deg_q, np.inf,
+                          np.where(deg_p == deg_q, lead_p / lead_q, 0.0))
+    at_inf = np.where(deg_p < 0, 0.0, at_inf)
+
+    dP, dQ = _polyder_rows(P), _polyder_rows(Q)
+    dP_Q, P_dQ = _polymul_rows(dP, Q), _polymul_rows(P, dQ)
+    size = max(dP_Q.shape[-1], P_dQ.shape[-1])
+    stationary = _pad_left(dP_Q, size) - _pad_left(P_dQ, size)
+    envelope = _pad_left(_polymul_rows(np.abs(dP), np.abs(Q)), size) \
+        + _pad_left(_polymul_rows(np.abs(P), np.abs(dQ)), size)
+    x_stat = positive_real_roots(stationary, envelope)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        g_stat = _polyval_rows(P, x_stat) / _polyval_rows(Q, x_stat)
+    g_stat = np.where(np.isfinite(g_stat), g_stat, -np.inf)
+
+    candidates = np.concatenate([at_zero[:, None], g_stat, at_inf[:, None]], axis=-1)
+    x_candidates = np.concatenate([np.zeros((n_rows, 1)), x_stat,
+                                   np.full((n_rows, 1), np.inf)], axis=-1)
+    best = np.argmax(candidates, axis=-1)
+    peak_sq = candidates[rows, best]
+    peak_x = x_candidates[rows, best]
+    peak_w = np.sqrt(peak_x)
+
+    # Cruces de -cutoff_db respecto al pico
+    valid = np.isfinite(peak_sq) & (peak_sq > 0)
+    g = np.where(valid, peak_sq, 0.0) * 10 ** (-cutoff_db / 10)
+    size = max(P.shape[-1], Q.shape[-1])
+    crossing = _pad_left(P, size) - g[:, None] * _pad_left(Q, size)
+    envelope = np.abs(_pad_left(P, size)) + g[:, None] * np.abs(_pad_left(Q, size))
+    crossing[~valid] = 0.0
+    w_cross = np.sqrt(positive_real_roots(crossing, envelope))
+
+    # Los NaN de relleno no cumplen ninguna de las dos comparaciones
+    lower = np.where(w_cross < peak_w[:, None], w_cross, 0.0).max(axis=-1, initial=0.0)
+    upper = np.where(w_cross > peak_w[:, None], w_cross, np.inf).min(axis=-1, initial=np.inf)
+    lower = np.where(valid, lower, np.nan)
+    upper = np.where(valid, upper, np.nan)
+    cutoff = np.where(np.isfinite(upper), upper, np.where(lower > 0, lower, np.nan))
+
+    to_hz = 1 / (2 * np.pi)
+    with np.errstate(divide='ignore'):
+        peak_db = 10 * np.log10(peak_sq)
+    return {
+        'peak_db': peak_db,
+        'peak_hz': peak_w * to_hz,
+        'lower_cutoff_hz': lower * to_hz,
+        'upper_cutoff_hz': upper * to_hz,
+        'bandwidth_hz': (upper - lower) * to_hz,
+        'cutoff_hz': cutoff * to_hz,
+        'crossings_hz': w_cross * to_hz,
+    }
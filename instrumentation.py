@@ -0,0 +1,208 @@
+"""
+Instrumentación opcional de las etapas costosas del análisis.
+
+Las etapas se marcan con span('nombre') (bloques) o @traced('nombre')
+(funciones). Mientras la instrumentación está desactivada span devuelve un
+contexto nulo compartido y traced solo comprueba una variable global, así que
+el costo es de menos de un microsegundo por llamada.
+
+Con enable() cada span registra su duración, el diseño en curso (ver
+design()) y, si se pide, la memoria asignada con tracemalloc: bytes netos al
+salir y pico por encima del inicio. Los eventos se resumen por etapa o por
+diseño con summary() / print_summary() y se exportan en el formato de Chrome
+trace (chrome://tracing, Perfetto) con export_chrome_trace().
+
+También se activa al importar si la variable de entorno CIRCUIT_TRACE vale 1
+(o 'alloc' para medir también la memoria). Los spans de los procesos
+hijos (p. ej. figure_export con varios procesos) no se recogen.
+"""
+import contextlib
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+_enabled = False
+_allocations = False
+_origin = 0.0
+_events = []
+_design = None
+# Pila de spans abiertos (para el pico de memoria de los spans anidados)
+_stack = []
+_NULL_SPAN = contextlib.nullcontext()
+
+
+def enable(allocations=False):
+    """Activa la instrumentación y descarta los eventos anteriores.
+
+    allocations: si True se mide la memoria con tracemalloc (más lento).
+    """
+    global _enabled, _allocations, _origin
+    reset()
+    _allocations = allocations
+    if allocations and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _origin = time.perf_counter()
+    _enabled = True
+
+
+def disable():
+    """Desactiva la instrumentación; los eventos registrados se conservan."""
+    global _enabled
+    _enabled = False
+    if _allocations and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """Descarta los eventos registrados."""
+    _events.clear()
+    _stack.clear()
+
+
+def events():
+    """Lista de eventos registrados (dicts con name, design, start_s, dur_s, ...)."""
+    return list(_events)
+
+
+class _Span:
+    __slots__ = ('name', 'args', 'start', 'mem_start', 'peak')
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        if _allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            if _stack:
+                _stack[-1].peak = max(_stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+            self.mem_start = self.peak = current
+        _stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        _stack.pop()
+        event = {'name': self.name, 'design': _design, 'start_s': self.start - _origin,
+                 'dur_s': end - self.start, 'thread': threading.get_ident()}
+        if _allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            self.peak = max(self.peak, peak)
+            event['alloc_bytes'] = current - self.mem_start
+            event['peak_bytes'] = self.peak - self.mem_start
+            if _stack:
+                _stack[-1].peak = max(_stack[-1].peak, self.peak)
+        if self.args:
+            event['args'] = self.args
+        _events.append(event)
+        return False
+
+
+def span(name, **args):
+    """Contexto que mide el bloque como la etapa `name` (nulo si está desactivada)."""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, args)
+
+
+def traced(name):
+    """Decorador que mide cada llamada a la función como la etapa `name`."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(name, None):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextlib.contextmanager
+def design(label):
+    """Asocia los spans del bloque al diseño `label`."""
+    global _design
+    previous, _design = _design, label
+    try:
+        if _enabled:
+            with _Span('design', {'label': str(label)}):
+                yield
+        else:
+            yield
+    finally:
+        _design = previous
+
+
+def summary(by='name'):
+    """Agrega los eventos por etapa ('name') o por diseño ('design').
+
+    Devuelve {clave: {'calls', 'total_s', 'mean_s', 'max_s'[, 'alloc_bytes',
+    'peak_bytes']}}; con by='design' la clave es (diseño, etapa). El span
+    'design' que envuelve a cada diseño aparece como una etapa más.
+    """
+    out = {}
+    for event in _events:
+        key = event['name'] if by == 'name' else (event['design'], event['name'])
+        stats = out.setdefault(key, {'calls': 0, 'total_s': 0.0, 'max_s': 0.0})
+        stats['calls'] += 1
+        stats['total_s'] += event['dur_s']
+        stats['max_s'] = max(stats['max_s'], event['dur_s'])
+        if 'alloc_bytes' in event:
+            stats['alloc_bytes'] = stats.get('alloc_bytes', 0) + event['alloc_bytes']
+            stats['peak_bytes'] = max(stats.get('peak_bytes', 0), event['peak_bytes'])
+    for stats in out.values():
+        stats['mean_s'] = stats['total_s'] / stats['calls']
+    return out
+
+
+def print_summary(by='name', file=None):
+    """Imprime la tabla de summary() ordenada por tiempo total (por diseño si by='design')."""
+    file = file or sys.stdout
+    if by == 'name':
+        order = lambda item: -item[1]['total_s']
+    else:
+        order = lambda item: (str(item[0][0]), -item[1]['total_s'])
+    rows = sorted(summary(by).items(), key=order)
+    alloc = any('alloc_bytes' in stats for _, stats in rows)
+    header = f"{'etapa':<40} {'llamadas':>9} {'total (ms)':>11} {'media (ms)':>11} {'máx (ms)':>10}"
+    print(header + (f" {'asignado (kB)':>14} {'pico (kB)':>10}" if alloc else ''), file=file)
+    for key, stats in rows:
+        label = key if by == 'name' else f"{key[0]} / {key[1]}"
+        line = (f"{label:<40} {stats['calls']:9d} {stats['total_s'] * 1e3:11.3f} "
+                f"{stats['mean_s'] * 1e3:11.3f} {stats['max_s'] * 1e3:10.3f}")
+        if alloc:
+            line += (f" {stats.get('alloc_bytes', 0) / 1024:14.1f}"
+                     f" {stats.get('peak_bytes', 0) / 1024:10.1f}")
+        print(line, file=file)
+
+
+def export_chrome_trace(path):
+    """Escribe los eventos en formato Chrome trace (eventos completos 'X', en µs)."""
+    pid = os.getpid()
+    trace = []
+    for event in _events:
+        args = dict(event.get('args') or {})
+        if event['design'] is not None:
+            args['design'] = str(event['design'])
+        for key in ('alloc_bytes', 'peak_bytes'):
+            if key in event:
+                args[key] = event[key]
+        trace.append({'name': event['name'], 'cat': 'analysis', 'ph': 'X', 'pid': pid,
+                      'tid': event['thread'], 'ts': event['start_s'] * 1e6,
+                      'dur': event['dur_s'] * 1e6, 'args': args})
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, f)
+
+
+if os.environ.get('CIRCUIT_TRACE') in ('1', 'alloc'):
+    enable(allocations=os.environ['CIRCUIT_TRACE'] == 'alloc')
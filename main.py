@@ -1,55 +1,362 @@
-from thevenin_analysis import plot_thevenin_analysis
-from transfer_function import analyze_transfer_function_no_plots
-from responses import run_complete_analysis, analyze_responses_no_plots
-from utils import init_components
+import argparse
+import sys
+from utils import init_components, config_from_name, get_user_input, CONFIG_NAMES, FILTER_TYPES
 
 def show_menu():
     print("\n=== MENÚ DE GRÁFICAS ===")
     print("1. Respuesta al escalón")
     print("2. Respuesta al impulso")
     print("3. Diagrama de Bode (respuesta en frecuencia)")
-    print("4. Salir")
+    print("4. Cambiar un componente o configuración")
+    print("5. Salir")
     while True:
         try:
-            choice = int(input("\nSeleccione la gráfica que desea ver (1-4): "))
-            if 1 <= choice <= 4:
+            choice = int(input("\nSeleccione la gráfica que desea ver (1-5): "))
+            if 1 <= choice <= 5:
                 return choice
-            print("Por favor, seleccione un número entre 1 y 4.")
+            print("Por favor, seleccione un número entre 1 y 5.")
         except ValueError:
             print("Por favor, ingrese un número válido.")
 
-def main():
-    # Obtener todos los datos una sola vez
-    components = init_components()
+def ask_change():
+    """Pide el nombre de un componente o configuración y su nuevo valor."""
+    from numeric_tf import COMPONENT_NAMES
+    config_keys = ('config1', 'input1', 'config2', 'input2')
+    while True:
+        name = input(f"\nNombre a cambiar ({', '.join(COMPONENT_NAMES + config_keys)}): ").strip()
+        if name in COMPONENT_NAMES:
+            unit = "F" if name.startswith('C') else "Ω"
+            return name, get_user_input(f"Nuevo valor de {name} ({unit}): ",
+                                        allow_zero=name.startswith('C'))
+        if name in config_keys:
+            value = input(f"Nueva configuración de {name} ({', '.join(CONFIG_NAMES)}): ").strip()
+            if value in CONFIG_NAMES:
+                return name, value
+            print("Configuración desconocida.")
+        else:
+            print("Nombre desconocido.")
+
+def print_reports(components, result):
+    """Imprime los análisis de funciones de transferencia y de respuestas."""
+    from transfer_function import analyze_transfer_function_no_plots
+    from responses import analyze_responses_no_plots
 
-    # Mostrar todos los análisis numéricos primero
-    print("\n================================================")
-    print("=== ANÁLISIS DE EQUIVALENTES THÉVENIN ===")
-    print("================================================")
-    plot_thevenin_analysis(components)
-    
     print("\n================================================")
     print("=== ANÁLISIS DE FUNCIONES DE TRANSFERENCIA ===")
     print("================================================")
-    analyze_transfer_function_no_plots(components)
-    
+    analyze_transfer_function_no_plots(components, result=result)
+
     print("\n================================================")
     print("=== ANÁLISIS DE RESPUESTAS DEL SISTEMA ===")
     print("================================================")
-    analyze_responses_no_plots(components)
-    
+    analyze_responses_no_plots(components, result=result)
+
+def main(cache_path=None):
+    # El modo interactivo carga matplotlib y control; los subcomandos no
+    from thevenin_analysis import plot_thevenin_analysis
+    from responses import run_complete_analysis
+    from analysis import AnalysisResult, AnalysisSession
+
+    # Obtener todos los datos una sola vez; los cálculos se memoizan en result
+    components = init_components()
+    if cache_path:
+        # Reutiliza los resultados guardados si el diseño ya se analizó
+        from result_cache import ResultCache
+        with ResultCache(cache_path) as cache:
+            result = cache.analysis(components)
+            stats = cache.stats()
+        print(f"\nCaché de resultados: {stats['hits']} aciertos, {stats['misses']} fallos "
+              f"({stats['entries']} diseños guardados)")
+    else:
+        result = AnalysisResult(components)
+
+    # Mostrar todos los análisis numéricos primero
+    print("\n================================================")
+    print("=== ANÁLISIS DE EQUIVALENTES THÉVENIN ===")
+    print("================================================")
+    plot_thevenin_analysis(components)
+    print_reports(components, result)
+    # Los cambios de un componente solo recalculan la etapa afectada y H_total
+    session = AnalysisSession(result=result)
+
     # Menú para seleccionar gráficas
     while True:
         choice = show_menu()
         if choice == 1:
-            run_complete_analysis(components, show_plots='escalon')
+            run_complete_analysis(components, show_plots='escalon', result=result)
         elif choice == 2:
-            run_complete_analysis(components, show_plots='impulso')
+            run_complete_analysis(components, show_plots='impulso', result=result)
         elif choice == 3:
-            run_complete_analysis(components, show_plots='bode')
-        else:  # choice == 4
+            run_complete_analysis(components, show_plots='bode', result=result)
+        elif choice == 4:
+            name, value = ask_change()
+            result = session.update(**{name: value})
+            if not session.stale:
+                print("El valor no cambió; se conservan los resultados.")
+                continue
+            components = session.components
+            print(f"\nSe recalculan: {', '.join(session.stale)}")
+            print_reports(components, result)
+        else:  # choice == 5
             print("\n¡Gracias por usar el programa!")
             break
 
+def build_parser():
+    """Crea el analizador de argumentos de la línea de comandos."""
+    parser = argparse.ArgumentParser(
+        description="Análisis de circuitos con dos amplificadores operacionales. "
+                    "Sin subcomando se ejecuta el modo interactivo.")
+    parser.add_argument('--cache', metavar='ARCHIVO',
+                        help="caché SQLite de resultados para el modo interactivo")
+    parser.add_argument('--trace', metavar='ARCHIVO',
+                        help="registra los tiempos de cada etapa y los guarda como Chrome trace")
+    parser.add_argument('--trace-alloc', action='store_true',
+                        help="con --trace, mide también la memoria asignada (más lento)")
+    parser.add_argument('--trace-summary', action='store_true',
+                        help="imprime en stderr la tabla de tiempos por etapa al terminar")
+    subparsers = parser.add_subparsers(dest='command')
+
+    sweep_parser = subparsers.add_parser('sweep', help="Barrido de parámetros sobre una malla")
+    sweep_parser.add_argument('--sweep', action='append', required=True,
+                              metavar='NOMBRE=INICIO:FIN:N[:log|lin]',
+                              help="rango de un componente (puede repetirse)")
+    sweep_parser.add_argument('--value', action='append', default=[], metavar='NOMBRE=VALOR',
+                              help="valor fijo de un componente (puede repetirse)")
+    for key in ('config1', 'input1', 'config2', 'input2'):
+        sweep_parser.add_argument(f'--{key}', choices=list(CONFIG_NAMES), default='R',
+                                  help=f"configuración de {key} (por defecto R)")
+    sweep_parser.add_argument('--step-info', action='store_true',
+                              help="calcular también step_info (step_metrics) en cada punto")
+    sweep_parser.add_argument('--output', help="archivo .npz donde guardar el resultado")
+
+    batch_parser = subparsers.add_parser(
+        'batch', help="Analiza diseños leídos de CSV/JSONL y escribe resultados JSONL")
+    batch_parser.add_argument('input', nargs='?', default='-',
+                              help="archivo de entrada ('-' para stdin)")
+    batch_parser.add_argument('--output', '-o', default='-',
+                              help="archivo JSONL de salida ('-' para stdout)")
+    batch_parser.add_argument('--format', choices=('csv', 'jsonl'),
+                              help="formato de entrada (por defecto según la extensión)")
+    batch_parser.add_argument('--chunk-size', type=int, default=1000,
+                              help="registros analizados por bloque")
+
+    export_parser = subparsers.add_parser(
+        'export', help="Guarda las gráficas de diseños leídos de CSV/JSONL sin pantalla")
+    export_parser.add_argument('input', nargs='?', default='-',
+                               help="archivo de entrada ('-' para stdin)")
+    export_parser.add_argument('--output-dir', '-o', default='figuras',
+                               help="directorio donde escribir las figuras")
+    export_parser.add_argument('--format', choices=('csv', 'jsonl'),
+                               help="formato de entrada (por defecto según la extensión)")
+    export_parser.add_argument('--view', action='append', choices=('escalon', 'impulso', 'bode'),
+                               help="vista a exportar (puede repetirse; por defecto todas)")
+    export_parser.add_argument('--image-format', action='append', choices=('png', 'svg', 'pdf'),
+                               help="formato de imagen (puede repetirse; por defecto png)")
+    export_parser.add_argument('--dpi', type=int, default=100, help="resolución de las imágenes")
+    export_parser.add_argument('--workers', type=int,
+                               help="procesos de renderizado (por defecto uno por núcleo)")
+
+    search_parser = subparsers.add_parser(
+        'search', help="Busca componentes normalizados (E12/E24/E96) para una especificación")
+    search_parser.add_argument('--cutoff', type=float, required=True,
+                               help="frecuencia de corte objetivo de H_total (Hz)")
+    search_parser.add_argument('--gain-db', type=float,
+                               help="ganancia objetivo de la banda de paso (dB)")
+    search_parser.add_argument('--filter-type', choices=FILTER_TYPES,
+                               help="tipo de filtro exigido (según determine_filter_type)")
+    for key in ('config1', 'input1', 'config2', 'input2'):
+        search_parser.add_argument(f'--{key}', choices=list(CONFIG_NAMES), default='R',
+                                   help=f"configuración de {key} (por defecto R)")
+    search_parser.add_argument('--series', choices=('E12', 'E24', 'E96'), default='E24',
+                               help="serie de las resistencias (por defecto E24)")
+    search_parser.add_argument('--cap-series', choices=('E12', 'E24', 'E96'), default='E12',
+                               help="serie de los capacitores (por defecto E12)")
+    search_parser.add_argument('--top', type=int, default=10, help="número de diseños a mostrar")
+
+    filter_parser = subparsers.add_parser(
+        'filter', help="Filtra una señal raw/WAV/NPY por bloques con el circuito discretizado")
+    filter_parser.add_argument('input', help="archivo de entrada (.wav, .npy o raw)")
+    filter_parser.add_argument('--output', '-o', required=True,
+                               help="archivo de salida (.wav, .npy o raw)")
+    filter_parser.add_argument('--value', action='append', default=[], metavar='NOMBRE=VALOR',
+                               help="valor de un componente (puede repetirse)")
+    for key in ('config1', 'input1', 'config2', 'input2'):
+        filter_parser.add_argument(f'--{key}', choices=list(CONFIG_NAMES), default='R',
+                                   help=f"configuración de {key} (por defecto R)")
+    filter_parser.add_argument('--system', choices=('H1', 'H2', 'H_total'), default='H_total',
+                               help="sistema a aplicar (por defecto H_total)")
+    filter_parser.add_argument('--normalized', action='store_true',
+                               help="usar los coeficientes normalizados de get_numeric_tf "
+                                    "en lugar de la ganancia real")
+    filter_parser.add_argument('--fs', type=float,
+                               help="frecuencia de muestreo en Hz (los WAV la traen)")
+    filter_parser.add_argument('--prewarp', type=float, metavar='HZ',
+                               help="frecuencia donde la discretización es exacta")
+    filter_parser.add_argument('--format', choices=('raw', 'wav', 'npy'),
+                               help="formato de entrada (por defecto según la extensión)")
+    filter_parser.add_argument('--dtype', default='float64', help="tipo de las muestras raw")
+    filter_parser.add_argument('--channels', type=int, default=1,
+                               help="canales intercalados de la entrada raw")
+    filter_parser.add_argument('--output-dtype', help="tipo de las muestras de salida")
+    filter_parser.add_argument('--block-size', type=int, default=65536,
+                               help="muestras por bloque")
+
+    # Mismos argumentos que service.build_parser, declarados aquí para no
+    # importar service (y asyncio) en cada arranque
+    serve_parser = subparsers.add_parser(
+        'serve', help="Servicio local HTTP/JSON de análisis (ver service.py)")
+    serve_parser.add_argument('--host', default='127.0.0.1', help="dirección donde escuchar")
+    serve_parser.add_argument('--port', type=int, default=8765,
+                              help="puerto (0 elige uno libre)")
+    serve_parser.add_argument('--workers', type=int,
+                              help="procesos de análisis (por defecto uno por núcleo)")
+    serve_parser.add_argument('--max-pending', type=int,
+                              help="análisis distintos en curso antes de responder 503 "
+                                   "(por defecto service.DEFAULT_MAX_PENDING)")
+    serve_parser.add_argument('--cache', metavar='ARCHIVO',
+                              help="caché SQLite de resultados compartida por los procesos")
+    return parser
+
+def run_sweep_command(args, parser):
+    """Ejecuta el subcomando 'sweep'; los valores inválidos son errores de uso."""
+    from sweep import parse_range, run_sweep, save_sweep, print_sweep_summary
+    try:
+        ranges = dict(parse_range(text) for text in args.sweep)
+        fixed = {}
+        for text in args.value:
+            name, _, value = text.partition('=')
+            try:
+                fixed[name] = float(value)
+            except ValueError:
+                raise ValueError(f"Valor inválido para {name}: {value!r}") from None
+        configs = {key: config_from_name(getattr(args, key))
+                   for key in ('config1', 'input1', 'config2', 'input2')}
+        result = run_sweep(ranges, configs, fixed, step_info=args.step_info)
+    except ValueError as e:
+        parser.error(str(e))
+    print_sweep_summary(result)
+    if args.output:
+        save_sweep(result, args.output)
+        print(f"\nResultado guardado en {args.output}")
+
+def run_search_command(args):
+    """Ejecuta el subcomando 'search'."""
+    from component_search import search_components, print_search_results
+    topology = tuple(getattr(args, key) for key in ('config1', 'input1', 'config2', 'input2'))
+    results = search_components(args.cutoff, topology, args.gain_db, args.filter_type,
+                                args.series, args.cap_series, args.top)
+    print_search_results(results)
+
+def run_filter_command(args, parser):
+    """Ejecuta el subcomando 'filter'.
+
+    Los valores se validan con batch_analysis.parse_record (R1..R4 positivos);
+    los errores se informan como errores de uso de parser.
+    """
+    from numeric_tf import COMPONENT_NAMES, calc_individual_coeffs, coeffs_to_tf
+    from batch_response import SYSTEM_NAMES
+    from batch_analysis import CONFIG_KEYS, parse_record
+    from signal_stream import filter_file
+    record = {key: getattr(args, key) for key in CONFIG_KEYS}
+    for text in args.value:
+        name, _, value = text.partition('=')
+        if name not in COMPONENT_NAMES:
+            parser.error(f"Componente desconocido en --value: {name!r}")
+        record[name] = value
+    try:
+        values, _ = parse_record(record)
+    except ValueError as e:
+        parser.error(f"{e} (use --value NOMBRE=VALOR)")
+    configs = {key: config_from_name(record[key]) for key in CONFIG_KEYS}
+    num, den = calc_individual_coeffs(values, configs)[SYSTEM_NAMES.index(args.system)]
+    system = coeffs_to_tf(num, den) if args.normalized else (num, den)
+    stats = filter_file(system, args.input, args.output, args.fs, args.block_size, args.format,
+                        args.dtype, args.channels, output_dtype=args.output_dtype,
+                        prewarp_hz=args.prewarp)
+    rate = stats['frames'] / stats['seconds'] if stats['seconds'] > 0 else float('inf')
+    print(f"{stats['frames']} muestras x {stats['channels']} canales a {stats['fs']:g} Hz "
+          f"en {stats['blocks']} bloques ({rate:,.0f} muestras/s)", file=sys.stderr)
+    if stats['clipped']:
+        print(f"Advertencia: {stats['clipped']} muestras saturadas", file=sys.stderr)
+
+def run_batch_command(args):
+    """Ejecuta el subcomando 'batch'."""
+    from batch_analysis import run_batch, open_stream, guess_format
+    fmt = args.format or guess_format(args.input)
+    input_stream = open_stream(args.input, 'r')
+    output_stream = open_stream(args.output, 'w')
+    try:
+        count = run_batch(input_stream, output_stream, fmt, args.chunk_size)
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+    print(f"{count} diseños analizados", file=sys.stderr)
+
+def run_export_command(args):
+    """Ejecuta el subcomando 'export'."""
+    from batch_analysis import read_records, parse_record, open_stream, guess_format
+    from figure_export import VIEWS, export_figures
+
+    def designs(stream):
+        for index, record in enumerate(read_records(stream, fmt)):
+            name = record.get('id', f'{index:05d}')
+            try:
+                values, topology = parse_record(record)
+            except (ValueError, TypeError) as e:
+                print(f"{name}: {e}", file=sys.stderr)
+                continue
+            configs = dict(zip(('config1', 'input1', 'config2', 'input2'),
+                               map(config_from_name, topology)))
+            yield name, values, configs
+
+    fmt = args.format or guess_format(args.input)
+    input_stream = open_stream(args.input, 'r')
+    count = 0
+    try:
+        for name, paths, error in export_figures(designs(input_stream), args.output_dir,
+                                                 args.view or VIEWS, args.image_format or ('png',),
+                                                 args.dpi, args.workers):
+            if error:
+                print(f"{name}: {error}", file=sys.stderr)
+            count += len(paths)
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+    print(f"{count} figuras escritas en {args.output_dir}", file=sys.stderr)
+
+def cli(argv=None):
+    """Punto de entrada de la línea de comandos."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    tracing = args.trace or args.trace_summary
+    if tracing:
+        import instrumentation
+        instrumentation.enable(allocations=args.trace_alloc)
+    try:
+        if args.command == 'sweep':
+            run_sweep_command(args, parser)
+        elif args.command == 'filter':
+            run_filter_command(args, parser)
+        elif args.command == 'search':
+            run_search_command(args)
+        elif args.command == 'batch':
+            run_batch_command(args)
+        elif args.command == 'export':
+            run_export_command(args)
+        elif args.command == 'serve':
+            from service import run_from_args
+            run_from_args(args)
+        else:
+            main(args.cache)
+    finally:
+        if tracing:
+            instrumentation.disable()
+            if args.trace:
+                instrumentation.export_chrome_trace(args.trace)
+            if args.trace_summary:
+                instrumentation.print_summary(file=sys.stderr)
+
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    cli()
\ No newline at end of file
@@ -0,0 +1,197 @@
+"""
+Análisis de Monte Carlo de tolerancias y rendimiento (yield) del circuito.
+
+Se muestrean los ocho componentes (R1..R4, C1, C2, Ci1, Ci2) alrededor de sus
+valores nominales y, para cada muestra, se evalúan la frecuencia de corte
+(-3 dB), la ganancia DC y los polos del sistema total. La evaluación está
+vectorizada por bloques y los bloques se reparten en un pool de procesos; cada
+bloque usa su propia semilla derivada de `seed`, por lo que el resultado es
+reproducible con cualquier número de procesos.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from utils import init_components
+from numeric_tf import (COMPONENT_NAMES, values_by_name, calc_individual_coeffs,
+                        cancel_common_s, dc_gain, batch_roots)
+from frequency_metrics import frequency_metrics
+from design_record import as_components
+
+# Resistencias al 1 %, capacitores al 5 %
+DEFAULT_TOLERANCES = {
+    'R1': 0.01, 'R2': 0.01, 'R3': 0.01, 'R4': 0.01,
+    'C1': 0.05, 'C2': 0.05, 'Ci1': 0.05, 'Ci2': 0.05,
+}
+
+# Especificación por defecto alrededor del diseño nominal
+DEFAULT_CUTOFF_TOL = 0.05  # ±5 % en la frecuencia de corte
+DEFAULT_GAIN_TOL_DB = 0.5  # ±0.5 dB en la ganancia DC
+
+METRIC_NAMES = ('cutoff_hz', 'dc_gain_db', 'max_pole_real')
+
+
+def sample_components(nominal, tolerances, n, rng, distribution='uniform'):
+    """Muestrea n juegos de componentes alrededor de los valores nominales.
+
+    distribution: 'uniform' (uniforme en ±tol) o 'normal' (tol = 3 sigma).
+    Los componentes ausentes (valor 0) permanecen en 0.
+    """
+    samples = {}
+    for name in COMPONENT_NAMES:
+        tol = tolerances.get(name, 0.0)
+        if distribution == 'uniform':
+            dev = rng.uniform(-tol, tol, n)
+        elif distribution == 'normal':
+            dev = rng.normal(0.0, tol / 3, n)
+        else:
+            raise ValueError(f"Distribución no soportada: {distribution}")
+        samples[name] = nominal[name] * (1 + dev)
+    return samples
+
+
+def evaluate_metrics(values, configs):
+    """Evalúa las métricas del sistema total para un lote de diseños.
+
+    Devuelve un diccionario con arreglos (N,):
+      - cutoff_hz: frecuencia de corte (-3 dB respecto al pico), en Hz
+      - dc_gain_db: ganancia en s = 0 (±inf si hay un cero/polo en el origen)
+      - max_pole_real: mayor parte real de los polos
+      - stable: True si todos los polos tienen parte real negativa
+    """
+    _, _, (num, den) = calc_individual_coeffs(values, configs)
+    num, den = cancel_common_s(np.atleast_2d(num), np.atleast_2d(den))
+
+    # Frecuencia de corte exacta, sin barrido en frecuencia
+    cutoff_hz = frequency_metrics((num, den))['cutoff_hz']
+
+    with np.errstate(divide='ignore'):
+        dc_gain_db = 20 * np.log10(np.abs(dc_gain(num, den)))
+
+    poles = batch_roots(den)
+    max_pole_real = poles.real.max(axis=-1) if poles.shape[-1] else np.full(len(num), -np.inf)
+    return {
+        'cutoff_hz': cutoff_hz,
+        'dc_gain_db': dc_gain_db,
+        'max_pole_real': max_pole_real,
+        'stable': max_pole_real < 0,
+    }
+
+
+def _run_chunk(args):
+    """Evalúa un bloque de muestras (se ejecuta en un proceso del pool)."""
+    nominal, configs, tolerances, distribution, n, seed_seq = args
+    rng = np.random.default_rng(seed_seq)
+    samples = sample_components(nominal, tolerances, n, rng, distribution)
+    return evaluate_metrics(samples, configs)
+
+
+def default_spec(nominal_metrics):
+    """Especificación alrededor de las métricas del diseño nominal.
+
+    Si el diseño nominal no tiene frecuencia de corte (p. ej. solo
+    resistencias o un integrador) o su ganancia DC no es finita, ese criterio
+    se omite en lugar de exigir un intervalo NaN que ninguna muestra cumple.
+    """
+    cutoff = nominal_metrics['cutoff_hz'][0]
+    gain = nominal_metrics['dc_gain_db'][0]
+    spec = {}
+    if np.isfinite(cutoff):
+        spec['cutoff_hz'] = (cutoff * (1 - DEFAULT_CUTOFF_TOL), cutoff * (1 + DEFAULT_CUTOFF_TOL))
+    if np.isfinite(gain):
+        spec['dc_gain_db'] = (gain - DEFAULT_GAIN_TOL_DB, gain + DEFAULT_GAIN_TOL_DB)
+    spec['stable'] = bool(nominal_metrics['stable'][0])
+    return spec
+
+
+def compute_yield(metrics, spec):
+    """Porcentaje de muestras dentro de la especificación, por métrica y global."""
+    passed = {}
+    for name, limits in spec.items():
+        if name == 'stable':
+            passed[name] = metrics['stable'] == limits
+        else:
+            lo, hi = limits
+            passed[name] = (metrics[name] >= lo) & (metrics[name] <= hi)
+    overall = np.logical_and.reduce(list(passed.values()))
+    yields = {name: 100 * ok.mean() for name, ok in passed.items()}
+    yields['total'] = 100 * overall.mean()
+    return yields
+
+
+def run_monte_carlo(components=None, n_samples=100_000, tolerances=None, spec=None,
+                    distribution='uniform', seed=0, chunk_size=10_000, workers=None,
+                    bins=50):
+    """Ejecuta el análisis de Monte Carlo sobre el diseño dado.
+
+    components: tupla de init_components o registro de design_record (se
+        solicita si es None).
+    tolerances: {nombre: tolerancia relativa}; por defecto DEFAULT_TOLERANCES.
+    spec: {'cutoff_hz': (min, max), 'dc_gain_db': (min, max), 'stable': bool};
+        por defecto se usa default_spec alrededor del diseño nominal.
+    workers: número de procesos (por defecto todos los núcleos).
+
+    Devuelve un diccionario con las métricas por muestra, el rendimiento (%),
+    los histogramas (conteos, bordes) y la especificación usada.
+    """
+    if components is None:
+        components = init_components()
+    _, _, valores, configs = as_components(components, symbols=False)
+    nominal = {name: float(v) for name, v in values_by_name(valores).items()}
+    tolerances = DEFAULT_TOLERANCES if tolerances is None else tolerances
+
+    if spec is None:
+        spec = default_spec(evaluate_metrics(nominal, configs))
+
+    sizes = [min(chunk_size, n_samples - i) for i in range(0, n_samples, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(nominal, configs, tolerances, distribution, n, ss)
+             for n, ss in zip(sizes, seeds)]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) == 1:
+        chunks = [_run_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_run_chunk, tasks))
+
+    metrics = {name: np.concatenate([c[name] for c in chunks]) for name in chunks[0]}
+    histograms = {}
+    for name in METRIC_NAMES:
+        finite = metrics[name][np.isfinite(metrics[name])]
+        if finite.size:
+            histograms[name] = np.histogram(finite, bins=bins)
+
+    return {
+        'n_samples': n_samples,
+        'metrics': metrics,
+        'yield': compute_yield(metrics, spec),
+        'histograms': histograms,
+        'spec': spec,
+    }
+
+
+def print_monte_carlo_report(result):
+    """Imprime un resumen del análisis de Monte Carlo."""
+    metrics = result['metrics']
+    print("\n=== ANÁLISIS DE MONTE CARLO ===")
+    print(f"Muestras: {result['n_samples']}")
+    for name in METRIC_NAMES:
+        values = metrics[name][np.isfinite(metrics[name])]
+        if values.size:
+            print(f"{name}: media = {values.mean():.4g}, desviación = {values.std():.4g}, "
+                  f"min = {values.min():.4g}, max = {values.max():.4g}")
+
+    print("\nEspecificación:")
+    for name, limits in result['spec'].items():
+        if name == 'stable':
+            print(f"  stable: {'estable' if limits else 'inestable'}")
+        else:
+            print(f"  {name}: [{limits[0]:.4g}, {limits[1]:.4g}]")
+
+    print("\nRendimiento (yield):")
+    for name, value in result['yield'].items():
+        print(f"  {name}: {value:.2f} %")
+
+
+if __name__ == '__main__':
+    print_monte_carlo_report(run_monte_carlo())
@@ -0,0 +1,271 @@
+"""
+Construcción numérica de las funciones de transferencia sin SymPy.
+
+Los coeficientes del numerador y denominador se obtienen directamente de las
+configuraciones de impedancia ('R', RC serie, RC paralelo) y de los valores de
+los componentes mediante aritmética de polinomios. Los coeficientes están en
+potencias descendentes de s. Los valores pueden ser escalares o arreglos de
+NumPy de la misma forma: en ese caso el resultado tiene forma (..., n) y un
+lote de diseños con la misma topología se procesa en una sola llamada.
+"""
+import sys
+import numpy as np
+from instrumentation import traced
+
+try:
+    import topology_catalog
+except ImportError:  # Catálogo aún no generado (build_topology_catalog.py)
+    topology_catalog = None
+
+COMPONENT_NAMES = ('R1', 'R2', 'R3', 'R4', 'C1', 'C2', 'Ci1', 'Ci2')
+
+# Umbral usado por get_numeric_tf para eliminar coeficientes despreciables
+COEFF_TOL = 1e-10
+
+_DEFAULT_INPUT = {'type': 'R', 'config': None}
+
+
+def values_by_name(valores):
+    """Devuelve un diccionario {nombre: valor} a partir de `valores`.
+
+    Acepta tanto el diccionario indexado por símbolos de SymPy que devuelve
+    init_components como uno indexado por nombres, o un arreglo de
+    design_record (cada componente es una vista de su campo, sin copia).
+    """
+    names = getattr(getattr(valores, 'dtype', None), 'names', None)
+    if names:
+        return {name: valores[name] for name in COMPONENT_NAMES if name in names}
+    return {getattr(k, 'name', k): v for k, v in valores.items()}
+
+
+def _polymul(a, b):
+    """Multiplica dos polinomios dados como listas de coeficientes."""
+    out = [0.0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        for j, y in enumerate(b):
+            out[i + j] = out[i + j] + x * y
+    return out
+
+
+def _topology_name(config, C):
+    """Nombre de la topología ('R', 'serie', 'paralelo') usado en topology_catalog."""
+    if config is None or config['type'] == 'R' or not np.any(C):
+        return 'R'
+    return 'serie' if config['config'] == 1 else 'paralelo'
+
+
+def _impedance_factors(R, C, config):
+    """Descompone la impedancia como coef * s**k * prod(F**e).
+
+    F = (R*C*s + 1)/(C*s) es el factor de una red RC. Se conserva la misma
+    estructura que produce SymPy para que los polinomios resultantes (incluidos
+    los factores s que SymPy no cancela) coincidan con los de get_numeric_tf.
+    """
+    if config is None or config['type'] == 'R' or not np.any(C):
+        return R, 0, []
+    if config['config'] == 1:  # Serie: R + 1/(sC) = F
+        return 1.0, 0, [(R, C, 1)]
+    # Paralelo: R*Zc/(R + Zc) = (R/C) * s**-1 * F**-1
+    return R / C, -1, [(R, C, -1)]
+
+
+def _stage_factors(R_in, C_in, input_cfg, R_fb, C_fb, fb_cfg):
+    """Descomposición de una etapa inversora H = -Z_fb / Z_in."""
+    coef_fb, k_fb, f_fb = _impedance_factors(R_fb, C_fb, fb_cfg)
+    coef_in, k_in, f_in = _impedance_factors(R_in, C_in, input_cfg)
+    return (-coef_fb / coef_in, k_fb - k_in,
+            f_fb + [(R, C, -e) for R, C, e in f_in])
+
+
+def _cascade_factors(*stages):
+    """Descomposición del producto de varias etapas."""
+    coef, k, factors = 1.0, 0, []
+    for coef_i, k_i, f_i in stages:
+        coef = coef * coef_i
+        k += k_i
+        factors = factors + f_i
+    return coef, k, factors
+
+
+def _factors_to_coeffs(coef, k, factors):
+    """Expande coef * s**k * prod(F**e) en (num, den) como lo hace as_numer_denom."""
+    num, den = [coef], [1.0]
+    s_num, s_den = max(k, 0), max(-k, 0)
+    for R, C, e in factors:
+        rc = [R * C, 1.0]
+        if e > 0:
+            num = _polymul(num, rc)
+            den = [d * C for d in den]
+            s_den += 1
+        else:
+            num = [n * C for n in num]
+            den = _polymul(den, rc)
+            s_num += 1
+    num = num + [0.0] * s_num
+    den = den + [0.0] * s_den
+    return _stack_coeffs(num, den)
+
+
+def _stack_coeffs(num, den):
+    """Convierte listas de coeficientes (escalares o arreglos) en arreglos (..., n)."""
+    if not any(isinstance(c, np.ndarray) for c in num + den):
+        return np.array(num, dtype=float), np.array(den, dtype=float)
+    shape = np.broadcast(*num, *den).shape
+    return (np.stack([np.broadcast_to(c, shape) for c in num], axis=-1),
+            np.stack([np.broadcast_to(c, shape) for c in den], axis=-1))
+
+
+def impedance_coeffs(R, C, config):
+    """Devuelve (num, den) de la impedancia según la configuración."""
+    return _factors_to_coeffs(*_impedance_factors(R, C, config))
+
+
+def stage_coeffs(R_in, C_in, input_cfg, R_fb, C_fb, fb_cfg):
+    """Coeficientes de una etapa inversora H = -Z_fb / Z_in."""
+    return _factors_to_coeffs(*_stage_factors(R_in, C_in, input_cfg, R_fb, C_fb, fb_cfg))
+
+
+def transfer_function_strings(configs):
+    """Expresiones simbólicas (H1, H2, H_total) como texto, desde topology_catalog."""
+    key1 = (_topology_name(configs['config1'], 1.0),
+            _topology_name(configs.get('input1', _DEFAULT_INPUT), 1.0))
+    key2 = (_topology_name(configs['config2'], 1.0),
+            _topology_name(configs.get('input2', _DEFAULT_INPUT), 1.0))
+    return (topology_catalog.STAGE1_STR[key1], topology_catalog.STAGE2_STR[key2],
+            topology_catalog.TOTAL_STR[key1 + key2])
+
+
+@traced('calc_individual_coeffs')
+def calc_individual_coeffs(valores, configs):
+    """Equivalente numérico de calc_individual_transfer_functions.
+
+    Devuelve ((num1, den1), (num2, den2), (num_total, den_total)) con la
+    ganancia real de cada etapa (sin normalizar).
+    """
+    v = values_by_name(valores)
+    if topology_catalog is not None:
+        key1 = (_topology_name(configs['config1'], v['C1']),
+                _topology_name(configs.get('input1', _DEFAULT_INPUT), v['Ci1']))
+        key2 = (_topology_name(configs['config2'], v['C2']),
+                _topology_name(configs.get('input2', _DEFAULT_INPUT), v['Ci2']))
+        return (
+            _stack_coeffs(*topology_catalog.STAGE1[key1](v['R1'], v['R2'], v['C1'], v['Ci1'])),
+            _stack_coeffs(*topology_catalog.STAGE2[key2](v['R3'], v['R4'], v['C2'], v['Ci2'])),
+            _stack_coeffs(*topology_catalog.TOTAL[key1 + key2](
+                *(v[name] for name in COMPONENT_NAMES))),
+        )
+    H1 = _stage_factors(v['R1'], v['Ci1'], configs.get('input1', _DEFAULT_INPUT),
+                        v['R2'], v['C1'], configs['config1'])
+    H2 = _stage_factors(v['R3'], v['Ci2'], configs.get('input2', _DEFAULT_INPUT),
+                        v['R4'], v['C2'], configs['config2'])
+    H_total = _cascade_factors(H1, H2)
+    return tuple(_factors_to_coeffs(*H) for H in (H1, H2, H_total))
+
+
+def normalize_coeffs(num, den):
+    """Normaliza los coeficientes igual que get_numeric_tf.
+
+    Divide numerador y denominador por su coeficiente de mayor magnitud y anula
+    los coeficientes menores que COEFF_TOL.
+    """
+    out = []
+    for c in (num, den):
+        c = np.asarray(c, dtype=float)
+        scale = np.abs(c).max(axis=-1, keepdims=True)
+        scale[scale == 0] = 1.0
+        c = c / scale
+        c[np.abs(c) < COEFF_TOL] = 0
+        out.append(c)
+    return tuple(out)
+
+
+def coeffs_to_tf(num, den):
+    """Crea un control.TransferFunction con los coeficientes normalizados."""
+    import control
+    num, den = normalize_coeffs(num, den)
+    return control.TransferFunction(num, den)
+
+
+def get_numeric_tfs(valores, configs):
+    """Devuelve (sys1, sys2, sys_total) sin pasar por SymPy."""
+    return tuple(coeffs_to_tf(num, den)
+                 for num, den in calc_individual_coeffs(valores, configs))
+
+
+def is_transfer_function(system):
+    """True si system es un control.TransferFunction.
+
+    No importa control: si el módulo aún no se cargó, system no puede ser
+    una de sus instancias.
+    """
+    control = sys.modules.get('control')
+    return control is not None and isinstance(system, control.TransferFunction)
+
+
+def system_coeffs(system):
+    """Devuelve (num, den) 2-D a partir de un TransferFunction o de coeficientes.
+
+    system: control.TransferFunction o (num, den) con coeficientes (n,) o
+    (N, n); el resultado tiene forma (N, n) con el mismo N en ambos.
+    """
+    if is_transfer_function(system):
+        num, den = system.num[0][0], system.den[0][0]
+    else:
+        num, den = system
+    num = np.atleast_2d(np.asarray(num, dtype=float))
+    den = np.atleast_2d(np.asarray(den, dtype=float))
+    n = max(num.shape[0], den.shape[0])
+    return (np.broadcast_to(num, (n, num.shape[-1])),
+            np.broadcast_to(den, (n, den.shape[-1])))
+
+
+def cancel_common_s(num, den):
+    """Cancela los factores s comunes (ceros finales compartidos por num y den).
+
+    En un lote se cancelan solo los que comparten todos los diseños, que son
+    los estructurales de la topología.
+    """
+    num = np.asarray(num, dtype=float)
+    den = np.asarray(den, dtype=float)
+    while num.shape[-1] > 1 and den.shape[-1] > 1 \
+            and not np.any(num[..., -1]) and not np.any(den[..., -1]):
+        num = num[..., :-1]
+        den = den[..., :-1]
+    return num, den
+
+
+def trim_leading(c):
+    """Quita las potencias principales nulas en todo el lote."""
+    while c.shape[-1] > 1 and not np.any(c[..., 0]):
+        c = c[..., 1:]
+    return c
+
+
+def dc_gain(num, den):
+    """Ganancia en s = 0 de coeficientes (..., n); ±inf si hay un polo en el origen."""
+    num, den = cancel_common_s(num, den)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return num[..., -1] / den[..., -1]
+
+
+def batch_roots(coeffs):
+    """Raíces de polinomios (..., n) mediante autovalores de la matriz compañera.
+
+    Los ceros finales comunes a todo el lote se devuelven como raíces exactas
+    en s = 0. Devuelve un arreglo complejo (..., n-1).
+    """
+    coeffs = np.asarray(coeffs, dtype=float)
+    n_zero = 0
+    while coeffs.shape[-1] > 1 and not np.any(coeffs[..., -1]):
+        coeffs = coeffs[..., :-1]
+        n_zero += 1
+    degree = coeffs.shape[-1] - 1
+    batch = coeffs.shape[:-1]
+    roots = np.zeros(batch + (degree,), dtype=complex)
+    if degree > 0:
+        companion = np.zeros(batch + (degree, degree))
+        companion[..., 0, :] = -coeffs[..., 1:] / coeffs[..., :1]
+        idx = np.arange(degree - 1)
+        companion[..., idx + 1, idx] = 1.0
+        roots = np.linalg.eigvals(companion)
+    return np.concatenate([roots, np.zeros(batch + (n_zero,), dtype=complex)], axis=-1)
@@ -0,0 +1,177 @@
+"""
+Motor de procesamiento por bloques en tiempo real para la cascada diseñada.
+
+El sistema continuo (control.TransferFunction de get_numeric_tf, por etapa o
+total, o coeficientes (num, den)) se discretiza con signal_stream.discretize
+y las secciones de segundo orden se combinan en una realización en espacio
+de estados x[k+1] = A x[k] + B u[k], y[k] = C x[k] + D u[k]. Para procesar L
+muestras con unas pocas multiplicaciones de matrices se usa la forma
+"levantada" del sistema:
+
+    y_blk = O x + T u_blk          O = [C; CA; ...; CA^(L-1)]
+    x     = A^L x + G u_blk        G = [A^(L-1)B, ..., AB, B]
+
+con T la matriz de Toeplitz triangular de la respuesta al impulso. Cada
+bloque de block_size muestras se recorre en sub-bloques de L muestras (más
+uno final más corto si L no divide a block_size) con
+np.matmul(..., out=...) sobre búferes reservados al crear el motor, así que
+procesar un bloque no reserva memoria para arreglos.
+
+update() calcula la realización nueva completa y la publica en una sola
+asignación, así que otro hilo puede cambiar los coeficientes entre dos
+bloques sin que process() vea una realización a medias. El cálculo retiene
+el GIL, de modo que un bloque que coincide con un intercambio puede
+retrasarse hasta la duración de update() (del orden de 0.5 ms): con bloques
+más cortos que eso el intercambio puede exceder el presupuesto de un bloque
+(bench_realtime.py informa esos excesos). El estado se conserva si el orden
+del sistema no cambia.
+"""
+import numpy as np
+from signal_stream import discretize
+
+# Tamaño máximo de los sub-bloques: el costo por muestra crece con L
+MAX_SUB_BLOCK = 64
+
+
+def design_system(values, configs, name='H_total', normalized=False):
+    """Sistema continuo (num, den) de un diseño: 'H1', 'H2' o 'H_total'.
+
+    normalized: si True se usan los coeficientes normalizados de
+    get_numeric_tf; si False la ganancia real de cada etapa.
+    """
+    from numeric_tf import calc_individual_coeffs, normalize_coeffs
+    from batch_response import SYSTEM_NAMES
+    num, den = calc_individual_coeffs(values, configs)[SYSTEM_NAMES.index(name)]
+    return normalize_coeffs(num, den) if normalized else (num, den)
+
+
+def sos_state_space(sos):
+    """Matrices (A, B, C, D) de la cascada de secciones en forma directa II transpuesta."""
+    sos = np.asarray(sos, dtype=float)
+    n = 2 * sos.shape[0]
+    A = np.zeros((n, n))
+    B = np.zeros(n)
+    C = np.zeros(n)
+    D = 1.0
+    for i, (b0, b1, b2, a0, a1, a2) in zip(range(0, n, 2), sos.tolist()):
+        b0, b1, b2, a1, a2 = b0 / a0, b1 / a0, b2 / a0, a1 / a0, a2 / a0
+        B1, B2 = b1 - a1 * b0, b2 - a2 * b0
+        # La entrada de la sección es la salida de la cascada anterior (C x + D u)
+        A[i, :i] = B1 * C[:i]
+        A[i + 1, :i] = B2 * C[:i]
+        A[i, i], A[i, i + 1], A[i + 1, i] = -a1, 1.0, -a2
+        B[i], B[i + 1] = B1 * D, B2 * D
+        C[:i] *= b0
+        C[i] = 1.0
+        D *= b0
+    return A, B[:, None], C[None, :], np.array([[D]])
+
+
+def lifted_matrices(A, B, C, D, L):
+    """Matrices (A^L, G, O, T) de la forma levantada para sub-bloques de L muestras."""
+    n = A.shape[0]
+    powers = np.empty((L + 1, n, n))
+    powers[0] = np.eye(n)
+    # Duplicación: A^(k..2k-1) = A^(0..k-1) A^k, en log2(L) productos por lotes
+    done = 1
+    while done <= L:
+        m = min(done, L + 1 - done)
+        np.matmul(powers[:m], powers[done - 1] @ A, out=powers[done:done + m])
+        done += m
+    O = (C @ powers[:L])[:, 0, :]               # (L, n): fila k = C A^k
+    G = (powers[L - 1::-1] @ B)[:, :, 0].T      # (n, L): columna k = A^(L-1-k) B
+    # Respuesta al impulso h[0] = D, h[k] = C A^(k-1) B
+    h = np.concatenate([D.ravel(), O[:L - 1] @ B[:, 0]])
+    k = np.arange(L)
+    T = np.tril(h[np.abs(k[:, None] - k)])
+    return powers[L], G, O, T
+
+
+class RealtimeFilter:
+    """Filtro de bloques de tamaño fijo con búferes reservados y coeficientes intercambiables.
+
+    system: control.TransferFunction o (num, den) continuo (o sos con
+        is_sos=True). fs: frecuencia de muestreo (Hz).
+    block_size: muestras por bloque; channels: canales (bloques (n, channels)).
+    """
+
+    def __init__(self, system, fs, block_size=256, channels=1, prewarp_hz=None, is_sos=False):
+        self.fs = float(fs)
+        self.block_size = int(block_size)
+        self.channels = int(channels)
+        self.prewarp_hz = prewarp_hz
+        self.sub_block = min(self.block_size, MAX_SUB_BLOCK)
+        self._input = np.zeros((self.block_size, self.channels))
+        self._output = np.zeros((self.block_size, self.channels))
+        self._tmp = np.zeros((self.sub_block, self.channels))
+        self._realization = None
+        self.update(system, is_sos=is_sos)
+
+    @property
+    def order(self):
+        return self._realization['state'].shape[0]
+
+    @property
+    def latency_budget_s(self):
+        """Duración de un bloque: el tiempo máximo para procesarlo en tiempo real."""
+        return self.block_size / self.fs
+
+    def update(self, system, is_sos=False, reset=False):
+        """Reemplaza los coeficientes (p. ej. al cambiar un componente).
+
+        La realización nueva se calcula por completo antes de publicarla con
+        una sola asignación. El estado se conserva si el orden no cambia y
+        reset es False; si no, se reinicia a cero.
+        """
+        sos = np.asarray(system, dtype=float) if is_sos else \
+            discretize(system, self.fs, self.prewarp_hz)
+        A, B, C, D = sos_state_space(sos)
+        L = self.sub_block
+        full = lifted_matrices(A, B, C, D, L)
+        rest = self.block_size % L
+        last = lifted_matrices(A, B, C, D, rest) if rest else None
+        segments = tuple((i, i + L, full) for i in range(0, self.block_size - rest, L))
+        if rest:
+            segments += ((self.block_size - rest, self.block_size, last),)
+        n = A.shape[0]
+        old = self._realization
+        if old is None or reset or old['state'].shape[0] != n:
+            state = np.zeros((n, self.channels))
+        else:
+            state = old['state']
+        self._realization = {'sos': sos, 'segments': segments, 'state': state,
+                             'xa': np.zeros((n, self.channels)),
+                             'xb': np.zeros((n, self.channels))}
+
+    def reset(self):
+        """Vuelve al estado inicial nulo (sistema en reposo)."""
+        self._realization['state'][...] = 0.0
+
+    @property
+    def sos(self):
+        return self._realization['sos']
+
+    def process(self, block, out=None):
+        """Filtra un bloque (block_size,) o (block_size, channels).
+
+        Devuelve out (o el búfer de salida interno, que se reutiliza en el
+        bloque siguiente) con la forma de block.
+        """
+        realization = self._realization
+        x, xa, xb = realization['state'], realization['xa'], realization['xb']
+        u = self._input
+        shape = np.shape(block)
+        np.copyto(u, np.reshape(block, (self.block_size, self.channels)))
+        y = self._output
+        for i, j, (AL, G, O, T) in realization['segments']:
+            ub, yb, tmp = u[i:j], y[i:j], self._tmp[:j - i]
+            np.matmul(T, ub, out=yb)
+            np.matmul(O, x, out=tmp)
+            yb += tmp
+            np.matmul(AL, x, out=xa)
+            np.matmul(G, ub, out=xb)
+            np.add(xa, xb, out=x)
+        if out is None:
+            return y.reshape(shape)
+        np.copyto(out, y.reshape(shape))
+        return out
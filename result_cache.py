@@ -0,0 +1,263 @@
+"""
+Caché persistente en SQLite de los resultados de AnalysisResult.
+
+La clave es un hash canónico de `valores` y `configs` (los de init_components):
+los valores se convierten a float y se indexan por nombre, y cada
+configuración se reduce a su nombre ('R', 'serie', 'paralelo'), así que ni el
+formato de los números ni el orden de las claves cambian la clave. Se guardan
+los coeficientes, polos, ceros, márgenes, step_info, métricas de frecuencia,
+datos de Bode y respuestas temporales, serializados como arreglos crudos (sin pickle).
+
+Cada entrada lleva la versión del código de análisis (hash de los módulos que
+producen los resultados y de la versión de control); las entradas de otra
+versión cuentan como fallos y se descartan. El tamaño total se acota a
+max_bytes eliminando las entradas usadas hace más tiempo (LRU). Los aciertos,
+fallos y expulsiones se acumulan en la propia base de datos.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import numpy as np
+from numeric_tf import COMPONENT_NAMES, values_by_name
+from batch_response import DEFAULT_W
+from batch_analysis import CONFIG_KEYS, config_name
+from analysis import AnalysisResult
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Módulos cuyos cambios invalidan los resultados guardados
+_VERSIONED_MODULES = ('numeric_tf', 'topology_catalog', 'analysis', 'batch_response',
+                      'frequency_metrics', 'time_response', 'step_metrics',
+                      'stability_margins', 'cascade')
+
+# Propiedades de AnalysisResult que se guardan
+CACHED_FIELDS = ('coeffs', 'zeros', 'poles', 'margins', 'step_info', 'bode',
+                 'frequency_metrics', 'time_grid', 'step_responses', 'impulse_responses')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+"""
+
+
+def code_version():
+    """Hash de las fuentes de los módulos de análisis y de la versión de control."""
+    from importlib.metadata import version
+    digest = hashlib.sha256(version('control').encode())
+    here = os.path.dirname(os.path.abspath(__file__))
+    for module in _VERSIONED_MODULES:
+        path = os.path.join(here, module + '.py')
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def design_key(valores, configs, w=None):
+    """Hash canónico de un diseño (y de la malla de frecuencias si no es la por defecto)."""
+    v = values_by_name(valores)
+    canonical = {
+        'values': [float(v.get(name, 0.0)) for name in COMPONENT_NAMES],
+        'configs': [config_name(configs.get(key)) for key in CONFIG_KEYS],
+    }
+    if w is not None and not np.array_equal(w, DEFAULT_W):
+        canonical['w'] = hashlib.sha256(np.ascontiguousarray(w, dtype=float)).hexdigest()
+    return hashlib.sha256(json.dumps(canonical).encode()).hexdigest()
+
+
+def _flatten(prefix, value, out):
+    """Aplana diccionarios, tuplas y listas en {ruta: arreglo o Exception}."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            _flatten(f'{prefix}/{key}', item, out)
+    elif isinstance(value, (tuple, list)):
+        for i, item in enumerate(value):
+            _flatten(f'{prefix}/{i}', item, out)
+    elif isinstance(value, Exception):
+        out[prefix] = value
+    else:
+        out[prefix] = np.asarray(value)
+
+
+def _unflatten(items):
+    root = {}
+    for path, value in items.items():
+        *parents, leaf = path.split('/')
+        node = root
+        for name in parents:
+            node = node.setdefault(name, {})
+        node[leaf] = value
+    return root
+
+
+def _serialize(result):
+    """Campos ya calculados de un AnalysisResult como bytes.
+
+    Formato: longitud del encabezado (4 bytes), encabezado JSON con el tipo y
+    la forma de cada arreglo (o el mensaje de cada excepción) y los datos de
+    los arreglos concatenados, que se leen sin copia con np.frombuffer.
+    """
+    items = {}
+    for field in CACHED_FIELDS:
+        if field in result.__dict__:
+            _flatten(field, result.__dict__[field], items)
+    header, data = {}, []
+    for path, value in items.items():
+        if isinstance(value, Exception):
+            header[path] = {'error': str(value)}
+        else:
+            header[path] = {'dtype': value.dtype.str, 'shape': value.shape}
+            data.append(value.tobytes())
+    head = json.dumps(header).encode()
+    return len(head).to_bytes(4, 'little') + head + b''.join(data)
+
+
+def _deserialize(data):
+    size = int.from_bytes(data[:4], 'little')
+    header = json.loads(data[4:4 + size])
+    offset = 4 + size
+    items = {}
+    for path, spec in header.items():
+        if 'error' in spec:
+            items[path] = Exception(spec['error'])
+            continue
+        dtype = np.dtype(spec['dtype'])
+        count = int(np.prod(spec['shape']))
+        array = np.frombuffer(data, dtype, count, offset).reshape(spec['shape'])
+        items[path] = array[()] if array.ndim == 0 else array
+        offset += count * dtype.itemsize
+    fields = _unflatten(items)
+    # Las tuplas se guardan como diccionarios indexados por posición
+    if 'coeffs' in fields:
+        coeffs = fields['coeffs']
+        fields['coeffs'] = tuple((coeffs[str(i)]['0'], coeffs[str(i)]['1'])
+                                 for i in range(len(coeffs)))
+    if 'margins' in fields:
+        fields['margins'] = {name: {key: x.item() if np.ndim(x) == 0 else x
+                                    for key, x in m.items()}
+                             for name, m in fields['margins'].items()}
+    if 'step_info' in fields:
+        fields['step_info'] = {name: {key: float(x) for key, x in info.items()}
+                               for name, info in fields['step_info'].items()}
+    return fields
+
+
+class ResultCache:
+    """Caché LRU en SQLite de AnalysisResult.
+
+    path: archivo de la base de datos (se crea si no existe).
+    max_bytes: tamaño total máximo de los resultados guardados.
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES, version=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.version = version or code_version()
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.executescript(_SCHEMA)
+        self.session = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _count(self, name, n=1):
+        self.session[name] += n
+        self.db.execute("INSERT INTO stats VALUES (?, ?) "
+                        "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value", (name, n))
+
+    def get(self, key):
+        """Campos guardados para key, o None (fallo) si no hay o son de otra versión."""
+        row = self.db.execute("SELECT version, data FROM entries WHERE key = ?", (key,)).fetchone()
+        with self.db:
+            if row is None or row[0] != self.version:
+                if row is not None:
+                    self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._count('misses')
+                return None
+            self.db.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._count('hits')
+        return _deserialize(row[1])
+
+    def put(self, key, result):
+        """Guarda los campos calculados de result y aplica el límite de tamaño."""
+        data = _serialize(result)
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                            (key, self.version, data, len(data), time.time()))
+            self._evict()
+
+    def _evict(self):
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in self.db.execute(
+                "SELECT key, size FROM entries ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        self._count('evictions', evicted)
+
+    def analysis(self, components, w=None):
+        """AnalysisResult del diseño con los campos guardados ya cargados.
+
+        En un fallo se calculan todos los campos de CACHED_FIELDS y se
+        guardan. step_info no se guarda si falla (sistema impropio): queda
+        perezoso y vuelve a lanzar la excepción al usarse.
+        """
+        result = AnalysisResult(components, w)
+        key = design_key(result.valores, result.configs, result.w)
+        fields = self.get(key)
+        if fields is not None:
+            result.__dict__.update(fields)
+            return result
+        for field in CACHED_FIELDS:
+            if field == 'step_info':
+                try:
+                    result.step_info
+                except Exception:
+                    continue
+            else:
+                getattr(result, field)
+        self.put(key, result)
+        return result
+
+    def stats(self):
+        """Contadores acumulados, los de esta sesión y el tamaño de la caché."""
+        totals = dict(self.db.execute("SELECT name, value FROM stats").fetchall())
+        entries, size = self.db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        lookups = totals.get('hits', 0) + totals.get('misses', 0)
+        return {
+            'hits': totals.get('hits', 0),
+            'misses': totals.get('misses', 0),
+            'evictions': totals.get('evictions', 0),
+            'hit_rate': totals.get('hits', 0) / lookups if lookups else 0.0,
+            'session': dict(self.session),
+            'entries': entries,
+            'bytes': size,
+            'max_bytes': self.max_bytes,
+            'version': self.version,
+        }
+
+    def clear(self):
+        with self.db:
+            self.db.execute("DELETE FROM entries")
+            self.db.execute("DELETE FROM stats")
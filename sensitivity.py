@@ -0,0 +1,320 @@
+"""
+Sensibilidades normalizadas analíticas de H_total (o de una etapa) a cada componente.
+
+Para cada métrica m y componente θ (R1..R4, C1, C2, Ci1, Ci2) se calcula
+S = ∂ln m / ∂ln θ, el cambio relativo de m por cada cambio relativo de θ, sin
+diferencias finitas:
+  - coeficientes: cada etapa es coef * s**k * prod(F**e) con F = (RCs+1)/(Cs)
+    (numeric_tf._stage_factors); al expandir los polinomios N y D se propaga
+    con la regla del producto la derivada θ ∂c/∂θ de cada coeficiente
+    respecto a los ocho componentes a la vez (E_N y E_D)
+  - polos y ceros: una raíz simple p se mueve θ ∂p/∂θ = -E(p) / D'(p); en un
+    grupo de m raíces repetidas (p. ej. dos etapas iguales) cada raíz por
+    separado no es derivable y se usa la media del grupo, que se mueve
+    -Res(E/D, p) / m
+  - ganancia DC: S = E_N(0)/N(0) - E_D(0)/D(0)
+  - frecuencia de corte ωc (frequency_metrics): derivación implícita de
+    ln|H(jωc)|² = ln|H|²pico - CUTOFF_DB/10 ln 10; el pico (en DC, en un
+    punto estacionario o en alta frecuencia) se deriva a frecuencia fija
+Todo se calcula en una pasada vectorizada sobre un lote de N diseños de la
+misma topología.
+"""
+import numpy as np
+from utils import init_components
+from numeric_tf import (COMPONENT_NAMES, values_by_name, cancel_common_s, trim_leading,
+                        batch_roots, _DEFAULT_INPUT, _impedance_factors, _topology_name,
+                        _polymul)
+from batch_response import SYSTEM_NAMES
+from frequency_metrics import frequency_metrics, CUTOFF_DB
+from design_record import as_components
+from instrumentation import traced
+
+# (R y C de entrada, configuración de entrada, R y C de realimentación,
+# configuración de realimentación) de cada etapa
+STAGE_COMPONENTS = (
+    ('R1', 'Ci1', 'input1', 'R2', 'C1', 'config1'),
+    ('R3', 'Ci2', 'input2', 'R4', 'C2', 'config2'),
+)
+
+# Separación relativa máxima entre raíces para tratarlas como un grupo
+# repetido (las raíces de multiplicidad m se separan ~eps**(1/m) al calcularse)
+ROOT_CLUSTER_TOL = 1e-3
+
+_INDEX = {name: i for i, name in enumerate(COMPONENT_NAMES)}
+_EYE = np.eye(len(COMPONENT_NAMES))[:, :, None]  # (K, K, 1): δ de cada componente
+
+
+def _impedance_log_coef(R_name, C_name, config, C):
+    """∂ln coef / ∂ln θ (K, 1) del coeficiente de _impedance_factors."""
+    topology = _topology_name(config, C)
+    d = np.zeros((len(COMPONENT_NAMES), 1))
+    if topology != 'serie':  # R o R/C
+        d[_INDEX[R_name]] = 1.0
+    if topology == 'paralelo':
+        d[_INDEX[C_name]] = -1.0
+    return d
+
+
+def _stage(v, configs, stage):
+    """Como numeric_tf._stage_factors, con ∂ln coef y los nombres de cada factor."""
+    R_in, C_in, in_key, R_fb, C_fb, fb_key = stage
+    in_cfg = configs.get(in_key, _DEFAULT_INPUT)
+    fb_cfg = configs[fb_key]
+    coef_fb, k_fb, f_fb = _impedance_factors(v[R_fb], v[C_fb], fb_cfg)
+    coef_in, k_in, f_in = _impedance_factors(v[R_in], v[C_in], in_cfg)
+    log_coef = _impedance_log_coef(R_fb, C_fb, fb_cfg, v[C_fb]) \
+        - _impedance_log_coef(R_in, C_in, in_cfg, v[C_in])
+    factors = [(R_fb, C_fb, e) for _, _, e in f_fb] + [(R_in, C_in, -e) for _, _, e in f_in]
+    return -coef_fb / coef_in, log_coef, k_fb - k_in, factors
+
+
+def _expand(v, coef, log_coef, k, factors):
+    """Como numeric_tf._factors_to_coeffs, junto con θ ∂c/∂θ de cada coeficiente.
+
+    Devuelve num y den (N, n) y sus derivadas (N, K, n).
+    """
+    def scale(p, dp, C):
+        # p * C y su derivada: C solo aporta a la fila de su propio componente
+        return [x * v[C] for x in p], [d * v[C] + x * v[C] * _EYE[_INDEX[C]] for x, d in zip(p, dp)]
+
+    def times_rc(p, dp, R, C):
+        rc = [v[R] * v[C], 1.0]
+        d_rc = [v[R] * v[C] * (_EYE[_INDEX[R]] + _EYE[_INDEX[C]]), 0.0]
+        return _polymul(p, rc), [a + b for a, b in zip(_polymul(dp, rc), _polymul(p, d_rc))]
+
+    num, d_num = [coef], [coef * log_coef]
+    den, d_den = [1.0], [0.0]
+    s_num, s_den = max(k, 0), max(-k, 0)
+    for R, C, e in factors:
+        if e > 0:
+            num, d_num = times_rc(num, d_num, R, C)
+            den, d_den = scale(den, d_den, C)
+            s_den += 1
+        else:
+            num, d_num = scale(num, d_num, C)
+            den, d_den = times_rc(den, d_den, R, C)
+            s_num += 1
+    n = len(v['R1'])
+    out = []
+    for p, dp, zeros in ((num, d_num, s_num), (den, d_den, s_den)):
+        p = p + [0.0] * zeros
+        dp = dp + [0.0] * zeros
+        out.append(np.stack([np.broadcast_to(x, (n,)) for x in p], axis=-1))
+        out.append(np.stack([np.broadcast_to(d, (len(COMPONENT_NAMES), n)).T for d in dp],
+                            axis=-1))
+    return out
+
+
+def coeff_sensitivities(values, configs, system='H_total'):
+    """Coeficientes de un sistema y sus derivadas logarítmicas respecto a cada componente.
+
+    values: {nombre: valor o arreglo (N,)}; configs como en init_components.
+    system: 'H1', 'H2' o 'H_total'.
+
+    Devuelve (num, d_num, den, d_den): num y den (N, n) sin normalizar (los de
+    numeric_tf._factors_to_coeffs; los de calc_individual_coeffs pueden
+    diferir en un factor común a ambos) y d_num, d_den (N, K, n) con θ ∂c/∂θ
+    para cada componente en el orden de COMPONENT_NAMES.
+    """
+    v = {name: np.atleast_1d(np.asarray(x, dtype=float))
+         for name, x in values_by_name(values).items()}
+    n = np.broadcast(*v.values()).shape[0]
+    v = {name: np.broadcast_to(x, (n,)) for name, x in v.items()}
+    stages = [_stage(v, configs, stage) for stage in STAGE_COMPONENTS]
+    if system == 'H_total':
+        coef = stages[0][0] * stages[1][0]
+        log_coef = stages[0][1] + stages[1][1]
+        k = stages[0][2] + stages[1][2]
+        factors = stages[0][3] + stages[1][3]
+        return _expand(v, coef, log_coef, k, factors)
+    return _expand(v, *stages[SYSTEM_NAMES.index(system)])
+
+
+def _horner(coeffs, x):
+    """Evalúa polinomios (..., n) en x, que se difunde con coeffs.shape[:-1]."""
+    out = np.zeros(np.broadcast_shapes(coeffs.shape[:-1], np.shape(x)), dtype=complex)
+    for k in range(coeffs.shape[-1]):
+        out = out * x + coeffs[..., k]
+    return out
+
+
+def _taylor(coeffs, x):
+    """Coeficientes de Taylor c^(j)(x)/j!, j = 0..n-1, de polinomios (..., n) en x.
+
+    x se difunde con coeffs.shape[:-1]; el resultado tiene forma (..., n).
+    """
+    shape = np.broadcast_shapes(coeffs.shape[:-1], np.shape(x))
+    b = np.array(np.broadcast_to(coeffs, shape + coeffs.shape[-1:]), dtype=complex)
+    n = coeffs.shape[-1]
+    # Divisiones sintéticas sucesivas (desplazamiento de Taylor)
+    for i in range(n - 1):
+        for k in range(1, n - i):
+            b[..., k] += x * b[..., k - 1]
+    return b[..., ::-1]
+
+
+def _root_sensitivities(c, dc):
+    """Raíces (N, d) de c (N, n) y sus sensibilidades normalizadas (N, d, K).
+
+    Las raíces en el origen no se mueven (son factores s estructurales) y su
+    sensibilidad es 0.
+    """
+    roots = batch_roots(c)
+    n_rows, degree = roots.shape
+    if degree == 0:
+        return roots, np.zeros((n_rows, 0, dc.shape[1]), dtype=complex)
+
+    # Grupos de raíces repetidas y su centro
+    scale = np.maximum(np.abs(roots[:, :, None]), np.abs(roots[:, None, :]))
+    close = np.abs(roots[:, :, None] - roots[:, None, :]) <= ROOT_CLUSTER_TOL * scale
+    mult = close.sum(axis=-1)
+    center = np.sum(close * roots[:, None, :], axis=-1) / mult
+
+    # Residuo de E/D en el centro: D = sum(d_j h^j) empieza en h^m; se divide
+    # la serie de E entre la de D/h^m hasta el término h^(m-1)
+    t_d = _taylor(c[:, None, :], center)                    # (N, d, n)
+    t_e = _taylor(dc[:, :, None, :], center[:, None, :])    # (N, K, d, n)
+    pad = np.zeros(t_d.shape[:-1] + (degree + 1,))
+    t_d = np.concatenate([t_d, pad], axis=-1)
+
+    def d_at(j):
+        return np.take_along_axis(t_d, (mult + j)[..., None], axis=-1)[:, None, :, 0]
+
+    lead = d_at(0)
+    q = []
+    for k in range(mult.max()):
+        e_k = t_e[..., k] if k < t_e.shape[-1] else 0.0
+        acc = e_k - sum(d_at(i) * q[k - i] for i in range(1, k + 1))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            q.append(acc / lead)
+    residue = np.take_along_axis(np.stack(q, axis=-1), (mult - 1)[:, None, :, None],
+                                 axis=-1)[..., 0]
+    shift = -residue / mult[:, None, :]                     # (N, K, d): θ ∂p/∂θ
+    at_origin = roots == 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sens = np.where(at_origin[:, None, :], 0.0, shift / np.where(at_origin, 1.0, roots)[:, None, :])
+    return roots, np.moveaxis(sens, 1, -1)
+
+
+def _log_derivative(c, s):
+    """s c'(s) / c(s) de polinomios (N, n) en s (N,)."""
+    n = c.shape[-1]
+    return s * _horner(c[:, :-1] * np.arange(n - 1, 0, -1), s) / _horner(c, s)
+
+
+def _log_magnitude_sensitivity(num, d_num, den, d_den, w):
+    """∂ln|H(jω)|² / ∂ln θ (N, K) en ω (N,) fijo; ω = inf usa los coeficientes principales."""
+    at_inf = np.isinf(w)
+    s = 1j * np.where(at_inf, 0.0, w)
+    out = np.zeros(d_num.shape[:2])
+    for c, dc, sign in ((num, d_num, 1.0), (den, d_den, -1.0)):
+        first = np.argmax(c != 0, axis=-1)
+        lead = np.take_along_axis(c, first[:, None], axis=-1)
+        d_lead = np.take_along_axis(dc, first[:, None, None], axis=-1)[..., 0]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(at_inf[:, None], d_lead / lead,
+                             _horner(dc, s[:, None]) / _horner(c, s)[:, None])
+        out += sign * 2 * ratio.real
+    return out
+
+
+@traced('sensitivities')
+def sensitivities(values, configs, system='H_total', cutoff_db=CUTOFF_DB):
+    """Sensibilidades normalizadas ∂ln m / ∂ln θ de un lote de diseños.
+
+    values: {nombre: valor o arreglo (N,)} de una misma topología (configs).
+    system: 'H1', 'H2' o 'H_total'.
+
+    Devuelve un diccionario con las métricas, como arreglos (N, ...):
+      - poles, zeros: raíces de D y N (sin los factores s comunes)
+      - dc_gain: ganancia en s = 0 (±inf o 0 con un polo o cero en el origen)
+      - cutoff_hz: frecuencia de corte de frequency_metrics
+      - components: COMPONENT_NAMES
+      - sensitivity: {'poles': (N, dp, K), 'zeros': (N, dz, K), 'dc_gain':
+        (N, K), 'cutoff_hz': (N, K)}, con K componentes en el orden de
+        COMPONENT_NAMES. Para polos y ceros complejos Re(S) es la sensibilidad
+        de |p| e Im(S) la de su ángulo; S es NaN si la métrica es 0, inf o NaN.
+    """
+    num, d_num, den, d_den = coeff_sensitivities(values, configs, system)
+    # Se quitan los factores s comunes y las potencias principales nulas;
+    # sus derivadas también son nulas
+    size_num, size_den = (c.shape[-1] for c in cancel_common_s(num, den))
+    lead_num = size_num - trim_leading(num[..., :size_num]).shape[-1]
+    lead_den = size_den - trim_leading(den[..., :size_den]).shape[-1]
+    num, d_num = num[..., lead_num:size_num], d_num[..., lead_num:size_num]
+    den, d_den = den[..., lead_den:size_den], d_den[..., lead_den:size_den]
+
+    poles, s_poles = _root_sensitivities(den, d_den)
+    zeros, s_zeros = _root_sensitivities(num, d_num)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dc_gain = num[:, -1] / den[:, -1]
+        s_gain = d_num[:, :, -1] / num[:, -1:] - d_den[:, :, -1] / den[:, -1:]
+    s_gain[~(np.isfinite(dc_gain) & (dc_gain != 0))] = np.nan
+
+    metrics = frequency_metrics((num, den), cutoff_db)
+    cutoff_hz = metrics['cutoff_hz']
+    wc = 2 * np.pi * np.where(np.isfinite(cutoff_hz), cutoff_hz, 0.0)
+    wp = 2 * np.pi * np.where(np.isnan(metrics['peak_hz']), 0.0, metrics['peak_hz'])
+    # F(ω, θ) = ln|H(jω)|² - ln|H|²pico + cte. = 0 en ωc
+    d_theta = _log_magnitude_sensitivity(num, d_num, den, d_den, wc) \
+        - _log_magnitude_sensitivity(num, d_num, den, d_den, wp)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # ∂F/∂ln ω = 2 Re(s N'/N - s D'/D) en s = jωc
+        d_lnw = 2 * (_log_derivative(num, 1j * wc) - _log_derivative(den, 1j * wc)).real
+        s_cutoff = -d_theta / d_lnw[:, None]
+    s_cutoff[~(np.isfinite(cutoff_hz) & (cutoff_hz > 0))] = np.nan
+
+    return {
+        'components': COMPONENT_NAMES,
+        'poles': poles,
+        'zeros': zeros,
+        'dc_gain': dc_gain,
+        'cutoff_hz': cutoff_hz,
+        'sensitivity': {'poles': s_poles, 'zeros': s_zeros, 'dc_gain': s_gain,
+                        'cutoff_hz': s_cutoff},
+    }
+
+
+def sensitivity_analysis(components=None, system='H_total'):
+    """Sensibilidades de un diseño (lote de N = 1).
+
+    components: tupla de init_components o registro de design_record (se
+        solicita si es None).
+    """
+    if components is None:
+        components = init_components()
+    _, _, valores, configs = as_components(components, symbols=False)
+    return sensitivities(valores, configs, system)
+
+
+def print_sensitivity_report(result, index=0):
+    """Imprime la tabla de sensibilidades del diseño index y el componente dominante."""
+    sens = result['sensitivity']
+    names = result['components']
+    rows = [("Ganancia DC", result['dc_gain'][index], sens['dc_gain'][index]),
+            ("Frecuencia de corte", result['cutoff_hz'][index], sens['cutoff_hz'][index])]
+    rows += [(f"Polo p{i}", p, s) for i, (p, s) in
+             enumerate(zip(result['poles'][index], sens['poles'][index]), 1)]
+    rows += [(f"Cero z{i}", z, s) for i, (z, s) in
+             enumerate(zip(result['zeros'][index], sens['zeros'][index]), 1)]
+
+    print("\n=== SENSIBILIDADES NORMALIZADAS (∂ln m / ∂ln θ) ===")
+    print(f"{'métrica':<22}" + "".join(f"{name:>8}" for name in names))
+    for label, _, s in rows:
+        # Para raíces complejas se muestra la sensibilidad de |p| (+0.0 evita -0.000)
+        print(f"{label:<22}" + "".join(f"{x:8.3f}" for x in np.real(s) + 0.0))
+
+    print("\nComponente dominante:")
+    for label, value, s in rows[:2]:
+        s = np.real(s)
+        if np.all(np.isnan(s)):
+            print(f"  {label}: no definida ({value:.4g})")
+            continue
+        i = np.nanargmax(np.abs(s))
+        print(f"  {label}: {names[i]} (un 1 % en {names[i]} cambia la métrica un "
+              f"{s[i]:+.2f} %)")
+
+
+if __name__ == '__main__':
+    print_sensitivity_report(sensitivity_analysis())
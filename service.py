@@ -0,0 +1,290 @@
+"""
+Servicio local HTTP/JSON de análisis de diseños sobre asyncio.
+
+POST /analyze recibe un diseño con el formato de los registros de
+batch_analysis (R1..R4, C1, C2, Ci1, Ci2 y config1, input1, config2, input2,
+en el objeto raíz o dentro de 'values' y 'configs') y devuelve, para H1, H2 y
+H_total, lo que imprimen analyze_transfer_function_no_plots y
+analyze_responses_no_plots: expresión, coeficientes, ceros, polos,
+estabilidad, márgenes, step_info y frecuencias de corte, más el tipo de filtro
+del sistema total. GET /health y GET /stats dan el estado y los contadores.
+
+  - Los análisis corren en un ProcessPoolExecutor cuyos procesos importan
+    control y analizan un diseño de prueba al arrancar, así que la primera
+    petición no paga esos costos.
+  - Las peticiones idénticas en curso (mismos valores numéricos y topología,
+    sin importar el formato de los números ni el orden de las claves)
+    comparten un único análisis.
+  - Contrapresión: con max_pending análisis distintos en curso, las
+    peticiones nuevas reciben 503 con Retry-After en lugar de encolarse sin
+    límite; los cuerpos mayores que MAX_BODY reciben 413.
+
+Uso: python service.py --port 8765 (o python main.py serve) y, por ejemplo,
+  curl -d '{"R1": 1e3, "R2": 1e4, "C1": 1e-8, "R3": 1e3, "R4": 1e3,
+            "config1": "paralelo"}' http://127.0.0.1:8765/analyze
+"""
+import argparse
+import asyncio
+import json
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from numeric_tf import COMPONENT_NAMES
+from batch_response import SYSTEM_NAMES, determine_filter_type_batch
+from batch_analysis import CONFIG_KEYS, parse_record
+from utils import config_from_name
+
+MAX_BODY = 64 * 1024
+DEFAULT_MAX_PENDING = 64
+RETRY_AFTER_S = 1
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+# Diseño con el que se precalientan los procesos
+_WARMUP = {'R1': 1e3, 'R2': 1e4, 'R3': 1e3, 'R4': 1e3, 'C1': 1e-8, 'C2': 1e-8,
+           'config1': 'paralelo', 'config2': 'paralelo'}
+
+
+def _number(x):
+    x = float(x)
+    return x if np.isfinite(x) else None
+
+
+def _complex_list(roots):
+    return [[float(r.real), float(r.imag)] for r in roots]
+
+
+def design_report(result):
+    """Resultado JSON (sin NaN ni inf) de un AnalysisResult.
+
+    Las etapas que fallan (p. ej. step_info de un sistema impropio) se
+    informan con {'error': mensaje} en lugar de abortar. Los márgenes incluyen
+    todos los cruces (ver stability_margins).
+    """
+    from step_metrics import step_metrics
+    try:
+        step_infos = result.step_info
+    except Exception:
+        step_infos = {}
+        for name, sys in zip(SYSTEM_NAMES, result.systems):
+            try:
+                step_infos[name] = step_metrics(sys)
+            except Exception as e:
+                step_infos[name] = e
+
+    report = {}
+    for name, sys, expression in zip(SYSTEM_NAMES, result.systems, result.expressions):
+        poles = result.poles[name]
+        margins = result.margins[name]
+        info = step_infos[name]
+        metrics = result.frequency_metrics[name]
+        report[name] = {
+            'expression': str(expression),
+            'num': [float(c) for c in sys.num[0][0]],
+            'den': [float(c) for c in sys.den[0][0]],
+            'zeros': _complex_list(result.zeros[name]),
+            'poles': _complex_list(poles),
+            'stable': bool(np.all(np.real(poles) < 0)),
+            'margins': {key: (value if isinstance(value, bool) else
+                              [_number(x) for x in value] if np.ndim(value) else _number(value))
+                        for key, value in margins.items()},
+            'step_info': ({'error': str(info)} if isinstance(info, Exception) else
+                          {key: _number(value) for key, value in info.items()}),
+            'frequency': {key: _number(metrics[key][0])
+                          for key in ('cutoff_hz', 'lower_cutoff_hz', 'upper_cutoff_hz',
+                                      'bandwidth_hz', 'peak_db', 'peak_hz')},
+        }
+    bode = result.bode['H_total']
+    report['filter_type'] = str(determine_filter_type_batch(bode['mag_db'], bode['freq']))
+    return report
+
+
+# Cachés abiertas por el proceso actual, indexadas por ruta
+_CACHES = {}
+
+
+def analyze_design(values, topology, cache_path=None):
+    """Analiza un diseño (valores por nombre, nombres de configs) en un proceso del pool.
+
+    cache_path: base de datos de result_cache.ResultCache que se consulta antes
+    de analizar (compartida por todos los procesos).
+    """
+    from analysis import AnalysisResult
+    configs = {key: config_from_name(name) for key, name in zip(CONFIG_KEYS, topology)}
+    components = (None, None, values, configs)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        if cache_path is None:
+            return design_report(AnalysisResult(components))
+        if cache_path not in _CACHES:
+            from result_cache import ResultCache
+            _CACHES[cache_path] = ResultCache(cache_path)
+        return design_report(_CACHES[cache_path].analysis(components))
+
+
+def _warm_worker(cache_path=None):
+    analyze_design(*parse_record(_WARMUP), cache_path)
+    return os.getpid()
+
+
+def parse_design(payload):
+    """Valida el cuerpo de /analyze; devuelve (valores, topología, clave canónica)."""
+    if not isinstance(payload, dict):
+        raise ValueError("El cuerpo debe ser un objeto JSON")
+    record = dict(payload)
+    record.update(payload.get('values') or {})
+    record.update(payload.get('configs') or {})
+    values, topology = parse_record(record)
+    key = (tuple(values[name] for name in COMPONENT_NAMES), topology)
+    return values, topology, key
+
+
+class AnalysisService:
+    """Servidor HTTP/JSON con pool de procesos, coalescencia y contrapresión."""
+
+    def __init__(self, workers=None, max_pending=DEFAULT_MAX_PENDING, cache_path=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.cache_path = cache_path
+        self.pool = None
+        self.server = None
+        self._inflight = {}
+        self.stats = {'requests': 0, 'analyses': 0, 'coalesced': 0, 'rejected': 0, 'errors': 0}
+
+    async def start(self, host='127.0.0.1', port=8765):
+        """Arranca y precalienta el pool y abre el socket (port=0 elige uno libre)."""
+        loop = asyncio.get_running_loop()
+        self.pool = ProcessPoolExecutor(self.workers)
+        # Una tarea por proceso obliga a crearlos todos y a cargar control en cada uno
+        await asyncio.gather(*(loop.run_in_executor(self.pool, _warm_worker, self.cache_path)
+                               for _ in range(self.workers)))
+        self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+    async def analyze(self, values, topology, key):
+        """Resultado del diseño, compartiendo el análisis con peticiones idénticas en curso.
+
+        Lanza OverflowError si ya hay max_pending análisis distintos en curso.
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats['coalesced'] += 1
+            return await asyncio.shield(future)
+        if len(self._inflight) >= self.max_pending:
+            self.stats['rejected'] += 1
+            raise OverflowError("Demasiados análisis en curso")
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.pool, analyze_design, values, topology,
+                                      self.cache_path)
+        self._inflight[key] = future
+        future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        self.stats['analyses'] += 1
+        return await asyncio.shield(future)
+
+    async def _route(self, method, path, body):
+        if path == '/health':
+            return 200, {'status': 'ok', 'workers': self.workers}
+        if path == '/stats':
+            return 200, dict(self.stats, inflight=len(self._inflight),
+                             max_pending=self.max_pending)
+        if path != '/analyze':
+            return 404, {'error': f"Ruta desconocida: {path}"}
+        if method != 'POST':
+            return 405, {'error': "Use POST"}
+        try:
+            values, topology, key = parse_design(json.loads(body or b'null'))
+        except (ValueError, TypeError, AttributeError) as e:
+            return 400, {'error': str(e)}
+        try:
+            return 200, await self.analyze(values, topology, key)
+        except OverflowError as e:
+            return 503, {'error': str(e)}
+
+    async def _handle(self, reader, writer):
+        status, payload = 500, {'error': "Error interno"}
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            self.stats['requests'] += 1
+            length = int(headers.get('content-length', 0) or 0)
+            if len(request_line) < 2:
+                status, payload = 400, {'error': "Petición HTTP inválida"}
+            elif length > MAX_BODY:
+                status, payload = 413, {'error': f"El cuerpo supera {MAX_BODY} bytes"}
+            else:
+                body = await reader.readexactly(length) if length else b''
+                status, payload = await self._route(request_line[0].upper(),
+                                                    request_line[1].split('?')[0], body)
+        except (ValueError, asyncio.IncompleteReadError) as e:
+            status, payload = 400, {'error': str(e)}
+        except Exception as e:
+            status, payload = 500, {'error': f"{type(e).__name__}: {e}"}
+        if status >= 500:
+            self.stats['errors'] += status != 503
+        data = json.dumps(payload, ensure_ascii=False, allow_nan=False).encode('utf-8')
+        head = [f"HTTP/1.1 {status} {_REASONS[status]}",
+                "Content-Type: application/json; charset=utf-8",
+                f"Content-Length: {len(data)}", "Connection: close"]
+        if status == 503:
+            head.append(f"Retry-After: {RETRY_AFTER_S}")
+        try:
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + data)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host='127.0.0.1', port=8765, workers=None, max_pending=DEFAULT_MAX_PENDING,
+                cache_path=None):
+    """Ejecuta el servicio hasta que se interrumpa."""
+    service = AnalysisService(workers, max_pending, cache_path)
+    host, port = await service.start(host, port)
+    print(f"Servicio de análisis en http://{host}:{port} ({service.workers} procesos)", flush=True)
+    try:
+        await service.server.serve_forever()
+    finally:
+        await service.close()
+
+
+def build_parser(parser=None):
+    """Argumentos del servicio (también los usa el subcomando 'serve' de main.py)."""
+    parser = parser or argparse.ArgumentParser(description=__doc__,
+                                               formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1', help="dirección donde escuchar")
+    parser.add_argument('--port', type=int, default=8765, help="puerto (0 elige uno libre)")
+    parser.add_argument('--workers', type=int, help="procesos de análisis (por defecto uno por núcleo)")
+    parser.add_argument('--max-pending', type=int, default=DEFAULT_MAX_PENDING,
+                        help="análisis distintos en curso antes de responder 503")
+    parser.add_argument('--cache', metavar='ARCHIVO',
+                        help="caché SQLite de resultados compartida por los procesos")
+    return parser
+
+
+def run_from_args(args):
+    """Arranca el servicio con los argumentos de build_parser o del subcomando 'serve'."""
+    max_pending = DEFAULT_MAX_PENDING if args.max_pending is None else args.max_pending
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, max_pending, args.cache))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    run_from_args(build_parser().parse_args())
@@ -0,0 +1,300 @@
+"""
+Filtrado por bloques de señales largas leídas de archivos mapeados en memoria.
+
+El sistema continuo (un control.TransferFunction como los de get_numeric_tf o
+coeficientes (num, den) de calc_individual_coeffs) se discretiza con la
+transformación bilineal a la frecuencia de muestreo dada y se aplica como
+cascada de secciones de segundo orden (SOS), más estable numéricamente que
+la forma directa. La entrada (raw, WAV o NPY) se abre con np.memmap y se
+recorre en bloques de tamaño fijo; el estado de las secciones pasa de un
+bloque al siguiente, de modo que el resultado es idéntico al de filtrar la
+señal completa de una vez. La salida se escribe en otro archivo mapeado en
+memoria, así que la memoria usada depende del tamaño del bloque y no de la
+longitud de la señal.
+
+Los WAV enteros (8, 16 o 32 bits) se convierten a ±1 a fondo de escala y la
+salida entera se satura; las muestras saturadas se cuentan.
+"""
+import mmap
+import os
+import time
+import numpy as np
+from numeric_tf import is_transfer_function
+from instrumentation import span
+
+DEFAULT_BLOCK_SIZE = 65536
+
+# Cada cuántos bytes procesados se liberan las páginas ya leídas y escritas
+RELEASE_BYTES = 16 * 1024 * 1024
+FORMATS = ('raw', 'wav', 'npy')
+
+# Códigos de formato de la cabecera WAV
+_WAV_PCM = 1
+_WAV_FLOAT = 3
+
+
+def _system_coeffs(system):
+    """(num, den) 1-D de un TransferFunction o de coeficientes, sin ceros a la izquierda."""
+    if is_transfer_function(system):
+        num, den = system.num[0][0], system.den[0][0]
+    else:
+        num, den = system
+    num = np.trim_zeros(np.atleast_1d(np.asarray(num, dtype=float)), 'f')
+    den = np.trim_zeros(np.atleast_1d(np.asarray(den, dtype=float)), 'f')
+    if num.ndim != 1 or den.ndim != 1:
+        raise ValueError("Se esperaba un único sistema (coeficientes 1-D)")
+    if den.size == 0:
+        raise ValueError("El denominador es nulo")
+    return (num if num.size else np.zeros(1)), den
+
+
+def _quadratic_sections(roots):
+    """Agrupa raíces en factores (1, c1, c2) de z^-1 reales: pares conjugados o dos reales.
+
+    Devuelve los factores y el módulo máximo de sus raíces (para ordenarlos).
+    """
+    roots = np.asarray(roots, dtype=complex)
+    tol = 1e-9 * np.maximum(np.abs(roots), 1.0)
+    upper = roots[roots.imag > tol]
+    real = np.sort(roots[np.abs(roots.imag) <= tol].real)
+    sections = [(np.array([1.0, -2 * r.real, abs(r) ** 2]), abs(r)) for r in upper]
+    for i in range(0, real.size, 2):
+        pair = real[i:i + 2]
+        coeffs = np.poly(pair) if pair.size == 2 else np.array([1.0, -pair[0], 0.0])
+        sections.append((coeffs, np.abs(pair).max()))
+    return sections
+
+
+def zpk_to_sos(z, p, k):
+    """Secciones de segundo orden de un sistema discreto con igual número de ceros y polos.
+
+    Las secciones de polos se ordenan por módulo creciente (los más cercanos
+    al círculo unidad al final, como scipy.signal.zpk2sos) y a cada una se le
+    asignan los ceros más cercanos; la ganancia va en la primera.
+    """
+    poles = sorted(_quadratic_sections(p), key=lambda item: item[1])
+    zeros = _quadratic_sections(z)
+    n = max(len(poles), len(zeros), 1)
+    poles += [(np.array([1.0, 0.0, 0.0]), 0.0)] * (n - len(poles))
+    sos = np.zeros((n, 6))
+    for i in range(n - 1, -1, -1):
+        den = poles[i][0]
+        if zeros:
+            # Ceros cuyo factor más se parece al de los polos de la sección
+            best = min(range(len(zeros)), key=lambda j: np.abs(zeros[j][0] - den).sum())
+            num = zeros.pop(best)[0]
+        else:
+            num = np.array([1.0, 0.0, 0.0])
+        sos[i, :3], sos[i, 3:] = num, den
+    sos[0, :3] *= k
+    return sos
+
+
+def discretize(system, fs, prewarp_hz=None):
+    """Secciones de segundo orden (n, 6) del sistema discretizado a fs Hz.
+
+    Se usa la transformación bilineal s = 2 fs (z - 1) / (z + 1) sobre ceros y
+    polos; con prewarp_hz la respuesta discreta coincide exactamente con la
+    continua en esa frecuencia (p. ej. la de corte). Los sistemas impropios
+    (más ceros que polos) también se transforman: cada cero de más aporta un
+    polo en z = -1, así que su ganancia crece hasta la frecuencia de Nyquist.
+    """
+    num, den = _system_coeffs(system)
+    if not fs > 0:
+        raise ValueError("La frecuencia de muestreo debe ser positiva")
+    fs_eff = fs
+    if prewarp_hz is not None:
+        if not 0 < prewarp_hz < fs / 2:
+            raise ValueError("prewarp_hz debe estar entre 0 y fs/2")
+        # s = 2*fs_eff*(z-1)/(z+1) hace coincidir jω en 2π*prewarp_hz
+        fs_eff = np.pi * prewarp_hz / np.tan(np.pi * prewarp_hz / fs)
+    fs2 = 2.0 * fs_eff
+    z, p = np.roots(num), np.roots(den)
+    k = num[0] / den[0] * np.real(np.prod(fs2 - z) / np.prod(fs2 - p))
+    z_d = np.concatenate([(fs2 + z) / (fs2 - z), -np.ones(max(p.size - z.size, 0))])
+    p_d = np.concatenate([(fs2 + p) / (fs2 - p), -np.ones(max(z.size - p.size, 0))])
+    return zpk_to_sos(z_d, p_d, k)
+
+
+class StreamFilter:
+    """Filtro SOS que conserva su estado entre llamadas a process().
+
+    sos: secciones de discretize(). channels: número de canales (columnas
+    de los bloques de forma (n, channels)); None para bloques 1-D.
+    """
+
+    def __init__(self, sos, channels=None):
+        self.sos = np.asarray(sos, dtype=float)
+        self.channels = channels
+        self.reset()
+
+    def reset(self):
+        """Vuelve al estado inicial nulo (sistema en reposo)."""
+        shape = (self.sos.shape[0], 2) if self.channels is None else \
+            (self.sos.shape[0], 2, self.channels)
+        self.zi = np.zeros(shape)
+
+    def process(self, block):
+        """Filtra un bloque (n,) o (n, channels) y devuelve la salida en float64."""
+        from scipy import signal
+        y, self.zi = signal.sosfilt(self.sos, np.asarray(block, dtype=float), axis=0, zi=self.zi)
+        return y
+
+
+def guess_format(path):
+    """Formato según la extensión (.wav, .npy; cualquier otra se lee como raw)."""
+    ext = os.path.splitext(path)[1].lower()
+    return {'.wav': 'wav', '.npy': 'npy'}.get(ext, 'raw')
+
+
+def _int_scale(dtype):
+    """(escala, desplazamiento) de fondo de escala de un tipo entero de WAV."""
+    dtype = np.dtype(dtype)
+    if dtype.kind == 'u':
+        return 2.0 ** (8 * dtype.itemsize - 1), 2.0 ** (8 * dtype.itemsize - 1)
+    return 2.0 ** (8 * dtype.itemsize - 1), 0.0
+
+
+def open_input(path, fmt=None, dtype='float64', channels=1):
+    """Abre la entrada como memmap (frames, channels); devuelve (datos, fs, escala).
+
+    fmt: 'raw', 'wav' o 'npy' (por defecto según la extensión).
+    dtype, channels: tipo y canales intercalados de los archivos raw.
+    fs es la de la cabecera WAV (None en los demás formatos); escala es
+    (factor, desplazamiento) para convertir enteros de WAV a ±1 o None.
+    """
+    fmt = fmt or guess_format(path)
+    if fmt == 'wav':
+        from scipy.io import wavfile
+        fs, data = wavfile.read(path, mmap=True)
+        scale = _int_scale(data.dtype) if data.dtype.kind in 'iu' else None
+    elif fmt == 'npy':
+        fs, scale = None, None
+        data = np.load(path, mmap_mode='r')
+    elif fmt == 'raw':
+        fs, scale = None, None
+        data = np.memmap(path, dtype=dtype, mode='r')
+        if data.size % channels:
+            raise ValueError(f"El tamaño de {path} no es múltiplo de {channels} canales")
+    else:
+        raise ValueError(f"Formato no soportado: {fmt!r} (use {', '.join(FORMATS)})")
+    if data.ndim == 1:
+        data = data.reshape(-1, channels if fmt == 'raw' else 1)
+    elif data.ndim != 2:
+        raise ValueError("La señal debe tener forma (muestras,) o (muestras, canales)")
+    return data, fs, scale
+
+
+def _write_wav_header(f, fs, dtype, frames, channels):
+    dtype = np.dtype(dtype)
+    data_size = frames * channels * dtype.itemsize
+    if data_size + 36 >= 2 ** 32:
+        raise ValueError("La salida supera el límite de 4 GB del formato WAV (use npy o raw)")
+    code = _WAV_FLOAT if dtype.kind == 'f' else _WAV_PCM
+    block_align = channels * dtype.itemsize
+    f.write(b'RIFF' + (36 + data_size).to_bytes(4, 'little') + b'WAVE')
+    f.write(b'fmt ' + (16).to_bytes(4, 'little') + code.to_bytes(2, 'little')
+            + channels.to_bytes(2, 'little') + int(fs).to_bytes(4, 'little')
+            + (int(fs) * block_align).to_bytes(4, 'little')
+            + block_align.to_bytes(2, 'little') + (8 * dtype.itemsize).to_bytes(2, 'little'))
+    f.write(b'data' + data_size.to_bytes(4, 'little'))
+
+
+def open_output(path, shape, dtype, fmt=None, fs=None):
+    """Crea la salida (frames, channels) y la devuelve como memmap de escritura."""
+    fmt = fmt or guess_format(path)
+    dtype = np.dtype(dtype)
+    if fmt == 'npy':
+        return np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=shape)
+    if fmt == 'wav':
+        if fs is None:
+            raise ValueError("La salida WAV necesita la frecuencia de muestreo")
+        if dtype.str.lstrip('<|') not in ('u1', 'i2', 'i4', 'f4', 'f8'):
+            raise ValueError(f"Tipo no soportado en WAV: {dtype}")
+        with open(path, 'wb') as f:
+            _write_wav_header(f, fs, dtype, *shape)
+            header = f.tell()
+            f.truncate(header + shape[0] * shape[1] * dtype.itemsize)
+        return np.memmap(path, dtype=dtype.newbyteorder('<'), mode='r+', offset=header,
+                         shape=shape)
+    if fmt == 'raw':
+        return np.memmap(path, dtype=dtype, mode='w+', shape=shape)
+    raise ValueError(f"Formato no soportado: {fmt!r} (use {', '.join(FORMATS)})")
+
+
+def _release_pages(array, stop):
+    """Descarta de la memoria del proceso las páginas de array antes del byte stop.
+
+    Las páginas de un memmap ya recorridas cuentan como memoria residente
+    hasta que el sistema las recupera; soltarlas (tras escribir las
+    modificadas con flush) mantiene la memoria constante. No hace nada si
+    la plataforma no tiene madvise.
+    """
+    buffer = getattr(array, '_mmap', None)
+    if buffer is None or not hasattr(mmap, 'MADV_DONTNEED'):
+        return
+    # El mapeo empieza en el múltiplo de ALLOCATIONGRANULARITY anterior a offset
+    stop += array.offset % mmap.ALLOCATIONGRANULARITY
+    stop -= stop % mmap.PAGESIZE
+    if stop > 0:
+        buffer.madvise(mmap.MADV_DONTNEED, 0, stop)
+
+
+def filter_file(system, input_path, output_path, fs=None, block_size=DEFAULT_BLOCK_SIZE,
+                fmt=None, dtype='float64', channels=1, output_fmt=None, output_dtype=None,
+                prewarp_hz=None):
+    """Filtra el archivo de entrada por bloques y escribe el resultado.
+
+    system: control.TransferFunction o (num, den) del sistema continuo.
+    fs: frecuencia de muestreo (Hz); obligatoria salvo en WAV, que la trae.
+    fmt, dtype, channels: formato de entrada y, para raw, tipo y canales.
+    output_fmt, output_dtype: por defecto el formato según la extensión de
+        output_path y el tipo de la entrada (float64 si la salida no es WAV
+        y la entrada es entera).
+
+    Devuelve {'frames', 'channels', 'fs', 'blocks', 'clipped', 'seconds'}.
+    """
+    data, wav_fs, in_scale = open_input(input_path, fmt, dtype, channels)
+    fs = fs or wav_fs
+    if fs is None:
+        raise ValueError("Indique la frecuencia de muestreo (fs)")
+    output_fmt = output_fmt or guess_format(output_path)
+    if output_dtype is None:
+        output_dtype = data.dtype if output_fmt == 'wav' or data.dtype.kind == 'f' else 'float64'
+    output_dtype = np.dtype(output_dtype)
+    frames, n_channels = data.shape
+
+    stream = StreamFilter(discretize(system, fs, prewarp_hz), n_channels)
+    out = open_output(output_path, (frames, n_channels), output_dtype, output_fmt, fs)
+    if output_fmt == 'wav' and output_dtype.kind in 'iu':
+        out_scale = _int_scale(output_dtype)
+        info = np.iinfo(output_dtype)
+    else:
+        out_scale = info = None
+
+    clipped = blocks = 0
+    release_every = max(1, RELEASE_BYTES // (block_size * n_channels * data.dtype.itemsize))
+    t0 = time.perf_counter()
+    with span('filter_file', frames=frames, channels=n_channels):
+        for i in range(0, frames, block_size):
+            x = np.asarray(data[i:i + block_size], dtype=float)
+            if in_scale is not None:
+                x = (x - in_scale[1]) / in_scale[0]
+            y = stream.process(x)
+            if out_scale is not None:
+                y = np.rint(y * out_scale[0] + out_scale[1])
+                over = (y < info.min) | (y > info.max)
+                clipped += int(np.count_nonzero(over))
+                np.clip(y, info.min, info.max, out=y)
+            out[i:i + block_size] = y
+            blocks += 1
+            if blocks % release_every == 0:
+                out.flush()
+                done = i + len(y)
+                _release_pages(data, done * data.strides[0])
+                _release_pages(out, done * out.strides[0])
+        out.flush()
+    seconds = time.perf_counter() - t0
+    del out
+    return {'frames': frames, 'channels': n_channels, 'fs': float(fs), 'blocks': blocks,
+            'clipped': clipped, 'seconds': seconds}
@@ -0,0 +1,151 @@
+"""
+Márgenes de ganancia y de fase exactos sin control.margin.
+
+Con s = jω y x = ω², cada polinomio se separa en sus partes par e impar,
+a(jω) = ar(x) + jω ai(x), así que para H(s) = N(s) / D(s):
+  - cruces de fase (H(jω) real negativo, margen de ganancia): ω = 0 y las
+    raíces positivas de R(x) = Ni Dr - Nr Di, que anula Im(N conj(D)) / ω
+  - cruces de ganancia (|H(jω)| = 1, margen de fase): raíces positivas de
+    |N(jω)|² - |D(jω)|² en x
+Se informan todos los cruces, no solo el elegido, y todo está vectorizado
+sobre lotes de sistemas con coeficientes (N, n).
+"""
+import numpy as np
+from numeric_tf import is_transfer_function, system_coeffs, cancel_common_s
+from frequency_metrics import (squared_magnitude_coeffs, positive_real_roots, _polyval_rows,
+                               _polymul_rows, _pad_left, _degree)
+from instrumentation import traced
+
+# Claves compatibles con control.margin: (gm, pm, wg, wp)
+MARGIN_KEYS = ('gm', 'pm', 'wg', 'wp')
+
+# Cruces cuyos márgenes difieren menos que esta fracción se consideran
+# empatados y se elige el de menor frecuencia (control.margin lo hace solo con
+# empates exactos, así que entre ±PM simétricos su elección depende del redondeo)
+_TIE_RTOL = 1e-9
+
+
+def _even_odd(coeffs):
+    """Partes (ar, ai) en x = ω² de a(jω) = ar(x) + jω ai(x) para polinomios (N, n).
+
+    El término s^k aporta (-1)^m x^m a ar si k = 2m y a ai si k = 2m + 1.
+    Devuelve dos arreglos (N, m) en potencias descendentes de x.
+    """
+    a = coeffs[:, ::-1]
+    even, odd = a[:, 0::2], a[:, 1::2]
+    even = even * (-1.0) ** np.arange(even.shape[-1])
+    odd = odd * (-1.0) ** np.arange(odd.shape[-1])
+    if odd.shape[-1] == 0:
+        odd = np.zeros((a.shape[0], 1))
+    return even[:, ::-1], odd[:, ::-1]
+
+
+def _difference(a, b, c, d):
+    """a*b - c*d fila a fila y la magnitud de sus términos (envolvente de _degree)."""
+    ab, cd = _polymul_rows(a, b), _polymul_rows(c, d)
+    size = max(ab.shape[-1], cd.shape[-1])
+    envelope = _pad_left(_polymul_rows(np.abs(a), np.abs(b)), size) \
+        + _pad_left(_polymul_rows(np.abs(c), np.abs(d)), size)
+    return _pad_left(ab, size) - _pad_left(cd, size), envelope
+
+
+def _sorted_crossings(w, keep):
+    """Ordena las frecuencias w (N, k) que cumplen keep; el resto queda en NaN al final."""
+    w = np.sort(np.where(keep, w, np.nan), axis=-1)
+    width = int(np.isfinite(w).sum(axis=-1).max(initial=0))
+    return w[:, :width]
+
+
+def _select(values, score, w):
+    """Valor y frecuencia del cruce de menor score por fila (inf y NaN si no hay).
+
+    w está ordenado, así que entre cruces empatados se elige el primero.
+    """
+    score = np.where(np.isfinite(score), score, np.inf)
+    if score.shape[-1] == 0:
+        n = score.shape[0]
+        return np.full(n, np.inf), np.full(n, np.nan)
+    lowest = score.min(axis=-1)
+    best = np.argmax(score <= lowest[:, None] * (1 + _TIE_RTOL), axis=-1)
+    rows = np.arange(score.shape[0])
+    found = np.isfinite(lowest)
+    return (np.where(found, values[rows, best], np.inf),
+            np.where(found, w[rows, best], np.nan))
+
+
+@traced('stability_margins')
+def stability_margins(system):
+    """Márgenes de ganancia y de fase de uno o varios sistemas, con todos sus cruces.
+
+    system: control.TransferFunction o (num, den) con coeficientes (n,) o
+    (N, n) que comparten grado.
+
+    Devuelve un dict; para un sistema los valores son floats y arreglos 1-D,
+    para un lote arreglos (N,) y (N, k) con NaN de relleno:
+      - gm, pm, wg, wp: como control.margin. gm es el cociente 1/|H| (no dB)
+        del cruce por -180° más cercano a 0 dB y wg su frecuencia; pm el
+        margen de fase de menor valor absoluto y wp su frecuencia. Sin cruces,
+        gm o pm valen inf y su frecuencia NaN.
+      - wg_all, gm_all: todos los cruces por -180° (rad/s, crecientes) y su
+        margen de ganancia. Los ceros de H sobre el eje jω no cuentan.
+      - wp_all, pm_all: todos los cruces por 0 dB y su margen de fase.
+      - real_response: H(jω) es real en todas las frecuencias (p. ej. una
+        etapa resistiva). control no informa cruces en este caso; aquí, si
+        H es negativa, cada frecuencia es un cruce y se informa ω = 0.
+      - unity_gain: |H(jω)| = 1 en todas las frecuencias; el cruce por 0 dB
+        se informa en ω = 0.
+    Lanza ValueError si algún coeficiente no es finito o el denominador es
+    nulo.
+    """
+    single = is_transfer_function(system) \
+        or (np.ndim(system[0]) <= 1 and np.ndim(system[1]) <= 1)
+    num, den = cancel_common_s(*system_coeffs(system))
+    if not (np.all(np.isfinite(num)) and np.all(np.isfinite(den))):
+        raise ValueError("Los coeficientes de la función de transferencia no son finitos")
+    if not np.all(np.any(den, axis=-1)):
+        raise ValueError("El denominador de la función de transferencia es nulo")
+    n_rows = num.shape[0]
+
+    # Cruces de fase (Im H(jω) = 0): ω = 0 y las raíces de R(x); cruces de
+    # ganancia (|N(jω)|² = |D(jω)|²): raíces de G(x). Ambos polinomios se
+    # resuelven en una sola llamada, apilados por filas
+    nr, ni = _even_odd(num)
+    dr, di = _even_odd(den)
+    R, R_envelope = _difference(ni, dr, nr, di)
+    real_response = _degree(R, R_envelope) < 0
+    P, Q = squared_magnitude_coeffs(num), squared_magnitude_coeffs(den)
+    size = max(R.shape[-1], P.shape[-1], Q.shape[-1])
+    P, Q = _pad_left(P, size), _pad_left(Q, size)
+    G, G_envelope = P - Q, np.abs(P) + np.abs(Q)
+    unity_gain = _degree(G, G_envelope) < 0
+    x = positive_real_roots(np.concatenate([_pad_left(R, size), G]),
+                            np.concatenate([_pad_left(R_envelope, size), G_envelope]))
+    x_phase, x_gain = x[:n_rows, :R.shape[-1] - 1], x[n_rows:]
+    w_phase = np.concatenate([np.zeros((n_rows, 1)), np.sqrt(x_phase)], axis=-1)
+    with np.errstate(all='ignore'):
+        N = _polyval_rows(num, 1j * w_phase)
+        D = _polyval_rows(den, 1j * w_phase)
+        # Signo de Re(H) sin dividir; D = 0 es un polo sobre el eje jω
+        negative = ((N * np.conj(D)).real < 0) & (D != 0)
+    wg_all = _sorted_crossings(w_phase, negative)
+    with np.errstate(all='ignore'):
+        gm_all = np.abs(_polyval_rows(den, 1j * wg_all) / _polyval_rows(num, 1j * wg_all))
+        gm, wg = _select(gm_all, np.abs(np.log(gm_all)), wg_all)
+
+    w_gain = np.concatenate([np.where(unity_gain, 0.0, np.nan)[:, None], np.sqrt(x_gain)],
+                            axis=-1)
+    wp_all = _sorted_crossings(w_gain, np.isfinite(w_gain))
+    with np.errstate(all='ignore'):
+        H = _polyval_rows(num, 1j * wp_all) / _polyval_rows(den, 1j * wp_all)
+    pm_all = np.remainder(np.angle(H, deg=True), 360.0) - 180.0
+    pm, wp = _select(pm_all, np.abs(pm_all), wp_all)
+
+    margins = {'gm': gm, 'pm': pm, 'wg': wg, 'wp': wp,
+               'gm_all': gm_all, 'wg_all': wg_all, 'pm_all': pm_all, 'wp_all': wp_all,
+               'real_response': real_response, 'unity_gain': unity_gain}
+    if single:
+        found = {'gm_all': ~np.isnan(wg_all[0]), 'wg_all': ~np.isnan(wg_all[0]),
+                 'pm_all': ~np.isnan(wp_all[0]), 'wp_all': ~np.isnan(wp_all[0])}
+        return {key: value[0][found[key]] if key in found else value[0].item()
+                for key, value in margins.items()}
+    return margins
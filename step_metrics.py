@@ -0,0 +1,289 @@
+"""
+Características de la respuesta al escalón a partir de polos y residuos.
+
+step_metrics devuelve lo mismo que control.step_info (mismas claves y
+definiciones: tiempo de subida 10-90 %, establecimiento con banda del 2 %,
+SettlingMin/Max desde el fin de la subida, sobreimpulso y subimpulso en %,
+pico, instante del pico y valor final) para uno o para un lote de sistemas,
+sin simular.
+
+La respuesta y(t) = k + sum(r_i / p_i * (exp(p_i t) - 1)) es monótona entre
+dos ceros consecutivos de su derivada h(t) = sum(r_i * exp(p_i t)), así que
+basta con conocer esos extremos:
+
+    1 polo:        no hay extremos interiores
+    2 polos:       forma cerrada; un par complejo p = s + jw con residuo r da
+                   h(t) = 2|r| e^(s t) cos(w t + arg r), con ceros en
+                   t_k = (pi/2 - arg r + k pi) / w, y dos polos reales un
+                   único cero en t = ln(-r2 / r1) / (p1 - p2)
+    3 o más polos: cambios de signo de h en una malla de plan_time_grid,
+                   refinados por bisección vectorizada
+
+Con los extremos, los cruces de los niveles de subida y la última salida de
+la banda de establecimiento quedan acotados en un tramo monótono y se
+refinan por bisección (en forma cerrada para primer orden). Todo se evalúa
+sobre [0, T] con T el horizonte de control.step_response: ln(1000) / |Re p|
+del modo más lento entre los que aportan al menos el 10 % de la amplitud
+|r / p| del mayor. Así el pico de una respuesta monótona (que se alcanza en
+T) y la falta de establecimiento dentro de T coinciden con control. Con polos
+reales, como los de todas las etapas RC de este circuito, el horizonte es
+idéntico; con polos complejos control pondera los modos con sus autovectores
+y T puede diferir.
+
+Tolerancia frente a control.step_info: control muestrea la respuesta con un
+paso dt de entre T/5000 y T/100 y toma los extremos de sus muestras, así que
+los tiempos difieren a lo sumo en STEP_INFO_TIME_STEPS pasos de su malla y
+los valores (pico, sobreimpulso, subimpulso, SettlingMin/Max) en
+STEP_INFO_RTOL relativo más lo que cambia la respuesta en un paso dt (control
+no ve un pico que cae entre dos muestras). Los sistemas con polos repetidos
+o mal condicionados se calculan con control.step_info.
+
+A diferencia de control, los factores s comunes a numerador y denominador se
+cancelan (como en numeric_tf.dc_gain): control.step_info da NaN en esos
+sistemas porque su ganancia DC queda 0/0.
+"""
+import warnings
+import numpy as np
+from numeric_tf import is_transfer_function, system_coeffs, dc_gain, cancel_common_s
+from time_response import modal_decomposition, _modal_response, _planned_grid
+from instrumentation import span, traced
+
+STEP_INFO_KEYS = ('RiseTime', 'SettlingTime', 'SettlingMin', 'SettlingMax', 'Overshoot',
+                  'Undershoot', 'Peak', 'PeakTime', 'SteadyStateValue')
+
+RISE_TIME_LIMITS = (0.1, 0.9)
+SETTLING_THRESHOLD = 0.02
+
+# Tolerancia declarada frente a control.step_info
+STEP_INFO_TIME_STEPS = 2   # tiempos: pasos de la malla de control
+STEP_INFO_RTOL = 1e-2      # valores: error relativo
+
+# Horizonte de control.step_info (timeresp._ideal_tfinal_and_dt)
+_LOG_DECAY = np.log(1000)
+_RELEVANCE = 0.1
+_STATIC_HORIZON = 5.0
+_SQRT_EPS = np.sqrt(np.spacing(1.0))
+
+BISECTION_STEPS = 52   # el intervalo se reduce 2^52 veces: precisión de máquina
+BRACKET_POINTS = 512   # malla para acotar los extremos de orden 3 o más
+CHUNK_SIZE = 1024      # sistemas por bloque al evaluar esa malla
+
+
+def _control_horizon(modes):
+    """Duración T (N,) de la simulación que haría control.step_response."""
+    p, r = modes['poles'], modes['residues']
+    if p.shape[-1] == 0:
+        return np.full(p.shape[0], _STATIC_HORIZON)
+    mag = np.abs(p)
+    integrator = mag == 0
+    # Amplitud de cada modo en la respuesta al escalón (el doble si es complejo)
+    size = np.where(integrator, 0.0, np.abs(r) / np.where(integrator, 1.0, mag))
+    size = np.where(p.imag != 0, 2 * size, size)
+    relevant = (size > _RELEVANCE * size.max(axis=-1, keepdims=True)) & ~integrator
+    oscillating = (p.imag != 0) & (np.abs(p.real) <= _SQRT_EPS)
+    horizon = np.where(oscillating, 5 * 2 * np.pi / np.where(integrator, 1.0, mag),
+                       _LOG_DECAY / np.abs(np.where(oscillating | integrator, 1.0, p.real)))
+    horizon = np.where(relevant, horizon, 0.0).max(axis=-1)
+    return np.where(horizon > 0, horizon, 5 * _STATIC_HORIZON)
+
+
+def _rows(modes, index):
+    return {key: value[index] for key, value in modes.items()}
+
+
+def _at(modes, t, kind='step'):
+    """Respuesta de cada sistema i en su propio instante t[i]."""
+    return _modal_response(modes, t[:, None], kind)[:, 0]
+
+
+def _bisect(predicate, lo, hi):
+    """Primer instante de [lo, hi] en que predicate(t) pasa de False a True.
+
+    predicate recibe un arreglo de instantes, uno por intervalo, y debe ser
+    False en lo y True en hi.
+    """
+    for _ in range(BISECTION_STEPS):
+        mid = 0.5 * (lo + hi)
+        ok = predicate(mid)
+        lo = np.where(ok, lo, mid)
+        hi = np.where(ok, mid, hi)
+    return hi
+
+
+def _second_order_extrema(modes, horizon):
+    """Ceros de h(t) en (0, T] de sistemas de dos polos, en forma cerrada."""
+    p, r = modes['poles'], modes['residues']
+    upper = np.where(p[:, 0].imag > 0, 0, 1)
+    rows = np.arange(p.shape[0])
+    p0, r0 = p[rows, upper], r[rows, upper]
+    oscillating = p0.imag > 0
+    omega = np.where(oscillating, p0.imag, 1.0)
+    # Par complejo: ceros de cos(w t + arg r) cada pi / w
+    first = np.mod(np.pi / 2 - np.angle(r0), np.pi) / omega
+    count = np.where(oscillating & (first <= horizon),
+                     np.floor((horizon - first) * omega / np.pi) + 1, 0).astype(int)
+    k = np.arange(max(count.max(initial=0), 1))
+    times = np.where(k < count[:, None], first[:, None] + k * np.pi / omega[:, None], np.inf)
+    # Dos polos reales: r1 e^(p1 t) + r2 e^(p2 t) = 0
+    real = ~oscillating
+    ratio = -r[:, 1].real / np.where(r[:, 0] != 0, r[:, 0].real, np.nan)
+    single = np.log(ratio) / (p[:, 0].real - p[:, 1].real)
+    times[:, 0] = np.where(real, single, times[:, 0])
+    return times
+
+
+def _grid_extrema(modes, horizon):
+    """Ceros de h(t) en (0, T]: cambios de signo en una malla y bisección."""
+    n = horizon.shape[0]
+    rows, times = [], []
+    for i in range(0, n, CHUNK_SIZE):
+        j = min(i + CHUNK_SIZE, n)
+        chunk = _rows(modes, slice(i, j))
+        grid = _planned_grid(chunk['poles'], horizon[i:j], BRACKET_POINTS)
+        positive = _modal_response(chunk, grid, 'impulse') > 0
+        row, col = np.nonzero(positive[:, 1:] != positive[:, :-1])
+        if row.size == 0:
+            continue
+        bracket = _rows(chunk, row)
+        sign = positive[row, col + 1]
+        times.append(_bisect(lambda t: (_at(bracket, t, 'impulse') > 0) == sign,
+                             grid[row, col], grid[row, col + 1]))
+        rows.append(row + i)
+    if not rows:
+        return np.full((n, 1), np.inf)
+    rows, times = np.concatenate(rows), np.concatenate(times)
+    # Posición de cada cero dentro de su fila (las filas vienen ordenadas)
+    counts = np.bincount(rows, minlength=n)
+    starts = np.cumsum(counts) - counts
+    out = np.full((n, counts.max()), np.inf)
+    out[rows, np.arange(rows.size) - starts[rows]] = times
+    return out
+
+
+def _knots(modes, horizon):
+    """Instantes (N, K) que parten [0, T] en tramos donde y(t) es monótona."""
+    degree = modes['poles'].shape[-1]
+    n = horizon.shape[0]
+    if degree <= 1:
+        extrema = np.zeros((n, 0))
+    elif degree == 2:
+        extrema = _second_order_extrema(modes, horizon)
+    else:
+        extrema = _grid_extrema(modes, horizon)
+    extrema = np.where((extrema > 0) & (extrema < horizon[:, None]), extrema, horizon[:, None])
+    return np.sort(np.concatenate([np.zeros((n, 1)), extrema, horizon[:, None]], axis=1), axis=1)
+
+
+def _crossing(modes, lo, hi, predicate, final, distance):
+    """Instante en [lo, hi] (tramo monótono) en que |y - final| llega a distance."""
+    p = modes['poles']
+    if p.shape[-1] == 1:
+        # Primer orden: y(t) - final = (k - final) e^(p t)
+        start = np.abs(modes['direct'] - final)
+        t = np.log(distance / start) / p[:, 0].real
+        return np.clip(np.where(np.isfinite(t), t, hi), lo, hi)
+    return _bisect(predicate, lo, hi)
+
+
+def _exact_metrics(modes, final, horizon):
+    """Características (dict de arreglos (N,)) de los sistemas con polos simples."""
+    knots = _knots(modes, horizon)
+    y = _modal_response(modes, knots, 'step')
+    rows = np.arange(knots.shape[0])
+    sign = np.sign(final)
+
+    # Subida: primer instante en que sign * (y - a * final) >= 0
+    rise = []
+    for limit in RISE_TIME_LIMITS:
+        level = limit * final
+        reached = sign[:, None] * (y - level[:, None]) >= 0
+        j = np.argmax(reached, axis=1)
+        t = _crossing(modes, knots[rows, np.maximum(j - 1, 0)], knots[rows, j],
+                      lambda t: sign * (_at(modes, t) - level) >= 0,
+                      final, np.abs(level - final))
+        rise.append(np.where(reached.any(axis=1), t, np.nan))
+    rise_start, rise_end = rise
+
+    # Establecimiento: última salida de la banda |y - final| < umbral * |final|
+    band = SETTLING_THRESHOLD * np.abs(final)
+    outside = np.abs(y - final[:, None]) >= band[:, None]
+    last = knots.shape[1] - 1 - np.argmax(outside[:, ::-1], axis=1)
+    after = np.minimum(last + 1, knots.shape[1] - 1)
+    settling = _crossing(modes, knots[rows, last], knots[rows, after],
+                         lambda t: np.abs(_at(modes, t) - final) < band, final, band)
+    settling = np.where(outside.any(axis=1), settling, 0.0)
+    settling = np.where(outside[:, -1], np.nan, settling)
+
+    # Extremos desde el fin de la subida
+    y_rise = _at(modes, np.where(np.isfinite(rise_end), rise_end, 0.0))
+    later = knots >= rise_end[:, None]
+    settling_min = np.minimum(np.minimum(np.where(later, y, np.inf).min(axis=1), y_rise), final)
+    settling_max = np.maximum(np.maximum(np.where(later, y, -np.inf).max(axis=1), y_rise), final)
+
+    signed = sign[:, None] * y
+    excess = np.abs(signed.max(axis=1)) - np.abs(final)
+    overshoot = np.where(excess > 0, np.abs(100 * excess / final), 0.0)
+    lowest = y[rows, np.argmin(signed, axis=1)]
+    undershoot = np.where(sign * lowest < 0, -100 * lowest / final, 0.0)
+    peak_index = np.argmax(np.abs(y), axis=1)
+
+    return {'RiseTime': rise_end - rise_start,
+            'SettlingTime': settling,
+            'SettlingMin': settling_min,
+            'SettlingMax': settling_max,
+            'Overshoot': overshoot,
+            'Undershoot': undershoot,
+            'Peak': np.abs(y[rows, peak_index]),
+            'PeakTime': knots[rows, peak_index],
+            'SteadyStateValue': final}
+
+
+@traced('step_metrics')
+def step_metrics(system):
+    """Características de la respuesta al escalón, como control.step_info.
+
+    system: control.TransferFunction o (num, den) con coeficientes (n,) o
+    (N, n) que comparten grado. Devuelve un dict con las claves de
+    STEP_INFO_KEYS: floats para un sistema y arreglos (N,) para un lote. Si
+    el valor final no es finito (polo en el origen) todo es NaN salvo Peak y
+    PeakTime, que valen inf, como en control. Lanza ValueError si el sistema
+    es impropio; en un lote, las filas que control.step_info rechaza quedan
+    en NaN.
+    """
+    single = is_transfer_function(system) \
+        or (np.ndim(system[0]) <= 1 and np.ndim(system[1]) <= 1)
+    num, den = system_coeffs(system)
+    modes = modal_decomposition((num, den))
+    final = dc_gain(num, den)
+    n = final.shape[0]
+    info = {key: np.full(n, np.nan) for key in STEP_INFO_KEYS}
+    info['Peak'][:] = np.inf
+    info['PeakTime'][:] = np.inf
+
+    rows = np.flatnonzero(modes['exact'] & np.isfinite(final))
+    if rows.size:
+        with np.errstate(all='ignore'):
+            subset = _rows(modes, rows)
+            horizon = _control_horizon(subset)
+            for key, value in _exact_metrics(subset, final[rows], horizon).items():
+                info[key][rows] = value
+
+    rest = np.flatnonzero(~modes['exact'])
+    if rest.size:
+        import control
+        with warnings.catch_warnings(), span('control.step_info'):
+            warnings.simplefilter('ignore')
+            for i in rest:
+                try:
+                    row = control.step_info(control.TransferFunction(
+                        *cancel_common_s(num[i], den[i])))
+                except ValueError:
+                    # En un lote, un diseño que control no acepta queda en NaN
+                    if single:
+                        raise
+                    continue
+                for key, value in row.items():
+                    info[key][i] = value
+    if single:
+        return {key: float(value[0]) for key, value in info.items()}
+    return info
@@ -0,0 +1,128 @@
+"""
+Barrido de parámetros sobre cualquier subconjunto de componentes.
+
+Los rangos de cada componente se combinan en una malla cartesiana. Como la
+topología (configs) es fija, los coeficientes de todos los puntos se obtienen
+en una sola llamada vectorizada de numeric_tf y la respuesta en frecuencia se
+evalúa por lotes, sin reconstruir H(s) simbólicamente para cada punto.
+"""
+import numpy as np
+from numeric_tf import COMPONENT_NAMES, values_by_name, calc_individual_coeffs, normalize_coeffs
+from batch_response import (DEFAULT_W, SYSTEM_NAMES, jw_powers, coeffs_magnitude_db,
+                            determine_filter_type_batch)
+from frequency_metrics import frequency_metrics
+from step_metrics import step_metrics
+
+STEP_INFO_KEYS = ('RiseTime', 'SettlingTime', 'Overshoot', 'Peak', 'SteadyStateValue')
+
+
+def make_range(start, stop, num, scale='log'):
+    """Crea un rango de valores lineal ('lin') o logarítmico ('log')."""
+    if scale == 'log':
+        return np.logspace(np.log10(start), np.log10(stop), int(num))
+    if scale == 'lin':
+        return np.linspace(start, stop, int(num))
+    raise ValueError(f"Escala desconocida: {scale!r} (use log o lin)")
+
+
+def parse_range(text):
+    """Interpreta 'NOMBRE=INICIO:FIN:N[:log|lin]' y devuelve (nombre, valores)."""
+    name, _, spec = text.partition('=')
+    parts = spec.split(':')
+    if name not in COMPONENT_NAMES or len(parts) not in (3, 4):
+        raise ValueError(f"Rango inválido: {text!r} (formato NOMBRE=INICIO:FIN:N[:log|lin])")
+    scale = parts[3] if len(parts) == 4 else 'log'
+    return name, make_range(float(parts[0]), float(parts[1]), int(parts[2]), scale)
+
+
+def _check_values(values):
+    """Valida los valores por nombre de run_sweep (ver parse_record)."""
+    unknown = set(values).difference(COMPONENT_NAMES)
+    if unknown:
+        raise ValueError(f"Componente desconocido: {sorted(unknown)[0]!r}")
+    for name, value in values.items():
+        value = np.asarray(value, dtype=float)
+        if value.size == 0 or not np.all(np.isfinite(value)) or np.any(value < 0):
+            raise ValueError(f"Valor inválido para {name}")
+    for name in ('R1', 'R2', 'R3', 'R4'):
+        if name not in values:
+            raise ValueError(f"Falta {name} (use --value o --sweep)")
+        if np.any(np.asarray(values[name]) <= 0):
+            raise ValueError(f"{name} debe ser positivo")
+
+
+def run_sweep(ranges, configs, fixed=None, w=None, step_info=False):
+    """Evalúa las métricas de analyze_responses_no_plots sobre una malla.
+
+    ranges: {nombre: valores} para los componentes barridos (el orden define
+        los ejes del resultado).
+    configs: configuraciones de impedancia comunes a todos los puntos.
+    fixed: `valores` con el resto de componentes; los capacitores que falten
+        valen 0 y R1..R4 deben estar en ranges o en fixed.
+    step_info: si True también se calculan las características de la
+        respuesta al escalón de cada punto (step_metrics, por lotes).
+
+    Devuelve {'axes': {nombre: valores}, 'metrics': {métrica: arreglo}} donde
+    cada arreglo de métricas tiene la forma de la malla. Lanza ValueError si
+    hay componentes desconocidos, falta una resistencia o algún valor es
+    negativo, no finito o una resistencia no positiva.
+    """
+    w = DEFAULT_W if w is None else np.asarray(w, dtype=float)
+    axes = {name: np.asarray(values, dtype=float) for name, values in ranges.items()}
+    fixed = values_by_name(fixed or {})
+    _check_values({**fixed, **axes})
+    shape = tuple(len(values) for values in axes.values())
+    grids = np.meshgrid(*axes.values(), indexing='ij', sparse=True)
+
+    values = {name: 0.0 for name in COMPONENT_NAMES}
+    values.update(fixed)
+    values.update(zip(axes, grids))
+    values = {name: np.broadcast_to(v, shape).ravel() for name, v in values.items()}
+
+    coeffs = calc_individual_coeffs(values, configs)
+    size = int(np.prod(shape))
+
+    metrics = {}
+    for name, (num, den) in zip(SYSTEM_NAMES, coeffs):
+        cutoff = frequency_metrics((num, den))['cutoff_hz']
+        metrics[f'cutoff_hz_{name}'] = np.broadcast_to(cutoff, (size,)).reshape(shape)
+
+    # La malla en frecuencia solo se usa para clasificar el tipo de filtro
+    num, den = coeffs[2]
+    mag_db = coeffs_magnitude_db(num, den, w, jw_powers(w, max(num.shape[-1], den.shape[-1]) - 1))
+    filter_type = determine_filter_type_batch(mag_db, w / (2 * np.pi))
+    metrics['filter_type'] = np.broadcast_to(filter_type, (size,)).reshape(shape)
+
+    if step_info:
+        for name, (num, den) in zip(SYSTEM_NAMES, coeffs):
+            # Coeficientes normalizados como los de coeffs_to_tf
+            num, den = normalize_coeffs(np.broadcast_to(num, (size, num.shape[-1])),
+                                        np.broadcast_to(den, (size, den.shape[-1])))
+            info = step_metrics((num, den))
+            for key in STEP_INFO_KEYS:
+                metrics[f'{key}_{name}'] = info[key].reshape(shape)
+
+    return {'axes': axes, 'metrics': metrics}
+
+
+def save_sweep(result, path):
+    """Guarda el barrido en un archivo .npz (ejes con prefijo 'axis_')."""
+    arrays = {f'axis_{name}': values for name, values in result['axes'].items()}
+    arrays.update(result['metrics'])
+    np.savez(path, **arrays)
+
+
+def print_sweep_summary(result):
+    """Imprime un resumen del barrido."""
+    print("\n=== BARRIDO DE PARÁMETROS ===")
+    for name, values in result['axes'].items():
+        print(f"{name}: {len(values)} puntos entre {values[0]:.4g} y {values[-1]:.4g}")
+    for name, values in result['metrics'].items():
+        if values.dtype.kind in 'fi':
+            finite = values[np.isfinite(values)]
+            if finite.size:
+                print(f"{name}: min = {finite.min():.4g}, max = {finite.max():.4g}")
+        else:
+            kinds, counts = np.unique(values, return_counts=True)
+            summary = ", ".join(f"{k} ({c})" for k, c in zip(kinds, counts))
+            print(f"{name}: {summary}")
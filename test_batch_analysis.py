@@ -0,0 +1,33 @@
+import io
+import json
+from batch_analysis import run_batch
+
+
+def _run(records):
+    out = io.StringIO()
+    run_batch(io.StringIO('\n'.join(json.dumps(r) for r in records)), out)
+    return [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+def test_mixed_capacitors_in_one_topology():
+    # Misma configuración declarada, con y sin capacitor: el nulo equivale a 'R'
+    base = {'R1': 1e4, 'R2': 1e4, 'R3': 1e4, 'R4': 1e4}
+    records = [dict(base, input1='serie', Ci1=1e-9), dict(base, input1='serie', Ci1=0),
+               dict(base, config1='paralelo', C1=1e-8), dict(base, config1='paralelo')]
+    results = _run(records)
+    assert [r['index'] for r in results] == [0, 1, 2, 3]
+    assert all('error' not in r for r in results)
+    assert results[0]['zeros'] == [[0.0, 0.0]]
+    assert results[1]['poles'] == [] and results[1]['dc_gain'] == 1.0
+    assert results[2]['poles'] and results[3]['poles'] == []
+    assert results[1]['configs']['input1'] == 'serie'
+
+
+def test_non_object_lines_are_reported_per_record():
+    out = io.StringIO()
+    lines = ['5', '[1, 2]', '"R1"', 'null',
+             json.dumps({'R1': 1e4, 'R2': 1e4, 'R3': 1e4, 'R4': 1e4})]
+    assert run_batch(io.StringIO('\n'.join(lines)), out) == 5
+    results = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r.get('error') for r in results[:4]] == ["El registro debe ser un objeto JSON"] * 4
+    assert 'error' not in results[4]
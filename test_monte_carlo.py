@@ -0,0 +1,15 @@
+import itertools
+from utils import CONFIG_NAMES, config_from_name
+from batch_analysis import CONFIG_KEYS
+from monte_carlo import evaluate_metrics, default_spec, compute_yield
+
+NOMINAL = {'R1': 1e4, 'R2': 2.2e4, 'R3': 4.7e3, 'R4': 1e4,
+           'C1': 1e-8, 'C2': 4.7e-9, 'Ci1': 1e-7, 'Ci2': 2.2e-8}
+
+
+def test_nominal_design_passes_its_default_spec():
+    # Incluye topologías sin frecuencia de corte (solo R, integradores, shelving)
+    for topology in itertools.product(CONFIG_NAMES, repeat=4):
+        configs = {key: config_from_name(name) for key, name in zip(CONFIG_KEYS, topology)}
+        metrics = evaluate_metrics(NOMINAL, configs)
+        assert compute_yield(metrics, default_spec(metrics))['total'] == 100, topology
@@ -2,8 +2,8 @@
 Análisis de equivalentes Thévenin para circuitos con amplificadores operacionales.
 """
 import numpy as np
-import matplotlib.pyplot as plt
 from utils import init_components, configure_plots
+from design_record import as_components
 
 def calc_thevenin_entrada(R1, R2, C1, Ci, s, config, input_config):
     """Calcula el equivalente Thévenin desde la entrada.
@@ -63,7 +63,7 @@ def plot_thevenin_analysis(components=None, show_plots=False):
     if components is None:
         (R1, R2, R3, R4), (Ci1, Ci2, C1, C2), valores, configs = init_components()
     else:
-        (R1, R2, R3, R4), (Ci1, Ci2, C1, C2), valores, configs = components
+        (R1, R2, R3, R4), (Ci1, Ci2, C1, C2), valores, configs = as_components(components)
     
     print("\n=== PRIMER AMPLIFICADOR OPERACIONAL ===")
     print("Equivalente th entrada: Z1")
@@ -0,0 +1,249 @@
+"""
+Respuestas temporales exactas a partir de la expansión en fracciones parciales.
+
+Para un sistema racional propio H(s) = k + sum(r_i / (s - p_i)) con polos
+simples, las respuestas al impulso y al escalón son sumas de modos
+exponenciales:
+
+    impulso: y(t) = sum(r_i * exp(p_i t))            (se omite k*delta(t))
+    escalón: y(t) = k + sum(r_i / p_i * (exp(p_i t) - 1))
+
+Polos y residuos se calculan una sola vez por sistema (o por lote de sistemas
+con la misma forma) y la respuesta se evalúa vectorizada en cualquier conjunto
+de instantes. Solo los sistemas con polos repetidos o mal condicionados se
+simulan con control.step_response / control.impulse_response.
+"""
+import warnings
+import numpy as np
+from numeric_tf import is_transfer_function, system_coeffs, cancel_common_s, batch_roots, trim_leading
+from instrumentation import span, traced
+
+# Separación relativa mínima entre polos para considerarlos simples
+POLE_SEPARATION_TOL = 1e-6
+
+# Planificador de mallas de tiempo
+DEFAULT_TIME_POINTS = 400  # presupuesto de puntos por defecto
+HORIZON_TAUS = 7           # el modo más lento decae hasta e^-7 (~0.1 %)
+DEFAULT_HORIZON = 0.01     # horizonte si no hay polos que fijen una escala
+OSCILLATION_WEIGHT = 1.0   # puntos por periodo relativos a los puntos por constante de tiempo
+_AUX_POINTS = 2048
+
+
+def _polyval(coeffs, x):
+    """Evalúa polinomios (N, n) en puntos x (N, d) con Horner."""
+    out = np.zeros(x.shape, dtype=complex)
+    for k in range(coeffs.shape[-1]):
+        out = out * x + coeffs[:, k:k + 1]
+    return out
+
+
+def modal_decomposition(system):
+    """Calcula la expansión en fracciones parciales de uno o varios sistemas.
+
+    system: control.TransferFunction o (num, den) con coeficientes (n,) o (N, n)
+        que comparten grado.
+
+    Devuelve un dict con 'residues' y 'poles' (N, d), 'direct' (N,) y 'exact'
+    (N,), False para los sistemas con polos repetidos o mal condicionados (o
+    de menor grado que el lote), que deben simularse. Lanza ValueError si el
+    sistema es impropio.
+    """
+    num, den = (trim_leading(c) for c in cancel_common_s(*system_coeffs(system)))
+    if num.shape[-1] > den.shape[-1]:
+        raise ValueError("El sistema es impropio; no tiene respuesta al escalón acotada")
+    # Normalizar el denominador a mónico. Los sistemas cuyo coeficiente
+    # principal es nulo (de menor grado que el resto del lote) se simulan; sus
+    # filas se reemplazan por un denominador cualquiera con polos simples
+    degenerate = den[:, 0] == 0
+    if np.any(degenerate):
+        den = np.where(degenerate[:, None], np.poly(-np.arange(1.0, den.shape[-1])), den)
+    lead = den[:, :1]
+    num, den = num / lead, den / lead
+
+    direct = np.zeros(num.shape[0])
+    if num.shape[-1] == den.shape[-1]:
+        direct = num[:, 0].copy()
+        num = (num - direct[:, None] * den)[:, 1:]
+
+    poles = batch_roots(den)
+    degree = poles.shape[-1]
+    exact = ~degenerate
+    if degree == 0:
+        residues = np.zeros((num.shape[0], 0), dtype=complex)
+        return {'residues': residues, 'poles': poles, 'direct': direct, 'exact': exact}
+
+    d_den = den[:, :-1] * np.arange(degree, 0, -1)
+    d_at_poles = _polyval(d_den, poles)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Con polos repetidos d_at_poles se anula: el sistema no es exacto
+        residues = _polyval(num, poles) / d_at_poles
+
+    if degree > 1:
+        diff = np.abs(poles[:, :, None] - poles[:, None, :])
+        scale = np.maximum(np.abs(poles[:, :, None]), np.abs(poles[:, None, :]))
+        diff[:, np.arange(degree), np.arange(degree)] = np.inf
+        exact &= np.all(diff > POLE_SEPARATION_TOL * np.maximum(scale, 1e-300), axis=(1, 2))
+    exact &= np.all(np.isfinite(residues), axis=-1)
+    return {'residues': residues, 'poles': poles, 'direct': direct, 'exact': exact}
+
+
+def _modal_response(modes, t, kind):
+    """Evalúa la respuesta (N, M) de la descomposición modal en los instantes t.
+
+    t puede ser (M,), común a todos los sistemas, o (N, M), uno por sistema.
+    """
+    r = modes['residues'][:, :, None]
+    p = modes['poles'][:, :, None]
+    tt = t[:, None, :] if t.ndim == 2 else t[None, None, :]
+    if kind == 'impulse':
+        return np.sum(r * np.exp(p * tt), axis=1).real
+    # Escalón: los polos en el origen aportan r * t
+    at_origin = p == 0
+    safe_p = np.where(at_origin, 1.0, p)
+    terms = np.where(at_origin, r * tt, r / safe_p * (np.exp(p * tt) - 1))
+    y = modes['direct'][:, None] + np.sum(terms, axis=1)
+    return np.real(y)
+
+
+def _simulate(num, den, t, kind):
+    """Simulación con control en una malla uniforme, interpolada a t."""
+    import control
+    sys = control.TransferFunction(num, den)
+    t_end = float(np.max(t)) if np.max(t) > 0 else 1.0
+    # Paso uniforme tan fino como el menor paso de t (acotado)
+    steps = np.diff(np.unique(t))
+    n = t_end / steps.min() if steps.size else 1
+    t_uniform = np.linspace(0, t_end, int(min(max(n + 1, t.size, 1000), 100_000)))
+    with warnings.catch_warnings(), span(f'control.{kind}_response'):
+        warnings.simplefilter('ignore')
+        if kind == 'impulse':
+            _, y = control.impulse_response(sys, t_uniform)
+        else:
+            _, y = control.step_response(sys, t_uniform)
+    return np.interp(t, t_uniform, y)
+
+
+def _response(system, t, kind):
+    single = is_transfer_function(system) \
+        or (np.ndim(system[0]) <= 1 and np.ndim(system[1]) <= 1)
+    num, den = system_coeffs(system)
+    t = np.asarray(t, dtype=float)
+    modes = modal_decomposition((num, den))
+    y = _modal_response(modes, t, kind)
+    for i in np.flatnonzero(~modes['exact']):
+        y[i] = _simulate(num[i], den[i], t[i] if t.ndim == 2 else t, kind)
+    return y[0] if single else y
+
+
+@traced('step_response')
+def step_response(system, t):
+    """Respuesta al escalón exacta en los instantes t.
+
+    system: control.TransferFunction o (num, den); con coeficientes (N, n)
+    devuelve un arreglo (N, M), si no uno (M,). t puede ser (M,) o, para un
+    lote, (N, M) como la que devuelve plan_time_grid.
+    """
+    return _response(system, t, 'step')
+
+
+@traced('impulse_response')
+def impulse_response(system, t):
+    """Respuesta al impulso exacta en los instantes t (sin el término k*delta(t))."""
+    return _response(system, t, 'impulse')
+
+
+def _system_poles(system):
+    """Polos (N, d) de un sistema, sin los factores s comunes a num y den."""
+    num, den = cancel_common_s(*system_coeffs(system))
+    return batch_roots(den)
+
+
+def _interp_rows(x, xp, fp):
+    """np.interp fila por fila: x (N, M), xp y fp (N, K) con xp creciente."""
+    n, k = xp.shape
+    # Se desplaza cada fila a un intervalo disjunto para buscar todas a la vez
+    scale = xp[:, -1:]
+    offset = 2 * np.arange(n)[:, None]
+    flat_xp = (xp / scale + offset).ravel()
+    flat_x = (x / scale + offset).ravel()
+    idx = np.searchsorted(flat_xp, flat_x, side='right') - 1
+    row = np.repeat(np.arange(n) * k, x.shape[1])
+    idx = np.clip(idx, row, row + k - 2)
+    x0, x1 = flat_xp[idx], flat_xp[idx + 1]
+    frac = (flat_x - x0) / (x1 - x0)
+    fp = fp.ravel()
+    return (fp[idx] + frac * (fp[idx + 1] - fp[idx])).reshape(x.shape)
+
+
+@traced('plan_time_grid')
+def plan_time_grid(*systems, n_points=DEFAULT_TIME_POINTS):
+    """Planifica una malla de tiempo a partir de los polos de los sistemas.
+
+    El horizonte es HORIZON_TAUS veces la constante de tiempo del polo más
+    lento y los n_points instantes se reparten con densidad decreciente en
+    el tiempo: el mismo número de puntos por cada factor e de tiempo desde la
+    escala del polo más rápido, más puntos por periodo mientras duren los
+    modos oscilatorios. Así cada modo queda resuelto con pocos puntos sin
+    importar si sus constantes de tiempo son de µs o de segundos.
+
+    systems: control.TransferFunction o (num, den); todos los sistemas
+        comparten la malla (p. ej. H1, H2 y H_total). Si alguno es un lote de
+        N sistemas se devuelve una malla (N, n_points), una por fila.
+
+    Devuelve un arreglo creciente de n_points instantes que empieza en 0.
+    """
+    if n_points < 2:
+        raise ValueError("n_points debe ser al menos 2")
+    if not systems:
+        raise ValueError("Se requiere al menos un sistema")
+    poles = [_system_poles(system) for system in systems]
+    single = all(p.shape[0] == 1 for p in poles)
+    n = max(p.shape[0] for p in poles)
+    poles = np.concatenate([np.broadcast_to(p, (n, p.shape[-1])) for p in poles], axis=-1)
+
+    _, decay = _mode_scales(poles)
+    horizon = HORIZON_TAUS * decay.max(axis=-1, initial=0.0)
+    horizon = np.where(horizon > 0, horizon, DEFAULT_HORIZON)
+    t = _planned_grid(poles, horizon, n_points)
+    return t[0] if single else t
+
+
+def _mode_scales(poles):
+    """(valid, decay): modos no nulos y finitos y escala de tiempo de cada uno."""
+    mag = np.abs(poles)
+    sigma = np.abs(poles.real)
+    omega = np.abs(poles.imag)
+    valid = (mag > 0) & np.isfinite(mag)
+    # Escala de tiempo de cada modo: decaimiento o, si no decae, su periodo
+    with np.errstate(divide='ignore'):
+        decay = np.where(sigma > 0, 1 / sigma, 2 * np.pi / omega)
+    return valid, np.where(valid, decay, 0.0)
+
+
+def _planned_grid(poles, horizon, n_points):
+    """Mallas (N, n_points) de plan_time_grid para polos (N, d) y horizontes (N,)."""
+    valid, decay = _mode_scales(poles)
+    mag = np.abs(poles)
+    omega = np.abs(poles.imag)
+    fastest = np.where(valid, mag, 0.0).max(axis=-1, initial=0.0)
+    with np.errstate(divide='ignore'):
+        start = np.minimum(1 / fastest, horizon)
+
+    # Malla auxiliar logarítmica y masa acumulada de la densidad de puntos
+    u = np.linspace(0, 1, _AUX_POINTS)
+    rate = np.log1p(horizon / start)
+    t_aux = start[:, None] * np.expm1(rate[:, None] * u)
+    t_aux[:, -1] = horizon
+    mass = np.log1p(t_aux / start[:, None])
+    window = np.minimum(HORIZON_TAUS * decay, horizon[:, None])
+    periods = np.where(valid & (poles.imag > 0), OSCILLATION_WEIGHT * omega / (2 * np.pi), 0.0)
+    for i in range(poles.shape[-1]):
+        if np.any(periods[:, i]):
+            mass += periods[:, i, None] * np.minimum(t_aux, window[:, i, None])
+
+    # Instantes que reparten la masa total en partes iguales
+    targets = np.linspace(0, 1, n_points)[None, :] * mass[:, -1:]
+    t = _interp_rows(targets, mass, t_aux)
+    t[:, 0] = 0.0
+    t[:, -1] = horizon
+    return t
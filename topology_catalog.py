@@ -0,0 +1,724 @@
+"""
+Catálogo precompilado de topologías del circuito.
+
+Generado automáticamente por build_topology_catalog.py; no editar a mano.
+
+Cada función recibe los valores de los componentes (escalares o arreglos de
+NumPy) y devuelve las listas de coeficientes (num, den) en potencias
+descendentes de s, con la misma estructura que get_numeric_tf obtiene con
+SymPy. Las claves usan los nombres de utils.CONFIG_NAMES:
+  - STAGE1/STAGE2: (retroalimentación, entrada)
+  - TOTAL: (retroalimentación 1, entrada 1, retroalimentación 2, entrada 2)
+"""
+
+
+def _stage1_R_R(R1, R2, C1, Ci1):
+    return ([-R2],
+            [R1])
+
+
+def _stage2_R_R(R3, R4, C2, Ci2):
+    return ([-R4],
+            [R3])
+
+
+def _total_R_R_R_R(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([R2*R4],
+            [R1*R3])
+
+
+def _stage2_R_serie(R3, R4, C2, Ci2):
+    return ([-Ci2*R4, 0],
+            [Ci2*R3, 1])
+
+
+def _total_R_R_R_serie(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([Ci2*R2*R4, 0],
+            [Ci2*R1*R3, R1])
+
+
+def _stage2_R_paralelo(R3, R4, C2, Ci2):
+    return ([-Ci2**2*R3*R4, -Ci2*R4, 0],
+            [Ci2*R3, 0])
+
+
+def _total_R_R_R_paralelo(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([Ci2**2*R2*R3*R4, Ci2*R2*R4, 0],
+            [Ci2*R1*R3, 0])
+
+
+def _stage2_serie_R(R3, R4, C2, Ci2):
+    return ([-C2*R4, -1],
+            [C2*R3, 0])
+
+
+def _total_R_R_serie_R(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C2*R2*R4, R2],
+            [C2*R1*R3, 0])
+
+
+def _stage2_serie_serie(R3, R4, C2, Ci2):
+    return ([-C2*Ci2*R4, -Ci2, 0],
+            [C2*Ci2*R3, C2, 0])
+
+
+def _total_R_R_serie_serie(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C2*Ci2*R2*R4, Ci2*R2, 0],
+            [C2*Ci2*R1*R3, C2*R1, 0])
+
+
+def _stage2_serie_paralelo(R3, R4, C2, Ci2):
+    return ([-C2*Ci2**2*R3*R4, -C2*Ci2*R4 - Ci2**2*R3, -Ci2, 0],
+            [C2*Ci2*R3, 0, 0])
+
+
+def _total_R_R_serie_paralelo(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C2*Ci2**2*R2*R3*R4, C2*Ci2*R2*R4 + Ci2**2*R2*R3, Ci2*R2, 0],
+            [C2*Ci2*R1*R3, 0, 0])
+
+
+def _stage2_paralelo_R(R3, R4, C2, Ci2):
+    return ([-C2*R4, 0],
+            [C2**2*R3*R4, C2*R3, 0])
+
+
+def _total_R_R_paralelo_R(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C2*R2*R4, 0],
+            [C2**2*R1*R3*R4, C2*R1*R3, 0])
+
+
+def _stage2_paralelo_serie(R3, R4, C2, Ci2):
+    return ([-C2*Ci2*R4, 0, 0],
+            [C2**2*Ci2*R3*R4, C2**2*R4 + C2*Ci2*R3, C2, 0])
+
+
+def _total_R_R_paralelo_serie(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C2*Ci2*R2*R4, 0, 0],
+            [C2**2*Ci2*R1*R3*R4, C2**2*R1*R4 + C2*Ci2*R1*R3, C2*R1, 0])
+
+
+def _stage2_paralelo_paralelo(R3, R4, C2, Ci2):
+    return ([-C2*Ci2**2*R3*R4, -C2*Ci2*R4, 0],
+            [C2**2*Ci2*R3*R4, C2*Ci2*R3, 0])
+
+
+def _total_R_R_paralelo_paralelo(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C2*Ci2**2*R2*R3*R4, C2*Ci2*R2*R4, 0],
+            [C2**2*Ci2*R1*R3*R4, C2*Ci2*R1*R3, 0])
+
+
+def _stage1_R_serie(R1, R2, C1, Ci1):
+    return ([-Ci1*R2, 0],
+            [Ci1*R1, 1])
+
+
+def _total_R_serie_R_R(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([Ci1*R2*R4, 0],
+            [Ci1*R1*R3, R3])
+
+
+def _total_R_serie_R_serie(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([Ci1*Ci2*R2*R4, 0, 0],
+            [Ci1*Ci2*R1*R3, Ci1*R1 + Ci2*R3, 1])
+
+
+def _total_R_serie_R_paralelo(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([Ci1*Ci2**2*R2*R3*R4, Ci1*Ci2*R2*R4, 0, 0],
+            [Ci1*Ci2*R1*R3, Ci2*R3, 0])
+
+
+def _total_R_serie_serie_R(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C2*Ci1*R2*R4, Ci1*R2, 0],
+            [C2*Ci1*R1*R3, C2*R3, 0])
+
+
+def _total_R_serie_serie_serie(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C2*Ci1*Ci2*R2*R4, Ci1*Ci2*R2, 0, 0],
+            [C2*Ci1*Ci2*R1*R3, C2*Ci1*R1 + C2*Ci2*R3, C2, 0])
+
+
+def _total_R_serie_serie_paralelo(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C2*Ci1*Ci2**2*R2*R3*R4, C2*Ci1*Ci2*R2*R4 + Ci1*Ci2**2*R2*R3, Ci1*Ci2*R2, 0, 0],
+            [C2*Ci1*Ci2*R1*R3, C2*Ci2*R3, 0, 0])
+
+
+def _total_R_serie_paralelo_R(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C2*Ci1*R2*R4, 0, 0],
+            [C2**2*Ci1*R1*R3*R4, C2**2*R3*R4 + C2*Ci1*R1*R3, C2*R3, 0])
+
+
+def _total_R_serie_paralelo_serie(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C2*Ci1*Ci2*R2*R4, 0, 0, 0],
+            [C2**2*Ci1*Ci2*R1*R3*R4, C2**2*Ci1*R1*R4 + C2**2*Ci2*R3*R4 + C2*Ci1*Ci2*R1*R3, C2**2*R4 + C2*Ci1*R1 + C2*Ci2*R3, C2, 0])
+
+
+def _total_R_serie_paralelo_paralelo(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C2*Ci1*Ci2**2*R2*R3*R4, C2*Ci1*Ci2*R2*R4, 0, 0],
+            [C2**2*Ci1*Ci2*R1*R3*R4, C2**2*Ci2*R3*R4 + C2*Ci1*Ci2*R1*R3, C2*Ci2*R3, 0])
+
+
+def _stage1_R_paralelo(R1, R2, C1, Ci1):
+    return ([-Ci1**2*R1*R2, -Ci1*R2, 0],
+            [Ci1*R1, 0])
+
+
+def _total_R_paralelo_R_R(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([Ci1**2*R1*R2*R4, Ci1*R2*R4, 0],
+            [Ci1*R1*R3, 0])
+
+
+def _total_R_paralelo_R_serie(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([Ci1**2*Ci2*R1*R2*R4, Ci1*Ci2*R2*R4, 0, 0],
+            [Ci1*Ci2*R1*R3, Ci1*R1, 0])
+
+
+def _total_R_paralelo_R_paralelo(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([Ci1**2*Ci2**2*R1*R2*R3*R4, Ci1**2*Ci2*R1*R2*R4 + Ci1*Ci2**2*R2*R3*R4, Ci1*Ci2*R2*R4, 0, 0],
+            [Ci1*Ci2*R1*R3, 0, 0])
+
+
+def _total_R_paralelo_serie_R(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C2*Ci1**2*R1*R2*R4, C2*Ci1*R2*R4 + Ci1**2*R1*R2, Ci1*R2, 0],
+            [C2*Ci1*R1*R3, 0, 0])
+
+
+def _total_R_paralelo_serie_serie(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C2*Ci1**2*Ci2*R1*R2*R4, C2*Ci1*Ci2*R2*R4 + Ci1**2*Ci2*R1*R2, Ci1*Ci2*R2, 0, 0],
+            [C2*Ci1*Ci2*R1*R3, C2*Ci1*R1, 0, 0])
+
+
+def _total_R_paralelo_serie_paralelo(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C2*Ci1**2*Ci2**2*R1*R2*R3*R4, C2*Ci1**2*Ci2*R1*R2*R4 + C2*Ci1*Ci2**2*R2*R3*R4 + Ci1**2*Ci2**2*R1*R2*R3, C2*Ci1*Ci2*R2*R4 + Ci1**2*Ci2*R1*R2 + Ci1*Ci2**2*R2*R3, Ci1*Ci2*R2, 0, 0],
+            [C2*Ci1*Ci2*R1*R3, 0, 0, 0])
+
+
+def _total_R_paralelo_paralelo_R(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C2*Ci1**2*R1*R2*R4, C2*Ci1*R2*R4, 0],
+            [C2**2*Ci1*R1*R3*R4, C2*Ci1*R1*R3, 0])
+
+
+def _total_R_paralelo_paralelo_serie(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C2*Ci1**2*Ci2*R1*R2*R4, C2*Ci1*Ci2*R2*R4, 0, 0],
+            [C2**2*Ci1*Ci2*R1*R3*R4, C2**2*Ci1*R1*R4 + C2*Ci1*Ci2*R1*R3, C2*Ci1*R1, 0])
+
+
+def _total_R_paralelo_paralelo_paralelo(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C2*Ci1**2*Ci2**2*R1*R2*R3*R4, C2*Ci1**2*Ci2*R1*R2*R4 + C2*Ci1*Ci2**2*R2*R3*R4, C2*Ci1*Ci2*R2*R4, 0, 0],
+            [C2**2*Ci1*Ci2*R1*R3*R4, C2*Ci1*Ci2*R1*R3, 0, 0])
+
+
+def _stage1_serie_R(R1, R2, C1, Ci1):
+    return ([-C1*R2, -1],
+            [C1*R1, 0])
+
+
+def _total_serie_R_R_R(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*R2*R4, R4],
+            [C1*R1*R3, 0])
+
+
+def _total_serie_R_R_serie(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*Ci2*R2*R4, Ci2*R4, 0],
+            [C1*Ci2*R1*R3, C1*R1, 0])
+
+
+def _total_serie_R_R_paralelo(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*Ci2**2*R2*R3*R4, C1*Ci2*R2*R4 + Ci2**2*R3*R4, Ci2*R4, 0],
+            [C1*Ci2*R1*R3, 0, 0])
+
+
+def _total_serie_R_serie_R(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*R2*R4, C1*R2 + C2*R4, 1],
+            [C1*C2*R1*R3, 0, 0])
+
+
+def _total_serie_R_serie_serie(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci2*R2*R4, C1*Ci2*R2 + C2*Ci2*R4, Ci2, 0],
+            [C1*C2*Ci2*R1*R3, C1*C2*R1, 0, 0])
+
+
+def _total_serie_R_serie_paralelo(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci2**2*R2*R3*R4, C1*C2*Ci2*R2*R4 + C1*Ci2**2*R2*R3 + C2*Ci2**2*R3*R4, C1*Ci2*R2 + C2*Ci2*R4 + Ci2**2*R3, Ci2, 0],
+            [C1*C2*Ci2*R1*R3, 0, 0, 0])
+
+
+def _total_serie_R_paralelo_R(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*R2*R4, C2*R4, 0],
+            [C1*C2**2*R1*R3*R4, C1*C2*R1*R3, 0, 0])
+
+
+def _total_serie_R_paralelo_serie(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci2*R2*R4, C2*Ci2*R4, 0, 0],
+            [C1*C2**2*Ci2*R1*R3*R4, C1*C2**2*R1*R4 + C1*C2*Ci2*R1*R3, C1*C2*R1, 0, 0])
+
+
+def _total_serie_R_paralelo_paralelo(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci2**2*R2*R3*R4, C1*C2*Ci2*R2*R4 + C2*Ci2**2*R3*R4, C2*Ci2*R4, 0],
+            [C1*C2**2*Ci2*R1*R3*R4, C1*C2*Ci2*R1*R3, 0, 0])
+
+
+def _stage1_serie_serie(R1, R2, C1, Ci1):
+    return ([-C1*Ci1*R2, -Ci1, 0],
+            [C1*Ci1*R1, C1, 0])
+
+
+def _total_serie_serie_R_R(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*Ci1*R2*R4, Ci1*R4, 0],
+            [C1*Ci1*R1*R3, C1*R3, 0])
+
+
+def _total_serie_serie_R_serie(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*Ci1*Ci2*R2*R4, Ci1*Ci2*R4, 0, 0],
+            [C1*Ci1*Ci2*R1*R3, C1*Ci1*R1 + C1*Ci2*R3, C1, 0])
+
+
+def _total_serie_serie_R_paralelo(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*Ci1*Ci2**2*R2*R3*R4, C1*Ci1*Ci2*R2*R4 + Ci1*Ci2**2*R3*R4, Ci1*Ci2*R4, 0, 0],
+            [C1*Ci1*Ci2*R1*R3, C1*Ci2*R3, 0, 0])
+
+
+def _total_serie_serie_serie_R(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci1*R2*R4, C1*Ci1*R2 + C2*Ci1*R4, Ci1, 0],
+            [C1*C2*Ci1*R1*R3, C1*C2*R3, 0, 0])
+
+
+def _total_serie_serie_serie_serie(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci1*Ci2*R2*R4, C1*Ci1*Ci2*R2 + C2*Ci1*Ci2*R4, Ci1*Ci2, 0, 0],
+            [C1*C2*Ci1*Ci2*R1*R3, C1*C2*Ci1*R1 + C1*C2*Ci2*R3, C1*C2, 0, 0])
+
+
+def _total_serie_serie_serie_paralelo(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci1*Ci2**2*R2*R3*R4, C1*C2*Ci1*Ci2*R2*R4 + C1*Ci1*Ci2**2*R2*R3 + C2*Ci1*Ci2**2*R3*R4, C1*Ci1*Ci2*R2 + C2*Ci1*Ci2*R4 + Ci1*Ci2**2*R3, Ci1*Ci2, 0, 0],
+            [C1*C2*Ci1*Ci2*R1*R3, C1*C2*Ci2*R3, 0, 0, 0])
+
+
+def _total_serie_serie_paralelo_R(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci1*R2*R4, C2*Ci1*R4, 0, 0],
+            [C1*C2**2*Ci1*R1*R3*R4, C1*C2**2*R3*R4 + C1*C2*Ci1*R1*R3, C1*C2*R3, 0, 0])
+
+
+def _total_serie_serie_paralelo_serie(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci1*Ci2*R2*R4, C2*Ci1*Ci2*R4, 0, 0, 0],
+            [C1*C2**2*Ci1*Ci2*R1*R3*R4, C1*C2**2*Ci1*R1*R4 + C1*C2**2*Ci2*R3*R4 + C1*C2*Ci1*Ci2*R1*R3, C1*C2**2*R4 + C1*C2*Ci1*R1 + C1*C2*Ci2*R3, C1*C2, 0, 0])
+
+
+def _total_serie_serie_paralelo_paralelo(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci1*Ci2**2*R2*R3*R4, C1*C2*Ci1*Ci2*R2*R4 + C2*Ci1*Ci2**2*R3*R4, C2*Ci1*Ci2*R4, 0, 0],
+            [C1*C2**2*Ci1*Ci2*R1*R3*R4, C1*C2**2*Ci2*R3*R4 + C1*C2*Ci1*Ci2*R1*R3, C1*C2*Ci2*R3, 0, 0])
+
+
+def _stage1_serie_paralelo(R1, R2, C1, Ci1):
+    return ([-C1*Ci1**2*R1*R2, -C1*Ci1*R2 - Ci1**2*R1, -Ci1, 0],
+            [C1*Ci1*R1, 0, 0])
+
+
+def _total_serie_paralelo_R_R(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*Ci1**2*R1*R2*R4, C1*Ci1*R2*R4 + Ci1**2*R1*R4, Ci1*R4, 0],
+            [C1*Ci1*R1*R3, 0, 0])
+
+
+def _total_serie_paralelo_R_serie(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*Ci1**2*Ci2*R1*R2*R4, C1*Ci1*Ci2*R2*R4 + Ci1**2*Ci2*R1*R4, Ci1*Ci2*R4, 0, 0],
+            [C1*Ci1*Ci2*R1*R3, C1*Ci1*R1, 0, 0])
+
+
+def _total_serie_paralelo_R_paralelo(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*Ci1**2*Ci2**2*R1*R2*R3*R4, C1*Ci1**2*Ci2*R1*R2*R4 + C1*Ci1*Ci2**2*R2*R3*R4 + Ci1**2*Ci2**2*R1*R3*R4, C1*Ci1*Ci2*R2*R4 + Ci1**2*Ci2*R1*R4 + Ci1*Ci2**2*R3*R4, Ci1*Ci2*R4, 0, 0],
+            [C1*Ci1*Ci2*R1*R3, 0, 0, 0])
+
+
+def _total_serie_paralelo_serie_R(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci1**2*R1*R2*R4, C1*C2*Ci1*R2*R4 + C1*Ci1**2*R1*R2 + C2*Ci1**2*R1*R4, C1*Ci1*R2 + C2*Ci1*R4 + Ci1**2*R1, Ci1, 0],
+            [C1*C2*Ci1*R1*R3, 0, 0, 0])
+
+
+def _total_serie_paralelo_serie_serie(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci1**2*Ci2*R1*R2*R4, C1*C2*Ci1*Ci2*R2*R4 + C1*Ci1**2*Ci2*R1*R2 + C2*Ci1**2*Ci2*R1*R4, C1*Ci1*Ci2*R2 + C2*Ci1*Ci2*R4 + Ci1**2*Ci2*R1, Ci1*Ci2, 0, 0],
+            [C1*C2*Ci1*Ci2*R1*R3, C1*C2*Ci1*R1, 0, 0, 0])
+
+
+def _total_serie_paralelo_serie_paralelo(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci1**2*Ci2**2*R1*R2*R3*R4, C1*C2*Ci1**2*Ci2*R1*R2*R4 + C1*C2*Ci1*Ci2**2*R2*R3*R4 + C1*Ci1**2*Ci2**2*R1*R2*R3 + C2*Ci1**2*Ci2**2*R1*R3*R4, C1*C2*Ci1*Ci2*R2*R4 + C1*Ci1**2*Ci2*R1*R2 + C1*Ci1*Ci2**2*R2*R3 + C2*Ci1**2*Ci2*R1*R4 + C2*Ci1*Ci2**2*R3*R4 + Ci1**2*Ci2**2*R1*R3, C1*Ci1*Ci2*R2 + C2*Ci1*Ci2*R4 + Ci1**2*Ci2*R1 + Ci1*Ci2**2*R3, Ci1*Ci2, 0, 0],
+            [C1*C2*Ci1*Ci2*R1*R3, 0, 0, 0, 0])
+
+
+def _total_serie_paralelo_paralelo_R(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci1**2*R1*R2*R4, C1*C2*Ci1*R2*R4 + C2*Ci1**2*R1*R4, C2*Ci1*R4, 0],
+            [C1*C2**2*Ci1*R1*R3*R4, C1*C2*Ci1*R1*R3, 0, 0])
+
+
+def _total_serie_paralelo_paralelo_serie(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci1**2*Ci2*R1*R2*R4, C1*C2*Ci1*Ci2*R2*R4 + C2*Ci1**2*Ci2*R1*R4, C2*Ci1*Ci2*R4, 0, 0],
+            [C1*C2**2*Ci1*Ci2*R1*R3*R4, C1*C2**2*Ci1*R1*R4 + C1*C2*Ci1*Ci2*R1*R3, C1*C2*Ci1*R1, 0, 0])
+
+
+def _total_serie_paralelo_paralelo_paralelo(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci1**2*Ci2**2*R1*R2*R3*R4, C1*C2*Ci1**2*Ci2*R1*R2*R4 + C1*C2*Ci1*Ci2**2*R2*R3*R4 + C2*Ci1**2*Ci2**2*R1*R3*R4, C1*C2*Ci1*Ci2*R2*R4 + C2*Ci1**2*Ci2*R1*R4 + C2*Ci1*Ci2**2*R3*R4, C2*Ci1*Ci2*R4, 0, 0],
+            [C1*C2**2*Ci1*Ci2*R1*R3*R4, C1*C2*Ci1*Ci2*R1*R3, 0, 0, 0])
+
+
+def _stage1_paralelo_R(R1, R2, C1, Ci1):
+    return ([-C1*R2, 0],
+            [C1**2*R1*R2, C1*R1, 0])
+
+
+def _total_paralelo_R_R_R(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*R2*R4, 0],
+            [C1**2*R1*R2*R3, C1*R1*R3, 0])
+
+
+def _total_paralelo_R_R_serie(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*Ci2*R2*R4, 0, 0],
+            [C1**2*Ci2*R1*R2*R3, C1**2*R1*R2 + C1*Ci2*R1*R3, C1*R1, 0])
+
+
+def _total_paralelo_R_R_paralelo(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*Ci2**2*R2*R3*R4, C1*Ci2*R2*R4, 0],
+            [C1**2*Ci2*R1*R2*R3, C1*Ci2*R1*R3, 0])
+
+
+def _total_paralelo_R_serie_R(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*R2*R4, C1*R2, 0],
+            [C1**2*C2*R1*R2*R3, C1*C2*R1*R3, 0, 0])
+
+
+def _total_paralelo_R_serie_serie(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci2*R2*R4, C1*Ci2*R2, 0, 0],
+            [C1**2*C2*Ci2*R1*R2*R3, C1**2*C2*R1*R2 + C1*C2*Ci2*R1*R3, C1*C2*R1, 0, 0])
+
+
+def _total_paralelo_R_serie_paralelo(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci2**2*R2*R3*R4, C1*C2*Ci2*R2*R4 + C1*Ci2**2*R2*R3, C1*Ci2*R2, 0],
+            [C1**2*C2*Ci2*R1*R2*R3, C1*C2*Ci2*R1*R3, 0, 0])
+
+
+def _total_paralelo_R_paralelo_R(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*R2*R4, 0, 0],
+            [C1**2*C2**2*R1*R2*R3*R4, C1**2*C2*R1*R2*R3 + C1*C2**2*R1*R3*R4, C1*C2*R1*R3, 0, 0])
+
+
+def _total_paralelo_R_paralelo_serie(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci2*R2*R4, 0, 0, 0],
+            [C1**2*C2**2*Ci2*R1*R2*R3*R4, C1**2*C2**2*R1*R2*R4 + C1**2*C2*Ci2*R1*R2*R3 + C1*C2**2*Ci2*R1*R3*R4, C1**2*C2*R1*R2 + C1*C2**2*R1*R4 + C1*C2*Ci2*R1*R3, C1*C2*R1, 0, 0])
+
+
+def _total_paralelo_R_paralelo_paralelo(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci2**2*R2*R3*R4, C1*C2*Ci2*R2*R4, 0, 0],
+            [C1**2*C2**2*Ci2*R1*R2*R3*R4, C1**2*C2*Ci2*R1*R2*R3 + C1*C2**2*Ci2*R1*R3*R4, C1*C2*Ci2*R1*R3, 0, 0])
+
+
+def _stage1_paralelo_serie(R1, R2, C1, Ci1):
+    return ([-C1*Ci1*R2, 0, 0],
+            [C1**2*Ci1*R1*R2, C1**2*R2 + C1*Ci1*R1, C1, 0])
+
+
+def _total_paralelo_serie_R_R(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*Ci1*R2*R4, 0, 0],
+            [C1**2*Ci1*R1*R2*R3, C1**2*R2*R3 + C1*Ci1*R1*R3, C1*R3, 0])
+
+
+def _total_paralelo_serie_R_serie(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*Ci1*Ci2*R2*R4, 0, 0, 0],
+            [C1**2*Ci1*Ci2*R1*R2*R3, C1**2*Ci1*R1*R2 + C1**2*Ci2*R2*R3 + C1*Ci1*Ci2*R1*R3, C1**2*R2 + C1*Ci1*R1 + C1*Ci2*R3, C1, 0])
+
+
+def _total_paralelo_serie_R_paralelo(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*Ci1*Ci2**2*R2*R3*R4, C1*Ci1*Ci2*R2*R4, 0, 0],
+            [C1**2*Ci1*Ci2*R1*R2*R3, C1**2*Ci2*R2*R3 + C1*Ci1*Ci2*R1*R3, C1*Ci2*R3, 0])
+
+
+def _total_paralelo_serie_serie_R(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci1*R2*R4, C1*Ci1*R2, 0, 0],
+            [C1**2*C2*Ci1*R1*R2*R3, C1**2*C2*R2*R3 + C1*C2*Ci1*R1*R3, C1*C2*R3, 0, 0])
+
+
+def _total_paralelo_serie_serie_serie(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci1*Ci2*R2*R4, C1*Ci1*Ci2*R2, 0, 0, 0],
+            [C1**2*C2*Ci1*Ci2*R1*R2*R3, C1**2*C2*Ci1*R1*R2 + C1**2*C2*Ci2*R2*R3 + C1*C2*Ci1*Ci2*R1*R3, C1**2*C2*R2 + C1*C2*Ci1*R1 + C1*C2*Ci2*R3, C1*C2, 0, 0])
+
+
+def _total_paralelo_serie_serie_paralelo(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci1*Ci2**2*R2*R3*R4, C1*C2*Ci1*Ci2*R2*R4 + C1*Ci1*Ci2**2*R2*R3, C1*Ci1*Ci2*R2, 0, 0],
+            [C1**2*C2*Ci1*Ci2*R1*R2*R3, C1**2*C2*Ci2*R2*R3 + C1*C2*Ci1*Ci2*R1*R3, C1*C2*Ci2*R3, 0, 0])
+
+
+def _total_paralelo_serie_paralelo_R(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci1*R2*R4, 0, 0, 0],
+            [C1**2*C2**2*Ci1*R1*R2*R3*R4, C1**2*C2**2*R2*R3*R4 + C1**2*C2*Ci1*R1*R2*R3 + C1*C2**2*Ci1*R1*R3*R4, C1**2*C2*R2*R3 + C1*C2**2*R3*R4 + C1*C2*Ci1*R1*R3, C1*C2*R3, 0, 0])
+
+
+def _total_paralelo_serie_paralelo_serie(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci1*Ci2*R2*R4, 0, 0, 0, 0],
+            [C1**2*C2**2*Ci1*Ci2*R1*R2*R3*R4, C1**2*C2**2*Ci1*R1*R2*R4 + C1**2*C2**2*Ci2*R2*R3*R4 + C1**2*C2*Ci1*Ci2*R1*R2*R3 + C1*C2**2*Ci1*Ci2*R1*R3*R4, C1**2*C2**2*R2*R4 + C1**2*C2*Ci1*R1*R2 + C1**2*C2*Ci2*R2*R3 + C1*C2**2*Ci1*R1*R4 + C1*C2**2*Ci2*R3*R4 + C1*C2*Ci1*Ci2*R1*R3, C1**2*C2*R2 + C1*C2**2*R4 + C1*C2*Ci1*R1 + C1*C2*Ci2*R3, C1*C2, 0, 0])
+
+
+def _total_paralelo_serie_paralelo_paralelo(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci1*Ci2**2*R2*R3*R4, C1*C2*Ci1*Ci2*R2*R4, 0, 0, 0],
+            [C1**2*C2**2*Ci1*Ci2*R1*R2*R3*R4, C1**2*C2**2*Ci2*R2*R3*R4 + C1**2*C2*Ci1*Ci2*R1*R2*R3 + C1*C2**2*Ci1*Ci2*R1*R3*R4, C1**2*C2*Ci2*R2*R3 + C1*C2**2*Ci2*R3*R4 + C1*C2*Ci1*Ci2*R1*R3, C1*C2*Ci2*R3, 0, 0])
+
+
+def _stage1_paralelo_paralelo(R1, R2, C1, Ci1):
+    return ([-C1*Ci1**2*R1*R2, -C1*Ci1*R2, 0],
+            [C1**2*Ci1*R1*R2, C1*Ci1*R1, 0])
+
+
+def _total_paralelo_paralelo_R_R(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*Ci1**2*R1*R2*R4, C1*Ci1*R2*R4, 0],
+            [C1**2*Ci1*R1*R2*R3, C1*Ci1*R1*R3, 0])
+
+
+def _total_paralelo_paralelo_R_serie(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*Ci1**2*Ci2*R1*R2*R4, C1*Ci1*Ci2*R2*R4, 0, 0],
+            [C1**2*Ci1*Ci2*R1*R2*R3, C1**2*Ci1*R1*R2 + C1*Ci1*Ci2*R1*R3, C1*Ci1*R1, 0])
+
+
+def _total_paralelo_paralelo_R_paralelo(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*Ci1**2*Ci2**2*R1*R2*R3*R4, C1*Ci1**2*Ci2*R1*R2*R4 + C1*Ci1*Ci2**2*R2*R3*R4, C1*Ci1*Ci2*R2*R4, 0, 0],
+            [C1**2*Ci1*Ci2*R1*R2*R3, C1*Ci1*Ci2*R1*R3, 0, 0])
+
+
+def _total_paralelo_paralelo_serie_R(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci1**2*R1*R2*R4, C1*C2*Ci1*R2*R4 + C1*Ci1**2*R1*R2, C1*Ci1*R2, 0],
+            [C1**2*C2*Ci1*R1*R2*R3, C1*C2*Ci1*R1*R3, 0, 0])
+
+
+def _total_paralelo_paralelo_serie_serie(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci1**2*Ci2*R1*R2*R4, C1*C2*Ci1*Ci2*R2*R4 + C1*Ci1**2*Ci2*R1*R2, C1*Ci1*Ci2*R2, 0, 0],
+            [C1**2*C2*Ci1*Ci2*R1*R2*R3, C1**2*C2*Ci1*R1*R2 + C1*C2*Ci1*Ci2*R1*R3, C1*C2*Ci1*R1, 0, 0])
+
+
+def _total_paralelo_paralelo_serie_paralelo(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci1**2*Ci2**2*R1*R2*R3*R4, C1*C2*Ci1**2*Ci2*R1*R2*R4 + C1*C2*Ci1*Ci2**2*R2*R3*R4 + C1*Ci1**2*Ci2**2*R1*R2*R3, C1*C2*Ci1*Ci2*R2*R4 + C1*Ci1**2*Ci2*R1*R2 + C1*Ci1*Ci2**2*R2*R3, C1*Ci1*Ci2*R2, 0, 0],
+            [C1**2*C2*Ci1*Ci2*R1*R2*R3, C1*C2*Ci1*Ci2*R1*R3, 0, 0, 0])
+
+
+def _total_paralelo_paralelo_paralelo_R(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci1**2*R1*R2*R4, C1*C2*Ci1*R2*R4, 0, 0],
+            [C1**2*C2**2*Ci1*R1*R2*R3*R4, C1**2*C2*Ci1*R1*R2*R3 + C1*C2**2*Ci1*R1*R3*R4, C1*C2*Ci1*R1*R3, 0, 0])
+
+
+def _total_paralelo_paralelo_paralelo_serie(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci1**2*Ci2*R1*R2*R4, C1*C2*Ci1*Ci2*R2*R4, 0, 0, 0],
+            [C1**2*C2**2*Ci1*Ci2*R1*R2*R3*R4, C1**2*C2**2*Ci1*R1*R2*R4 + C1**2*C2*Ci1*Ci2*R1*R2*R3 + C1*C2**2*Ci1*Ci2*R1*R3*R4, C1**2*C2*Ci1*R1*R2 + C1*C2**2*Ci1*R1*R4 + C1*C2*Ci1*Ci2*R1*R3, C1*C2*Ci1*R1, 0, 0])
+
+
+def _total_paralelo_paralelo_paralelo_paralelo(R1, R2, R3, R4, C1, C2, Ci1, Ci2):
+    return ([C1*C2*Ci1**2*Ci2**2*R1*R2*R3*R4, C1*C2*Ci1**2*Ci2*R1*R2*R4 + C1*C2*Ci1*Ci2**2*R2*R3*R4, C1*C2*Ci1*Ci2*R2*R4, 0, 0],
+            [C1**2*C2**2*Ci1*Ci2*R1*R2*R3*R4, C1**2*C2*Ci1*Ci2*R1*R2*R3 + C1*C2**2*Ci1*Ci2*R1*R3*R4, C1*C2*Ci1*Ci2*R1*R3, 0, 0])
+
+
+STAGE1 = {
+    ('R', 'R'): _stage1_R_R,
+    ('R', 'serie'): _stage1_R_serie,
+    ('R', 'paralelo'): _stage1_R_paralelo,
+    ('serie', 'R'): _stage1_serie_R,
+    ('serie', 'serie'): _stage1_serie_serie,
+    ('serie', 'paralelo'): _stage1_serie_paralelo,
+    ('paralelo', 'R'): _stage1_paralelo_R,
+    ('paralelo', 'serie'): _stage1_paralelo_serie,
+    ('paralelo', 'paralelo'): _stage1_paralelo_paralelo,
+}
+
+STAGE2 = {
+    ('R', 'R'): _stage2_R_R,
+    ('R', 'serie'): _stage2_R_serie,
+    ('R', 'paralelo'): _stage2_R_paralelo,
+    ('serie', 'R'): _stage2_serie_R,
+    ('serie', 'serie'): _stage2_serie_serie,
+    ('serie', 'paralelo'): _stage2_serie_paralelo,
+    ('paralelo', 'R'): _stage2_paralelo_R,
+    ('paralelo', 'serie'): _stage2_paralelo_serie,
+    ('paralelo', 'paralelo'): _stage2_paralelo_paralelo,
+}
+
+TOTAL = {
+    ('R', 'R', 'R', 'R'): _total_R_R_R_R,
+    ('R', 'R', 'R', 'serie'): _total_R_R_R_serie,
+    ('R', 'R', 'R', 'paralelo'): _total_R_R_R_paralelo,
+    ('R', 'R', 'serie', 'R'): _total_R_R_serie_R,
+    ('R', 'R', 'serie', 'serie'): _total_R_R_serie_serie,
+    ('R', 'R', 'serie', 'paralelo'): _total_R_R_serie_paralelo,
+    ('R', 'R', 'paralelo', 'R'): _total_R_R_paralelo_R,
+    ('R', 'R', 'paralelo', 'serie'): _total_R_R_paralelo_serie,
+    ('R', 'R', 'paralelo', 'paralelo'): _total_R_R_paralelo_paralelo,
+    ('R', 'serie', 'R', 'R'): _total_R_serie_R_R,
+    ('R', 'serie', 'R', 'serie'): _total_R_serie_R_serie,
+    ('R', 'serie', 'R', 'paralelo'): _total_R_serie_R_paralelo,
+    ('R', 'serie', 'serie', 'R'): _total_R_serie_serie_R,
+    ('R', 'serie', 'serie', 'serie'): _total_R_serie_serie_serie,
+    ('R', 'serie', 'serie', 'paralelo'): _total_R_serie_serie_paralelo,
+    ('R', 'serie', 'paralelo', 'R'): _total_R_serie_paralelo_R,
+    ('R', 'serie', 'paralelo', 'serie'): _total_R_serie_paralelo_serie,
+    ('R', 'serie', 'paralelo', 'paralelo'): _total_R_serie_paralelo_paralelo,
+    ('R', 'paralelo', 'R', 'R'): _total_R_paralelo_R_R,
+    ('R', 'paralelo', 'R', 'serie'): _total_R_paralelo_R_serie,
+    ('R', 'paralelo', 'R', 'paralelo'): _total_R_paralelo_R_paralelo,
+    ('R', 'paralelo', 'serie', 'R'): _total_R_paralelo_serie_R,
+    ('R', 'paralelo', 'serie', 'serie'): _total_R_paralelo_serie_serie,
+    ('R', 'paralelo', 'serie', 'paralelo'): _total_R_paralelo_serie_paralelo,
+    ('R', 'paralelo', 'paralelo', 'R'): _total_R_paralelo_paralelo_R,
+    ('R', 'paralelo', 'paralelo', 'serie'): _total_R_paralelo_paralelo_serie,
+    ('R', 'paralelo', 'paralelo', 'paralelo'): _total_R_paralelo_paralelo_paralelo,
+    ('serie', 'R', 'R', 'R'): _total_serie_R_R_R,
+    ('serie', 'R', 'R', 'serie'): _total_serie_R_R_serie,
+    ('serie', 'R', 'R', 'paralelo'): _total_serie_R_R_paralelo,
+    ('serie', 'R', 'serie', 'R'): _total_serie_R_serie_R,
+    ('serie', 'R', 'serie', 'serie'): _total_serie_R_serie_serie,
+    ('serie', 'R', 'serie', 'paralelo'): _total_serie_R_serie_paralelo,
+    ('serie', 'R', 'paralelo', 'R'): _total_serie_R_paralelo_R,
+    ('serie', 'R', 'paralelo', 'serie'): _total_serie_R_paralelo_serie,
+    ('serie', 'R', 'paralelo', 'paralelo'): _total_serie_R_paralelo_paralelo,
+    ('serie', 'serie', 'R', 'R'): _total_serie_serie_R_R,
+    ('serie', 'serie', 'R', 'serie'): _total_serie_serie_R_serie,
+    ('serie', 'serie', 'R', 'paralelo'): _total_serie_serie_R_paralelo,
+    ('serie', 'serie', 'serie', 'R'): _total_serie_serie_serie_R,
+    ('serie', 'serie', 'serie', 'serie'): _total_serie_serie_serie_serie,
+    ('serie', 'serie', 'serie', 'paralelo'): _total_serie_serie_serie_paralelo,
+    ('serie', 'serie', 'paralelo', 'R'): _total_serie_serie_paralelo_R,
+    ('serie', 'serie', 'paralelo', 'serie'): _total_serie_serie_paralelo_serie,
+    ('serie', 'serie', 'paralelo', 'paralelo'): _total_serie_serie_paralelo_paralelo,
+    ('serie', 'paralelo', 'R', 'R'): _total_serie_paralelo_R_R,
+    ('serie', 'paralelo', 'R', 'serie'): _total_serie_paralelo_R_serie,
+    ('serie', 'paralelo', 'R', 'paralelo'): _total_serie_paralelo_R_paralelo,
+    ('serie', 'paralelo', 'serie', 'R'): _total_serie_paralelo_serie_R,
+    ('serie', 'paralelo', 'serie', 'serie'): _total_serie_paralelo_serie_serie,
+    ('serie', 'paralelo', 'serie', 'paralelo'): _total_serie_paralelo_serie_paralelo,
+    ('serie', 'paralelo', 'paralelo', 'R'): _total_serie_paralelo_paralelo_R,
+    ('serie', 'paralelo', 'paralelo', 'serie'): _total_serie_paralelo_paralelo_serie,
+    ('serie', 'paralelo', 'paralelo', 'paralelo'): _total_serie_paralelo_paralelo_paralelo,
+    ('paralelo', 'R', 'R', 'R'): _total_paralelo_R_R_R,
+    ('paralelo', 'R', 'R', 'serie'): _total_paralelo_R_R_serie,
+    ('paralelo', 'R', 'R', 'paralelo'): _total_paralelo_R_R_paralelo,
+    ('paralelo', 'R', 'serie', 'R'): _total_paralelo_R_serie_R,
+    ('paralelo', 'R', 'serie', 'serie'): _total_paralelo_R_serie_serie,
+    ('paralelo', 'R', 'serie', 'paralelo'): _total_paralelo_R_serie_paralelo,
+    ('paralelo', 'R', 'paralelo', 'R'): _total_paralelo_R_paralelo_R,
+    ('paralelo', 'R', 'paralelo', 'serie'): _total_paralelo_R_paralelo_serie,
+    ('paralelo', 'R', 'paralelo', 'paralelo'): _total_paralelo_R_paralelo_paralelo,
+    ('paralelo', 'serie', 'R', 'R'): _total_paralelo_serie_R_R,
+    ('paralelo', 'serie', 'R', 'serie'): _total_paralelo_serie_R_serie,
+    ('paralelo', 'serie', 'R', 'paralelo'): _total_paralelo_serie_R_paralelo,
+    ('paralelo', 'serie', 'serie', 'R'): _total_paralelo_serie_serie_R,
+    ('paralelo', 'serie', 'serie', 'serie'): _total_paralelo_serie_serie_serie,
+    ('paralelo', 'serie', 'serie', 'paralelo'): _total_paralelo_serie_serie_paralelo,
+    ('paralelo', 'serie', 'paralelo', 'R'): _total_paralelo_serie_paralelo_R,
+    ('paralelo', 'serie', 'paralelo', 'serie'): _total_paralelo_serie_paralelo_serie,
+    ('paralelo', 'serie', 'paralelo', 'paralelo'): _total_paralelo_serie_paralelo_paralelo,
+    ('paralelo', 'paralelo', 'R', 'R'): _total_paralelo_paralelo_R_R,
+    ('paralelo', 'paralelo', 'R', 'serie'): _total_paralelo_paralelo_R_serie,
+    ('paralelo', 'paralelo', 'R', 'paralelo'): _total_paralelo_paralelo_R_paralelo,
+    ('paralelo', 'paralelo', 'serie', 'R'): _total_paralelo_paralelo_serie_R,
+    ('paralelo', 'paralelo', 'serie', 'serie'): _total_paralelo_paralelo_serie_serie,
+    ('paralelo', 'paralelo', 'serie', 'paralelo'): _total_paralelo_paralelo_serie_paralelo,
+    ('paralelo', 'paralelo', 'paralelo', 'R'): _total_paralelo_paralelo_paralelo_R,
+    ('paralelo', 'paralelo', 'paralelo', 'serie'): _total_paralelo_paralelo_paralelo_serie,
+    ('paralelo', 'paralelo', 'paralelo', 'paralelo'): _total_paralelo_paralelo_paralelo_paralelo,
+}
+
+STAGE1_STR = {
+    ('R', 'R'): '-R2/R1',
+    ('R', 'serie'): '-R2/(R1 + 1/(Ci1*s))',
+    ('R', 'paralelo'): '-Ci1*R2*s*(R1 + 1/(Ci1*s))/R1',
+    ('serie', 'R'): '(-R2 - 1/(C1*s))/R1',
+    ('serie', 'serie'): '(-R2 - 1/(C1*s))/(R1 + 1/(Ci1*s))',
+    ('serie', 'paralelo'): 'Ci1*s*(R1 + 1/(Ci1*s))*(-R2 - 1/(C1*s))/R1',
+    ('paralelo', 'R'): '-R2/(C1*R1*s*(R2 + 1/(C1*s)))',
+    ('paralelo', 'serie'): '-R2/(C1*s*(R1 + 1/(Ci1*s))*(R2 + 1/(C1*s)))',
+    ('paralelo', 'paralelo'): '-Ci1*R2*(R1 + 1/(Ci1*s))/(C1*R1*(R2 + 1/(C1*s)))',
+}
+
+STAGE2_STR = {
+    ('R', 'R'): '-R4/R3',
+    ('R', 'serie'): '-R4/(R3 + 1/(Ci2*s))',
+    ('R', 'paralelo'): '-Ci2*R4*s*(R3 + 1/(Ci2*s))/R3',
+    ('serie', 'R'): '(-R4 - 1/(C2*s))/R3',
+    ('serie', 'serie'): '(-R4 - 1/(C2*s))/(R3 + 1/(Ci2*s))',
+    ('serie', 'paralelo'): 'Ci2*s*(R3 + 1/(Ci2*s))*(-R4 - 1/(C2*s))/R3',
+    ('paralelo', 'R'): '-R4/(C2*R3*s*(R4 + 1/(C2*s)))',
+    ('paralelo', 'serie'): '-R4/(C2*s*(R3 + 1/(Ci2*s))*(R4 + 1/(C2*s)))',
+    ('paralelo', 'paralelo'): '-Ci2*R4*(R3 + 1/(Ci2*s))/(C2*R3*(R4 + 1/(C2*s)))',
+}
+
+TOTAL_STR = {
+    ('R', 'R', 'R', 'R'): 'R2*R4/(R1*R3)',
+    ('R', 'R', 'R', 'serie'): 'R2*R4/(R1*(R3 + 1/(Ci2*s)))',
+    ('R', 'R', 'R', 'paralelo'): 'Ci2*R2*R4*s*(R3 + 1/(Ci2*s))/(R1*R3)',
+    ('R', 'R', 'serie', 'R'): '-R2*(-R4 - 1/(C2*s))/(R1*R3)',
+    ('R', 'R', 'serie', 'serie'): '-R2*(-R4 - 1/(C2*s))/(R1*(R3 + 1/(Ci2*s)))',
+    ('R', 'R', 'serie', 'paralelo'): '-Ci2*R2*s*(R3 + 1/(Ci2*s))*(-R4 - 1/(C2*s))/(R1*R3)',
+    ('R', 'R', 'paralelo', 'R'): 'R2*R4/(C2*R1*R3*s*(R4 + 1/(C2*s)))',
+    ('R', 'R', 'paralelo', 'serie'): 'R2*R4/(C2*R1*s*(R3 + 1/(Ci2*s))*(R4 + 1/(C2*s)))',
+    ('R', 'R', 'paralelo', 'paralelo'): 'Ci2*R2*R4*(R3 + 1/(Ci2*s))/(C2*R1*R3*(R4 + 1/(C2*s)))',
+    ('R', 'serie', 'R', 'R'): 'R2*R4/(R3*(R1 + 1/(Ci1*s)))',
+    ('R', 'serie', 'R', 'serie'): 'R2*R4/((R1 + 1/(Ci1*s))*(R3 + 1/(Ci2*s)))',
+    ('R', 'serie', 'R', 'paralelo'): 'Ci2*R2*R4*s*(R3 + 1/(Ci2*s))/(R3*(R1 + 1/(Ci1*s)))',
+    ('R', 'serie', 'serie', 'R'): '-R2*(-R4 - 1/(C2*s))/(R3*(R1 + 1/(Ci1*s)))',
+    ('R', 'serie', 'serie', 'serie'): '-R2*(-R4 - 1/(C2*s))/((R1 + 1/(Ci1*s))*(R3 + 1/(Ci2*s)))',
+    ('R', 'serie', 'serie', 'paralelo'): '-Ci2*R2*s*(R3 + 1/(Ci2*s))*(-R4 - 1/(C2*s))/(R3*(R1 + 1/(Ci1*s)))',
+    ('R', 'serie', 'paralelo', 'R'): 'R2*R4/(C2*R3*s*(R1 + 1/(Ci1*s))*(R4 + 1/(C2*s)))',
+    ('R', 'serie', 'paralelo', 'serie'): 'R2*R4/(C2*s*(R1 + 1/(Ci1*s))*(R3 + 1/(Ci2*s))*(R4 + 1/(C2*s)))',
+    ('R', 'serie', 'paralelo', 'paralelo'): 'Ci2*R2*R4*(R3 + 1/(Ci2*s))/(C2*R3*(R1 + 1/(Ci1*s))*(R4 + 1/(C2*s)))',
+    ('R', 'paralelo', 'R', 'R'): 'Ci1*R2*R4*s*(R1 + 1/(Ci1*s))/(R1*R3)',
+    ('R', 'paralelo', 'R', 'serie'): 'Ci1*R2*R4*s*(R1 + 1/(Ci1*s))/(R1*(R3 + 1/(Ci2*s)))',
+    ('R', 'paralelo', 'R', 'paralelo'): 'Ci1*Ci2*R2*R4*s**2*(R1 + 1/(Ci1*s))*(R3 + 1/(Ci2*s))/(R1*R3)',
+    ('R', 'paralelo', 'serie', 'R'): '-Ci1*R2*s*(R1 + 1/(Ci1*s))*(-R4 - 1/(C2*s))/(R1*R3)',
+    ('R', 'paralelo', 'serie', 'serie'): '-Ci1*R2*s*(R1 + 1/(Ci1*s))*(-R4 - 1/(C2*s))/(R1*(R3 + 1/(Ci2*s)))',
+    ('R', 'paralelo', 'serie', 'paralelo'): '-Ci1*Ci2*R2*s**2*(R1 + 1/(Ci1*s))*(R3 + 1/(Ci2*s))*(-R4 - 1/(C2*s))/(R1*R3)',
+    ('R', 'paralelo', 'paralelo', 'R'): 'Ci1*R2*R4*(R1 + 1/(Ci1*s))/(C2*R1*R3*(R4 + 1/(C2*s)))',
+    ('R', 'paralelo', 'paralelo', 'serie'): 'Ci1*R2*R4*(R1 + 1/(Ci1*s))/(C2*R1*(R3 + 1/(Ci2*s))*(R4 + 1/(C2*s)))',
+    ('R', 'paralelo', 'paralelo', 'paralelo'): 'Ci1*Ci2*R2*R4*s*(R1 + 1/(Ci1*s))*(R3 + 1/(Ci2*s))/(C2*R1*R3*(R4 + 1/(C2*s)))',
+    ('serie', 'R', 'R', 'R'): '-R4*(-R2 - 1/(C1*s))/(R1*R3)',
+    ('serie', 'R', 'R', 'serie'): '-R4*(-R2 - 1/(C1*s))/(R1*(R3 + 1/(Ci2*s)))',
+    ('serie', 'R', 'R', 'paralelo'): '-Ci2*R4*s*(-R2 - 1/(C1*s))*(R3 + 1/(Ci2*s))/(R1*R3)',
+    ('serie', 'R', 'serie', 'R'): '(-R2 - 1/(C1*s))*(-R4 - 1/(C2*s))/(R1*R3)',
+    ('serie', 'R', 'serie', 'serie'): '(-R2 - 1/(C1*s))*(-R4 - 1/(C2*s))/(R1*(R3 + 1/(Ci2*s)))',
+    ('serie', 'R', 'serie', 'paralelo'): 'Ci2*s*(-R2 - 1/(C1*s))*(R3 + 1/(Ci2*s))*(-R4 - 1/(C2*s))/(R1*R3)',
+    ('serie', 'R', 'paralelo', 'R'): '-R4*(-R2 - 1/(C1*s))/(C2*R1*R3*s*(R4 + 1/(C2*s)))',
+    ('serie', 'R', 'paralelo', 'serie'): '-R4*(-R2 - 1/(C1*s))/(C2*R1*s*(R3 + 1/(Ci2*s))*(R4 + 1/(C2*s)))',
+    ('serie', 'R', 'paralelo', 'paralelo'): '-Ci2*R4*(-R2 - 1/(C1*s))*(R3 + 1/(Ci2*s))/(C2*R1*R3*(R4 + 1/(C2*s)))',
+    ('serie', 'serie', 'R', 'R'): '-R4*(-R2 - 1/(C1*s))/(R3*(R1 + 1/(Ci1*s)))',
+    ('serie', 'serie', 'R', 'serie'): '-R4*(-R2 - 1/(C1*s))/((R1 + 1/(Ci1*s))*(R3 + 1/(Ci2*s)))',
+    ('serie', 'serie', 'R', 'paralelo'): '-Ci2*R4*s*(-R2 - 1/(C1*s))*(R3 + 1/(Ci2*s))/(R3*(R1 + 1/(Ci1*s)))',
+    ('serie', 'serie', 'serie', 'R'): '(-R2 - 1/(C1*s))*(-R4 - 1/(C2*s))/(R3*(R1 + 1/(Ci1*s)))',
+    ('serie', 'serie', 'serie', 'serie'): '(-R2 - 1/(C1*s))*(-R4 - 1/(C2*s))/((R1 + 1/(Ci1*s))*(R3 + 1/(Ci2*s)))',
+    ('serie', 'serie', 'serie', 'paralelo'): 'Ci2*s*(-R2 - 1/(C1*s))*(R3 + 1/(Ci2*s))*(-R4 - 1/(C2*s))/(R3*(R1 + 1/(Ci1*s)))',
+    ('serie', 'serie', 'paralelo', 'R'): '-R4*(-R2 - 1/(C1*s))/(C2*R3*s*(R1 + 1/(Ci1*s))*(R4 + 1/(C2*s)))',
+    ('serie', 'serie', 'paralelo', 'serie'): '-R4*(-R2 - 1/(C1*s))/(C2*s*(R1 + 1/(Ci1*s))*(R3 + 1/(Ci2*s))*(R4 + 1/(C2*s)))',
+    ('serie', 'serie', 'paralelo', 'paralelo'): '-Ci2*R4*(-R2 - 1/(C1*s))*(R3 + 1/(Ci2*s))/(C2*R3*(R1 + 1/(Ci1*s))*(R4 + 1/(C2*s)))',
+    ('serie', 'paralelo', 'R', 'R'): '-Ci1*R4*s*(R1 + 1/(Ci1*s))*(-R2 - 1/(C1*s))/(R1*R3)',
+    ('serie', 'paralelo', 'R', 'serie'): '-Ci1*R4*s*(R1 + 1/(Ci1*s))*(-R2 - 1/(C1*s))/(R1*(R3 + 1/(Ci2*s)))',
+    ('serie', 'paralelo', 'R', 'paralelo'): '-Ci1*Ci2*R4*s**2*(R1 + 1/(Ci1*s))*(-R2 - 1/(C1*s))*(R3 + 1/(Ci2*s))/(R1*R3)',
+    ('serie', 'paralelo', 'serie', 'R'): 'Ci1*s*(R1 + 1/(Ci1*s))*(-R2 - 1/(C1*s))*(-R4 - 1/(C2*s))/(R1*R3)',
+    ('serie', 'paralelo', 'serie', 'serie'): 'Ci1*s*(R1 + 1/(Ci1*s))*(-R2 - 1/(C1*s))*(-R4 - 1/(C2*s))/(R1*(R3 + 1/(Ci2*s)))',
+    ('serie', 'paralelo', 'serie', 'paralelo'): 'Ci1*Ci2*s**2*(R1 + 1/(Ci1*s))*(-R2 - 1/(C1*s))*(R3 + 1/(Ci2*s))*(-R4 - 1/(C2*s))/(R1*R3)',
+    ('serie', 'paralelo', 'paralelo', 'R'): '-Ci1*R4*(R1 + 1/(Ci1*s))*(-R2 - 1/(C1*s))/(C2*R1*R3*(R4 + 1/(C2*s)))',
+    ('serie', 'paralelo', 'paralelo', 'serie'): '-Ci1*R4*(R1 + 1/(Ci1*s))*(-R2 - 1/(C1*s))/(C2*R1*(R3 + 1/(Ci2*s))*(R4 + 1/(C2*s)))',
+    ('serie', 'paralelo', 'paralelo', 'paralelo'): '-Ci1*Ci2*R4*s*(R1 + 1/(Ci1*s))*(-R2 - 1/(C1*s))*(R3 + 1/(Ci2*s))/(C2*R1*R3*(R4 + 1/(C2*s)))',
+    ('paralelo', 'R', 'R', 'R'): 'R2*R4/(C1*R1*R3*s*(R2 + 1/(C1*s)))',
+    ('paralelo', 'R', 'R', 'serie'): 'R2*R4/(C1*R1*s*(R2 + 1/(C1*s))*(R3 + 1/(Ci2*s)))',
+    ('paralelo', 'R', 'R', 'paralelo'): 'Ci2*R2*R4*(R3 + 1/(Ci2*s))/(C1*R1*R3*(R2 + 1/(C1*s)))',
+    ('paralelo', 'R', 'serie', 'R'): '-R2*(-R4 - 1/(C2*s))/(C1*R1*R3*s*(R2 + 1/(C1*s)))',
+    ('paralelo', 'R', 'serie', 'serie'): '-R2*(-R4 - 1/(C2*s))/(C1*R1*s*(R2 + 1/(C1*s))*(R3 + 1/(Ci2*s)))',
+    ('paralelo', 'R', 'serie', 'paralelo'): '-Ci2*R2*(R3 + 1/(Ci2*s))*(-R4 - 1/(C2*s))/(C1*R1*R3*(R2 + 1/(C1*s)))',
+    ('paralelo', 'R', 'paralelo', 'R'): 'R2*R4/(C1*C2*R1*R3*s**2*(R2 + 1/(C1*s))*(R4 + 1/(C2*s)))',
+    ('paralelo', 'R', 'paralelo', 'serie'): 'R2*R4/(C1*C2*R1*s**2*(R2 + 1/(C1*s))*(R3 + 1/(Ci2*s))*(R4 + 1/(C2*s)))',
+    ('paralelo', 'R', 'paralelo', 'paralelo'): 'Ci2*R2*R4*(R3 + 1/(Ci2*s))/(C1*C2*R1*R3*s*(R2 + 1/(C1*s))*(R4 + 1/(C2*s)))',
+    ('paralelo', 'serie', 'R', 'R'): 'R2*R4/(C1*R3*s*(R1 + 1/(Ci1*s))*(R2 + 1/(C1*s)))',
+    ('paralelo', 'serie', 'R', 'serie'): 'R2*R4/(C1*s*(R1 + 1/(Ci1*s))*(R2 + 1/(C1*s))*(R3 + 1/(Ci2*s)))',
+    ('paralelo', 'serie', 'R', 'paralelo'): 'Ci2*R2*R4*(R3 + 1/(Ci2*s))/(C1*R3*(R1 + 1/(Ci1*s))*(R2 + 1/(C1*s)))',
+    ('paralelo', 'serie', 'serie', 'R'): '-R2*(-R4 - 1/(C2*s))/(C1*R3*s*(R1 + 1/(Ci1*s))*(R2 + 1/(C1*s)))',
+    ('paralelo', 'serie', 'serie', 'serie'): '-R2*(-R4 - 1/(C2*s))/(C1*s*(R1 + 1/(Ci1*s))*(R2 + 1/(C1*s))*(R3 + 1/(Ci2*s)))',
+    ('paralelo', 'serie', 'serie', 'paralelo'): '-Ci2*R2*(R3 + 1/(Ci2*s))*(-R4 - 1/(C2*s))/(C1*R3*(R1 + 1/(Ci1*s))*(R2 + 1/(C1*s)))',
+    ('paralelo', 'serie', 'paralelo', 'R'): 'R2*R4/(C1*C2*R3*s**2*(R1 + 1/(Ci1*s))*(R2 + 1/(C1*s))*(R4 + 1/(C2*s)))',
+    ('paralelo', 'serie', 'paralelo', 'serie'): 'R2*R4/(C1*C2*s**2*(R1 + 1/(Ci1*s))*(R2 + 1/(C1*s))*(R3 + 1/(Ci2*s))*(R4 + 1/(C2*s)))',
+    ('paralelo', 'serie', 'paralelo', 'paralelo'): 'Ci2*R2*R4*(R3 + 1/(Ci2*s))/(C1*C2*R3*s*(R1 + 1/(Ci1*s))*(R2 + 1/(C1*s))*(R4 + 1/(C2*s)))',
+    ('paralelo', 'paralelo', 'R', 'R'): 'Ci1*R2*R4*(R1 + 1/(Ci1*s))/(C1*R1*R3*(R2 + 1/(C1*s)))',
+    ('paralelo', 'paralelo', 'R', 'serie'): 'Ci1*R2*R4*(R1 + 1/(Ci1*s))/(C1*R1*(R2 + 1/(C1*s))*(R3 + 1/(Ci2*s)))',
+    ('paralelo', 'paralelo', 'R', 'paralelo'): 'Ci1*Ci2*R2*R4*s*(R1 + 1/(Ci1*s))*(R3 + 1/(Ci2*s))/(C1*R1*R3*(R2 + 1/(C1*s)))',
+    ('paralelo', 'paralelo', 'serie', 'R'): '-Ci1*R2*(R1 + 1/(Ci1*s))*(-R4 - 1/(C2*s))/(C1*R1*R3*(R2 + 1/(C1*s)))',
+    ('paralelo', 'paralelo', 'serie', 'serie'): '-Ci1*R2*(R1 + 1/(Ci1*s))*(-R4 - 1/(C2*s))/(C1*R1*(R2 + 1/(C1*s))*(R3 + 1/(Ci2*s)))',
+    ('paralelo', 'paralelo', 'serie', 'paralelo'): '-Ci1*Ci2*R2*s*(R1 + 1/(Ci1*s))*(R3 + 1/(Ci2*s))*(-R4 - 1/(C2*s))/(C1*R1*R3*(R2 + 1/(C1*s)))',
+    ('paralelo', 'paralelo', 'paralelo', 'R'): 'Ci1*R2*R4*(R1 + 1/(Ci1*s))/(C1*C2*R1*R3*s*(R2 + 1/(C1*s))*(R4 + 1/(C2*s)))',
+    ('paralelo', 'paralelo', 'paralelo', 'serie'): 'Ci1*R2*R4*(R1 + 1/(Ci1*s))/(C1*C2*R1*s*(R2 + 1/(C1*s))*(R3 + 1/(Ci2*s))*(R4 + 1/(C2*s)))',
+    ('paralelo', 'paralelo', 'paralelo', 'paralelo'): 'Ci1*Ci2*R2*R4*(R1 + 1/(Ci1*s))*(R3 + 1/(Ci2*s))/(C1*C2*R1*R3*(R2 + 1/(C1*s))*(R4 + 1/(C2*s)))',
+}
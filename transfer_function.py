@@ -2,10 +2,10 @@
 Análisis de la función de transferencia y estabilidad del circuito.
 """
 import numpy as np
-import matplotlib.pyplot as plt
-from sympy import symbols, Poly
-import control
-from utils import init_components, configure_plots
+from utils import configure_plots
+from analysis import AnalysisResult
+from stability_margins import stability_margins
+from instrumentation import span, traced
 
 def calc_impedance(R, C, s, config):
     """Calcula la impedancia según la configuración."""
@@ -18,6 +18,7 @@ def calc_impedance(R, C, s, config):
         else:  # Paralelo
             return (R * Z_C)/(R + Z_C)
 
+@traced('calc_individual_transfer_functions')
 def calc_individual_transfer_functions(R1, R2, R3, R4, Ci1, Ci2, C1, C2, s, configs):
     """Calcula las funciones de transferencia individuales y total."""
     # Primera etapa (primer amplificador)
@@ -56,8 +57,11 @@ def calc_transfer_function(R1, R2, R3, R4, Ci1, Ci2, C1, C2, s, configs):
     _, _, H_total = calc_individual_transfer_functions(R1, R2, R3, R4, Ci1, Ci2, C1, C2, s, configs)
     return H_total
 
+@traced('get_numeric_tf')
 def get_numeric_tf(H, valores, s):
     """Convierte la función de transferencia simbólica a numérica y normaliza los coeficientes."""
+    from sympy import Poly
+    import control
     H_num = H.subs(valores)
     num, den = H_num.as_numer_denom()
     
@@ -82,10 +86,17 @@ def get_numeric_tf(H, valores, s):
     
     return control.TransferFunction(num_coeff, den_coeff)
 
-def analyze_stability(sys):
-    """Analiza la estabilidad del sistema y proporciona información detallada."""
+def analyze_stability(sys, poles=None, margins=None):
+    """Analiza la estabilidad del sistema y proporciona información detallada.
+
+    poles y margins (resultado de stability_margins) se calculan si no se
+    dan; AnalysisResult los pasa ya memoizados.
+    """
     # Analizar polos
-    poles = control.poles(sys)
+    if poles is None:
+        import control
+        with span('control.poles'):
+            poles = control.poles(sys)
     stable = all(pole.real < 0 for pole in poles)
     
     print("\nAnálisis de estabilidad:")
@@ -106,25 +117,30 @@ def analyze_stability(sys):
             print(f"  - Frecuencia natural: {freq_nat:.2f} rad/s")
             print(f"  - Coeficiente de amortiguamiento: {damping:.3f}")
     
-    # Intentar calcular márgenes de estabilidad
-    try:
-        gm, pm, wg, wp = control.margin(sys)
-        print("\nMárgenes de estabilidad:")
-        if np.isfinite(gm):
-            print(f"Margen de ganancia: {gm:.2f} dB a {wg:.2f} rad/s")
-        else:
-            print("Margen de ganancia: No cruza por -180°")
-            
-        if np.isfinite(pm):
-            print(f"Margen de fase: {pm:.2f} grados a {wp:.2f} rad/s")
-        else:
-            print("Margen de fase: No cruza por 0dB")
-            
-    except Exception as e:
-        print("\nNo se pudieron calcular los márgenes de estabilidad")
-        print("Esto puede ocurrir si el sistema:")
-        print("- No tiene cruces de fase o ganancia")
-        print("- Tiene una respuesta en frecuencia compleja")
+    # Márgenes de estabilidad con todos los cruces por -180° y por 0 dB
+    if margins is None:
+        margins = stability_margins(sys)
+    print("\nMárgenes de estabilidad:")
+    if np.isfinite(margins['gm']):
+        print(f"Margen de ganancia: {20 * np.log10(margins['gm']):.2f} dB "
+              f"a {margins['wg']:.2f} rad/s")
+    else:
+        print("Margen de ganancia: No cruza por -180°")
+    if margins['real_response']:
+        print("  - H(jω) es real en todas las frecuencias (fase constante)")
+    if len(margins['wg_all']) > 1:
+        for w, gm in zip(margins['wg_all'], margins['gm_all']):
+            print(f"  - Cruce por -180° a {w:.2f} rad/s: {20 * np.log10(gm):.2f} dB")
+
+    if np.isfinite(margins['pm']):
+        print(f"Margen de fase: {margins['pm']:.2f} grados a {margins['wp']:.2f} rad/s")
+    else:
+        print("Margen de fase: No cruza por 0dB")
+    if margins['unity_gain']:
+        print("  - |H(jω)| = 1 en todas las frecuencias (0 dB constante)")
+    if len(margins['wp_all']) > 1:
+        for w, pm in zip(margins['wp_all'], margins['pm_all']):
+            print(f"  - Cruce por 0 dB a {w:.2f} rad/s: {pm:.2f} grados")
     
     # Recomendaciones para estabilización si es inestable
     if not stable:
@@ -136,24 +152,24 @@ def analyze_stability(sys):
     
     return stable
 
-def analyze_transfer_function_no_plots(components=None):
-    """Realiza el análisis de la función de transferencia sin mostrar gráficas."""
-    if components is None:
-        (R1, R2, R3, R4), (Ci1, Ci2, C1, C2), valores, configs = init_components()
-    else:
-        (R1, R2, R3, R4), (Ci1, Ci2, C1, C2), valores, configs = components
-    s = symbols('s')
+def analyze_transfer_function_no_plots(components=None, result=None):
+    """Realiza el análisis de la función de transferencia sin mostrar gráficas.
 
-    # Calcular funciones de transferencia individuales y total
-    H1, H2, H_total = calc_individual_transfer_functions(R1, R2, R3, R4, Ci1, Ci2, C1, C2, s, configs)
+    result: AnalysisResult del diseño; si se da, se reutilizan sus cálculos.
+    """
+    if result is None:
+        result = AnalysisResult(components)
+
+    # Expresiones precompiladas (topology_catalog) y sistemas numéricos, sin SymPy
+    H1, H2, H_total = result.expressions
+    sys1, sys2, sys_total = result.systems
     
     print("\n=== ANÁLISIS INDIVIDUAL: PRIMER AMPLIFICADOR OPERACIONAL ===")
     print(f"H1(s) = {H1}")
     
     # Sistema individual del primer op-amp
-    sys1 = get_numeric_tf(H1, valores, s)
-    zeros1 = control.zeros(sys1)
-    poles1 = control.poles(sys1)
+    zeros1 = result.zeros['H1']
+    poles1 = result.poles['H1']
     
     print("\nCeros:")
     for i, zero in enumerate(zeros1, 1):
@@ -164,16 +180,15 @@ def analyze_transfer_function_no_plots(components=None):
         print(f"  p{i} = {pole:.2f}")
     
     print("\nAnálisis de estabilidad:")
-    analyze_stability(sys1)
+    analyze_stability(sys1, poles1, result.margins['H1'])
     
     print("\n" + "="*60)
     print("\n=== ANÁLISIS INDIVIDUAL: SEGUNDO AMPLIFICADOR OPERACIONAL ===")
     print(f"H2(s) = {H2}")
     
     # Sistema individual del segundo op-amp
-    sys2 = get_numeric_tf(H2, valores, s)
-    zeros2 = control.zeros(sys2)
-    poles2 = control.poles(sys2)
+    zeros2 = result.zeros['H2']
+    poles2 = result.poles['H2']
     
     print("\nCeros:")
     for i, zero in enumerate(zeros2, 1):
@@ -184,18 +199,15 @@ def analyze_transfer_function_no_plots(components=None):
         print(f"  p{i} = {pole:.2f}")
     
     print("\nAnálisis de estabilidad:")
-    analyze_stability(sys2)
+    analyze_stability(sys2, poles2, result.margins['H2'])
     
     print("\n" + "="*60)
     print("\n=== FUNCIÓN DE TRANSFERENCIA TOTAL (AMBOS AMPLIFICADORES) ===")
     print(f"H_total(s) = {H_total}")
-
-    # Convertir a sistema numérico para análisis
-    sys_total = get_numeric_tf(H_total, valores, s)
     
     # Análisis de polos y ceros
-    zeros_total = control.zeros(sys_total)
-    poles_total = control.poles(sys_total)
+    zeros_total = result.zeros['H_total']
+    poles_total = result.poles['H_total']
     
     print("\nCeros:")
     for i, zero in enumerate(zeros_total, 1):
@@ -207,7 +219,7 @@ def analyze_transfer_function_no_plots(components=None):
     
     # Análisis de estabilidad
     print("\nAnálisis de estabilidad:")
-    analyze_stability(sys_total)
+    analyze_stability(sys_total, poles_total, result.margins['H_total'])
     
     return sys1, sys2, sys_total  # Retornamos los tres sistemas para usarlos en las gráficas
 
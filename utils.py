@@ -2,12 +2,25 @@
 Utilidades para el análisis de circuitos con amplificadores operacionales.
 """
 import numpy as np
-import matplotlib.pyplot as plt
-import scipy.signal as signal
-from sympy import symbols, solve, expand, simplify, limit, Poly
-from sympy.abc import s
-import control
-from control import TransferFunction
+
+# Configuraciones de impedancia por nombre (para entradas no interactivas)
+CONFIG_NAMES = {
+    'R': {'type': 'R', 'config': None},
+    'serie': {'type': 'RC', 'config': 1},
+    'paralelo': {'type': 'RC', 'config': 2},
+}
+
+# Tipos de filtro que distinguen responses.determine_filter_type y
+# batch_response.determine_filter_type_batch; el último es el caso por defecto
+FILTER_TYPES = ("Pasa todo", "Pasa altas", "Pasa bajas", "Pasa bajas de orden superior",
+                "Pasa banda")
+
+def config_from_name(name):
+    """Devuelve el dict de configuración para 'R', 'serie' o 'paralelo'."""
+    try:
+        return dict(CONFIG_NAMES[name])
+    except KeyError:
+        raise ValueError(f"Configuración desconocida: {name!r} (use R, serie o paralelo)")
 
 def get_user_input(prompt, allow_zero=False):
     """Obtiene entrada del usuario con validación.
@@ -146,6 +159,7 @@ def init_components():
         }
 
     # Definir símbolos (mantener compatibilidad con el resto del código)
+    from sympy import symbols
     R1, R2, R3, R4 = symbols('R1 R2 R3 R4')
     C1, C2, Ci1, Ci2 = symbols('C1 C2 Ci1 Ci2')
 
@@ -186,6 +200,7 @@ def init_components():
 
 def configure_plots():
     """Configura el estilo de las gráficas."""
+    import matplotlib.pyplot as plt
     plt.style.use('default')
     plt.rcParams['axes.grid'] = True
     plt.rcParams['grid.linestyle'] = '--'